@@ -0,0 +1,80 @@
+"""Padding benchmark of dframe.dataset.batching.
+
+Builds a dataset of sequences with lengths drawn from a long-tailed distribution and goes through one epoch with the
+plain batch generator (Dataset.batch_generator) and with the bucketed one for several numbers of buckets, measuring:
+
+* padded elements: elements added to pad every batch to its longest sequence
+* padding ratio: padded elements divided by the total elements of the padded batches
+* seconds per epoch: time to pull and pad all the batches
+"""
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.common import environment, emit
+from dframe.dataset.batching import PaddingBuffers
+from dframe.dataset.dataset import Dataset
+from dframe.dataset.sample import Sample
+
+
+def make_dataset(num_samples, max_length, seed=0):
+    random_state = np.random.RandomState(seed)
+    lengths = np.minimum(random_state.lognormal(3, 1, num_samples).astype(int) + 1, max_length)
+    return Dataset([Sample([np.ones(length, np.float32)], [0]) for length in lengths])
+
+
+def run(dataset, batch_size, num_buckets):
+    """Measures one epoch. num_buckets None is the plain batch generator"""
+
+    if num_buckets is None:
+        generator = dataset.batch_generator(batch_size, shuffle=True)
+        buffers = PaddingBuffers()
+    else:
+        generator = dataset.bucketed_batch_generator(batch_size, num_buckets=num_buckets, pad=True)
+
+    padded = total = num_batches = 0
+    start = time.time()
+    # The bucketed generator may make a few more batches (one smaller batch per bucket), so go through the samples
+    seen = 0
+    while seen < dataset.len():
+        batch = next(generator)
+        inputs = batch[0] if num_buckets is not None else buffers.pad_columns('input', batch[0])
+        lengths = batch[2] if num_buckets is not None else [len(item) for item in batch[0][0]]
+        seen += len(lengths)
+        num_batches += 1
+        total += inputs[0].size
+        padded += inputs[0].size - sum(lengths)
+    elapsed = time.time() - start
+
+    return {
+        'benchmark': 'bucketing',
+        'samples': dataset.len(),
+        'batch_size': batch_size,
+        'buckets': num_buckets,
+        'batches': num_batches,
+        'padded_elements': int(padded),
+        'padding_ratio': padded / float(total),
+        'epoch_seconds': elapsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--samples', type=int, default=20000)
+    parser.add_argument('--max-length', type=int, default=1000)
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--buckets', type=int, nargs='+', default=[2, 5, 10, 20])
+    parser.add_argument('--output', help='File to write the results to (JSON lines). Default is stdout')
+    args = parser.parse_args()
+
+    env = environment()
+    dataset = make_dataset(args.samples, args.max_length)
+    results = [run(dataset, args.batch_size, num_buckets) for num_buckets in [None] + args.buckets]
+    for result in results:
+        result.update(env)
+    emit(results, args.output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""Serialization benchmark of dframe.pipeline.serialization.
+
+Encodes and decodes representative packages with each codec, measuring:
+
+* bytes: size of the encoded package, i.e. what crosses the pipe on each hop
+* encode/decode microseconds: mean time per package
+* round trips per second: packages encoded and decoded per second
+
+The packages are: small (a dict of metadata and a few numbers per layer), array (a 224x224x3 image like uint8 array
+plus a float32 feature vector) and text (a list of tokens and a dict of scores).
+"""
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.common import environment, emit
+from dframe.pipeline.package import Package
+from dframe.pipeline.serialization import BinaryCodec, PickleCodec
+
+
+def make_package(kind, package_id, random_state):
+    package = Package(package_id, priority=1)
+    if kind == 'small':
+        package.add_layer({'id': package_id, 'source': 'camera-1', 'timestamp': time.time()})
+        package.add_layer({'score': random_state.rand(), 'label': 3})
+    elif kind == 'array':
+        # Image like layer: blocks of equal pixels, so that it is compressible as natural images are
+        blocks = random_state.randint(0, 256, (28, 28, 3)).astype(np.uint8)
+        package.add_layer(blocks.repeat(8, axis=0).repeat(8, axis=1))
+        package.add_layer(random_state.rand(512).astype(np.float32))
+    elif kind == 'text':
+        package.add_layer(['token{}'.format(idx) for idx in random_state.randint(0, 1000, 200)])
+        package.add_layer({'token{}'.format(idx): float(score) for idx, score in enumerate(random_state.rand(50))})
+    else:
+        raise ValueError('Unknown package kind {}'.format(kind))
+    return package
+
+
+def run(codec_name, codec, kind, packages):
+    start = time.time()
+    encoded = [codec.encode(package) for package in packages]
+    encode_seconds = time.time() - start
+    start = time.time()
+    for data in encoded:
+        codec.decode(data)
+    decode_seconds = time.time() - start
+
+    return {
+        'benchmark': 'codec',
+        'codec': codec_name,
+        'package': kind,
+        'packages': len(packages),
+        'bytes': sum(len(data) for data in encoded) / float(len(encoded)),
+        'encode_us': encode_seconds / len(packages) * 1e6,
+        'decode_us': decode_seconds / len(packages) * 1e6,
+        'round_trips_per_second': len(packages) / (encode_seconds + decode_seconds),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--packages', type=int, default=2000)
+    parser.add_argument('--kinds', nargs='+', default=['small', 'array', 'text'])
+    parser.add_argument('--compress-threshold', type=int, default=64 * 1024,
+                        help='Threshold of the compressed binary codec, in bytes')
+    parser.add_argument('--output', help='File to write the results to (JSON lines). Default is stdout')
+    args = parser.parse_args()
+
+    codecs = [
+        ('pickle', PickleCodec()),
+        ('binary', BinaryCodec()),
+        ('binary-zlib', BinaryCodec(compress_threshold=args.compress_threshold)),
+    ]
+    env = environment()
+    results = []
+    for kind in args.kinds:
+        random_state = np.random.RandomState(0)
+        packages = [make_package(kind, package_id, random_state) for package_id in range(args.packages)]
+        for codec_name, codec in codecs:
+            results.append(run(codec_name, codec, kind, packages))
+    for result in results:
+        result.update(env)
+    emit(results, args.output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,39 @@
+"""Helpers shared by the benchmarks: result reporting and basic statistics."""
+import json
+import platform
+import sys
+import time
+
+import dframe
+
+
+def percentile(values, q):
+    """Returns the q-th percentile (0-100) of values using linear interpolation"""
+    if not values:
+        return None
+    values = sorted(values)
+    position = (len(values) - 1) * q / 100.0
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+def environment():
+    """Describes where the benchmark has been run, so that results from different runs can be compared"""
+    return {
+        'dframe_version': dframe.__version__,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'timestamp': time.time(),
+    }
+
+
+def emit(results, output=None):
+    """Writes the results as JSON lines (one per measurement) into output (a path) or stdout"""
+    stream = open(output, 'w') if output else sys.stdout
+    try:
+        for result in results:
+            stream.write(json.dumps(result, sort_keys=True) + '\n')
+    finally:
+        if output:
+            stream.close()
@@ -0,0 +1,138 @@
+"""Throughput and latency benchmark of dframe.pipeline.
+
+Builds pipelines of varying depth (number of cores), payload size (bytes in the input layer) and stage cost (seconds
+of busy work per core and package), pushes a fixed number of packages through them and measures:
+
+* throughput: packages per second, from the first submission to the last result
+* latency p50/p99: seconds from the submission of a package to the end of its processing in the last core
+* cpu per package: CPU seconds (user + system) of the pipeline processes and the caller, divided by the packages
+* peak rss: maximum resident set size (KB) among the pipeline processes
+
+Each configuration runs in a fresh process, so that its CPU time and peak RSS only account its own pipeline processes.
+"""
+import argparse
+import os
+import resource
+import time
+import traceback
+from multiprocessing import Process, Queue
+
+from benchmarks.common import percentile, environment, emit
+from dframe.pipeline.core import Core
+from dframe.pipeline.package import Package
+from dframe.pipeline.pipeline import Pipeline
+from dframe.pipeline.transport import PipeTransport, SocketTransport
+
+
+class BenchmarkCore(Core):
+    """Core that burns cost seconds of CPU and stamps the time it finished the package"""
+
+    def __init__(self, pipe_in, pipe_out, cost=0.0):
+        super(BenchmarkCore, self).__init__(pipe_in, pipe_out)
+        self.cost = cost
+
+    def process_package(self, package):
+        end = time.time() + self.cost
+        while time.time() < end:
+            pass
+        package.add_layer(time.time())
+
+
+def run(depth, payload_size, cost, num_packages, transport='pipe'):
+    """Runs a single configuration and returns its measurements as a dictionary"""
+
+    pipeline = Pipeline([{Pipeline.KEY_CLASS: BenchmarkCore, Pipeline.KEY_KWARGS: {'cost': cost}}
+                         for _ in range(depth)],
+                        transport=SocketTransport() if transport == 'socket' else PipeTransport())
+    pipeline.start()
+    payload = os.urandom(payload_size)
+
+    cpu_start = _cpu_time()
+    submitted = {}
+    start = time.time()
+    for package_id in range(num_packages):
+        package = Package(package_id)
+        package.add_layer(payload)
+        submitted[package_id] = time.time()
+        pipeline.process_package(package)
+
+    latencies = []
+    while len(latencies) < num_packages:
+        for package_id in pipeline.results.keys():
+            result = pipeline.get_result(package_id)
+            latencies.append(result.get_output() - submitted[package_id])
+        time.sleep(0.001)
+    elapsed = time.time() - start
+
+    # Wait for all the processes so that their resources are accounted
+    pipeline.stop()
+    for core in pipeline.cores:
+        core.join()
+        core.producer.join()
+    pipeline.results_manager.shutdown()
+    cpu = _cpu_time() - cpu_start
+
+    return {
+        'benchmark': 'pipeline',
+        'depth': depth,
+        'payload_size': payload_size,
+        'stage_cost': cost,
+        'transport': transport,
+        'packages': num_packages,
+        'throughput': num_packages / elapsed,
+        'latency_p50': percentile(latencies, 50),
+        'latency_p99': percentile(latencies, 99),
+        'cpu_per_package': cpu / num_packages,
+        # Peak among the (finished) child processes of this run, which are only the ones of this pipeline
+        'peak_rss_kb': resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    }
+
+
+def run_isolated(*args):
+    """Runs a single configuration (see run) in a new process and returns its measurements"""
+    queue = Queue()
+    process = Process(target=_run_into, args=(queue,) + args)
+    process.start()
+    error, result = queue.get()
+    process.join()
+    if error:
+        raise RuntimeError('Benchmark configuration %s failed:\n%s' % (args, error))
+    return result
+
+
+def _run_into(queue, *args):
+    try:
+        queue.put((None, run(*args)))
+    except Exception:
+        queue.put((traceback.format_exc(), None))
+
+
+def _cpu_time():
+    times = os.times()
+    # User and system time of this process and its finished children
+    return sum(times[:4])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--depths', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--payload-sizes', type=int, nargs='+', default=[100, 10000, 1000000])
+    parser.add_argument('--costs', type=float, nargs='+', default=[0.0, 0.001])
+    parser.add_argument('--packages', type=int, default=500)
+    parser.add_argument('--transport', choices=['pipe', 'socket'], default='pipe')
+    parser.add_argument('--output', help='File to write the results to (JSON lines). Default is stdout')
+    args = parser.parse_args()
+
+    env = environment()
+    results = []
+    for payload_size in sorted(args.payload_sizes):
+        for depth in sorted(args.depths):
+            for cost in args.costs:
+                result = run_isolated(depth, payload_size, cost, args.packages, args.transport)
+                result.update(env)
+                results.append(result)
+    emit(results, args.output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""Memory and time benchmark of dframe.dataset.sample.Sample.
+
+* memory: bytes per sample object (without its payload), compared with a dict-backed object holding the same
+  attributes (the layout Sample had before using __slots__)
+* time: seconds per epoch of Dataset.get_input/get_output, with and without caching the formatted data
+"""
+import argparse
+import sys
+import time
+
+from benchmarks.common import environment, emit
+from dframe.dataset.dataset import Dataset
+from dframe.dataset.sample import Sample, Value
+
+
+class FeatureValue(Value):
+    """Value wrapping a list of features, as a 'complex' input would"""
+
+    def __init__(self, features):
+        self.features = features
+
+    def get_data(self):
+        return self.features
+
+
+class DictBackedSample(object):
+    """Object with the same attributes as Sample but stored in a __dict__"""
+
+    def __init__(self, inputs, outputs):
+        self._inputs = inputs
+        self._outputs = outputs
+        self.num_inputs = len(inputs)
+        self.num_outputs = 1
+
+
+def object_size(obj):
+    size = sys.getsizeof(obj)
+    if hasattr(obj, '__dict__'):
+        size += sys.getsizeof(obj.__dict__)
+    return size
+
+
+def run_memory(num_samples):
+    inputs = [1, 2, 3]
+    return {
+        'benchmark': 'sample_memory',
+        'samples': num_samples,
+        'sample_bytes': object_size(Sample(inputs, 1)),
+        'dict_backed_bytes': object_size(DictBackedSample(inputs, 1)),
+    }
+
+
+def run_epochs(num_samples, num_features, epochs, cache):
+    dataset = Dataset([Sample([FeatureValue(range(num_features)), 1.0], [idx % 2], cache=cache)
+                       for idx in range(num_samples)])
+    timings = []
+    for _ in range(epochs):
+        start = time.time()
+        dataset.get_input()
+        dataset.get_output()
+        timings.append(time.time() - start)
+    return {
+        'benchmark': 'sample_epochs',
+        'samples': num_samples,
+        'features': num_features,
+        'cache': cache,
+        'first_epoch': timings[0],
+        'next_epochs_mean': sum(timings[1:]) / max(len(timings) - 1, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--samples', type=int, default=100000)
+    parser.add_argument('--features', type=int, default=10)
+    parser.add_argument('--epochs', type=int, default=5)
+    parser.add_argument('--output', help='File to write the results to (JSON lines). Default is stdout')
+    args = parser.parse_args()
+
+    env = environment()
+    results = [run_memory(args.samples)] + [run_epochs(args.samples, args.features, args.epochs, cache)
+                                            for cache in (False, True)]
+    for result in results:
+        result.update(env)
+    emit(results, args.output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,181 @@
+import copy
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+_logger = logging.getLogger(__name__)
+
+
+class SaveFuture(object):
+    """Result of a save made in the background by an AsyncSaver"""
+
+    def __init__(self, path):
+        self.path = path
+        self._done = threading.Event()
+        self._exception = None
+        self._callbacks = []
+        self._lock = threading.Lock()
+
+    def done(self):
+        return self._done.is_set()
+
+    def result(self, timeout=None):
+        """Waits until the dataset has been saved, at most timeout seconds, and returns the path it has been saved in.
+
+        Raises the exception of the save if it has failed, or RuntimeError if it is not done after timeout seconds.
+        """
+
+        exception = self.exception(timeout)
+        if exception is not None:
+            raise exception
+        return self.path
+
+    def exception(self, timeout=None):
+        """Waits until the save is done, at most timeout seconds, and returns the exception raised by it (None if it
+        has succeeded)"""
+        if not self._done.wait(timeout):
+            raise RuntimeError('The dataset has not been saved into {} yet'.format(self.path))
+        return self._exception
+
+    def add_done_callback(self, callback):
+        """Calls callback with this future once the save is done, from the thread that saves (or right away if it is
+        already done)"""
+        with self._lock:
+            if not self._done.is_set():
+                self._callbacks.append(callback)
+                return
+        callback(self)
+
+    def _set_done(self, exception=None):
+        with self._lock:
+            self._exception = exception
+            self._done.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            # A failing callback must not stop the saver thread nor the rest of the callbacks
+            try:
+                callback(self)
+            except Exception:
+                _logger.exception('Error in a done callback of the save into %s', self.path)
+
+
+class AsyncSaver(object):
+    """Saves datasets with a persistence manager in a background thread, so that the caller keeps working meanwhile.
+
+    save takes a snapshot of the dataset (a copy of it, see dframe.dataset.dataset.Dataset.__copy__, whose new list of
+    samples takes a pointer per sample) and returns right away a SaveFuture. The snapshot is written into a temporary
+    file next to the destination, that is renamed to it once complete, so readers never see partially written files.
+
+    Saves are double buffered: while a dataset is being written, the next save into the same path waits as pending.
+    Further saves into that path replace the pending snapshot instead of queueing up (the latest data is the one that
+    matters), and they all share its future.
+
+    Note that the samples themselves are not copied, so they should not be modified until their save is done. The
+    persistence manager must save each dataset into a single file (e.g. H5pyPersistenceManager or
+    PicklePersistenceManager).
+    """
+
+    def __init__(self, persistence_manager):
+        """Creates an AsyncSaver.
+
+        Args:
+            persistence_manager (dframe.dataset.persistence.PersistenceManager): The persistence manager that saves
+                the datasets
+        """
+
+        self.persistence_manager = persistence_manager
+        self._pending = OrderedDict()        # Path -> (snapshot, future), in the order they were requested
+        self._current = None                 # Path being written
+        self._condition = threading.Condition()
+        self._thread = None
+        self._closed = False
+
+    def save(self, dataset, path):
+        """Starts saving the dataset into path in the background.
+
+        Returns:
+            SaveFuture: The future of the save. It is the one of the pending save into the same path, if any
+        """
+
+        if not self.persistence_manager.supports_saving(dataset):
+            raise TypeError('This persistence manager cannot save this dataset')
+        # Copy keeping the class and index of the dataset, for the persistence managers that save them (e.g. pickle)
+        snapshot = copy.copy(dataset)
+
+        with self._condition:
+            if self._closed:
+                raise ValueError('The saver has been closed')
+            if path in self._pending:
+                future = self._pending[path][1]
+            else:
+                future = SaveFuture(path)
+            self._pending[path] = (snapshot, future)
+            self._start()
+            self._condition.notify()
+        return future
+
+    def num_pending(self):
+        """Returns the number of saves waiting to be started"""
+        with self._condition:
+            return len(self._pending)
+
+    def wait(self, timeout=None):
+        """Waits until all the requested saves are done, at most timeout seconds. Returns whether they are all done"""
+        deadline = time.time() + timeout if timeout is not None else None
+        with self._condition:
+            while self._pending or self._current is not None:
+                remaining = deadline - time.time() if deadline is not None else None
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+        return True
+
+    def close(self):
+        """Waits for the requested saves to be done and stops the background thread"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run)
+            self._thread.daemon = True
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._pending and not self._closed:
+                    self._condition.wait()
+                if not self._pending:
+                    return
+                path, (snapshot, future) = self._pending.popitem(last=False)
+                self._current = path
+
+            try:
+                try:
+                    self._write(snapshot, path)
+                except Exception as e:
+                    exception = e
+                else:
+                    exception = None
+                future._set_done(exception)
+            finally:
+                # Otherwise, wait and close would wait for this save forever
+                with self._condition:
+                    self._current = None
+                    self._condition.notify_all()
+
+    def _write(self, dataset, path):
+        # Write and rename, so that readers never see a partially written file
+        temp_path = '{}.{}-{}.tmp'.format(path, os.getpid(), threading.current_thread().ident)
+        try:
+            self.persistence_manager.save(dataset, temp_path)
+            os.rename(temp_path, path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
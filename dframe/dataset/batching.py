@@ -0,0 +1,162 @@
+import itertools
+from collections import deque
+
+import numpy as np
+
+from dframe.dataset.sparse import CSRBatch, SparseVector, assemble_sparse_columns
+
+
+def sample_size(sample):
+    """Default size of a sample for bucketing: the length of its first input, or its number of non-zero elements if it
+    is sparse"""
+    data = sample.get_input()[0]
+    return data.nnz if isinstance(data, SparseVector) else len(data)
+
+
+def bounded_imap(pool, function, tasks, max_pending):
+    """Like pool.imap, but only max_pending tasks are given to the workers ahead of the results consumed.
+
+    pool.imap sends all the tasks at once, so the workers compute every result (e.g. a whole epoch) and they pile up in
+    this process if they are consumed slower. Here, a new task is sent each time a result is consumed.
+
+    Args:
+        pool (multiprocessing.Pool): The pool of worker processes
+        function (callable): Module level function called with each task
+        tasks (iterable): The tasks, consumed as they are sent
+        max_pending (int): Maximum number of tasks sent and not consumed yet
+
+    Yields:
+        The result of each task, in order
+    """
+
+    tasks = iter(tasks)
+    pending = deque(pool.apply_async(function, (task,)) for task in itertools.islice(tasks, max(max_pending, 1)))
+    while pending:
+        result = pending.popleft().get()
+        for task in itertools.islice(tasks, 1):
+            pending.append(pool.apply_async(function, (task,)))
+        yield result
+
+
+def bucket_ids(sizes, num_buckets=10, boundaries=None):
+    """Assigns each size to a bucket of similar sizes.
+
+    Args:
+        sizes (numpy.ndarray): The size of each sample
+        num_buckets (int): Number of buckets when no boundaries are given. Their boundaries are the quantiles of the
+            sizes, so that all the buckets have about the same number of samples
+        boundaries (list[int]): Sorted sizes where each bucket ends. Bucket i holds the sizes from boundaries[i - 1]
+            (included) to boundaries[i] (excluded), and the last bucket the sizes from the last boundary
+
+    Returns:
+        numpy.ndarray: The bucket of each size
+    """
+
+    if boundaries is None:
+        quantiles = np.linspace(0, 100, num_buckets + 1)[1:-1]
+        boundaries = np.unique(np.percentile(sizes, quantiles)) if len(sizes) else []
+    return np.searchsorted(np.asarray(boundaries), sizes, side='right')
+
+
+def bucketed_batch_generator(dataset, batch_size, size=None, num_buckets=10, boundaries=None, shuffle=True,
+                             pad=False, pad_value=0, normalizer=None):
+    """Generates endlessly batches of samples of similar size, so that padding them wastes as little as possible.
+
+    The samples are grouped into buckets by size (see bucket_ids) once, and each epoch is made of batches of a single
+    bucket. With shuffle, the samples are shuffled within each bucket and the batches are shuffled across buckets on
+    every epoch. Smaller batches are only made with the last samples of each bucket.
+
+    Args:
+        dataset (dframe.dataset.dataset.Dataset): The dataset to get the samples from
+        batch_size (int): Maximum number of samples of each batch
+        size (callable): Function that returns the size of a sample. By default, the length of its first input (see
+            sample_size)
+        num_buckets (int): Number of buckets, see bucket_ids
+        boundaries (list[int]): Bucket boundaries, see bucket_ids
+        shuffle (bool): Whether to shuffle the samples within and the batches across buckets on each epoch
+        pad (bool): If true, each input and output is returned as an array padded to the maximum length of the batch
+            (see PaddingBuffers), and the sizes of the samples are returned too. Sparse inputs are not padded
+        pad_value: The value of the padded elements
+        normalizer (dframe.dataset.statistics.Normalizer): If given, the inputs of each batch are normalized with it
+            (before padding them)
+
+    Yields:
+        tuple: The inputs and outputs of each batch, like dframe.dataset.dataset.Dataset.batch_generator. With pad,
+            also an array with the length of each input of the batch before padding
+    """
+
+    size = size or sample_size
+    sizes = np.array([size(sample) for sample in dataset])
+    buckets = bucket_ids(sizes, num_buckets, boundaries)
+    bucket_positions = [np.flatnonzero(buckets == bucket) for bucket in np.unique(buckets)]
+    buffers = PaddingBuffers(pad_value) if pad else None
+
+    while True:
+        batches = []
+        for positions in bucket_positions:
+            if shuffle:
+                positions = np.random.permutation(positions)
+            batches.extend(positions[start:start + batch_size] for start in xrange(0, len(positions), batch_size))
+        if shuffle:
+            batches = [batches[idx] for idx in np.random.permutation(len(batches))]
+
+        for positions in batches:
+            batch = dataset.view(positions)
+            inputs = batch.get_input(axis_samples=False)
+            if normalizer is not None:
+                inputs = normalizer.normalize(inputs)
+            inputs = assemble_sparse_columns(inputs)
+            outputs = batch.get_output(axis_samples=False)
+            if buffers is None:
+                yield inputs, outputs
+            else:
+                yield (buffers.pad_columns('input', inputs), buffers.pad_columns('output', outputs),
+                       sizes[positions])
+
+
+class PaddingBuffers(object):
+    """Pre-allocated arrays that batches are padded into, reused from one batch to the next.
+
+    Each input/output has its own buffer, which only grows when a batch does not fit in it. The padded arrays are
+    views of the buffers, so they are overwritten by the next batch: copy them if they must outlive it.
+    """
+
+    def __init__(self, pad_value=0):
+        self.pad_value = pad_value
+        self._buffers = {}
+
+    def pad_columns(self, name, columns):
+        """Pads each column (the data of an input/output for all the samples of a batch) into an array. Sparse columns
+        (dframe.dataset.sparse.CSRBatch) are returned as they are"""
+        return [column if isinstance(column, CSRBatch) else self.pad('{}{}'.format(name, idx), column)
+                for idx, column in enumerate(columns)]
+
+    def pad(self, key, items):
+        """Returns an array with the items padded to the maximum length among them along their first axis.
+
+        Scalar items are just stacked.
+        """
+
+        items = [np.asarray(item) for item in items]
+        if not items or items[0].ndim == 0:
+            return np.array(items)
+
+        max_length = max(len(item) for item in items)
+        shape = (len(items), max_length) + items[0].shape[1:]
+        padded = self._get_buffer(key, shape, np.result_type(*items))
+        padded.fill(self.pad_value)
+        for row, item in zip(padded, items):
+            row[:len(item)] = item
+        return padded
+
+    def _get_buffer(self, key, shape, dtype):
+        buffer = self._buffers.get(key)
+        if buffer is None or buffer.dtype != dtype or buffer.ndim != len(shape) or \
+                any(available < needed for available, needed in zip(buffer.shape, shape)):
+            allocated = shape
+            if buffer is not None and buffer.ndim == len(shape):
+                # Grow to fit both the previous batches and this one, so that the buffer is not reallocated again
+                allocated = tuple(max(available, needed) for available, needed in zip(buffer.shape, shape))
+            buffer = np.empty(allocated, dtype)
+            self._buffers[key] = buffer
+        return buffer[tuple(slice(0, dim) for dim in shape)]
@@ -1,45 +1,223 @@
+import copy
+import inspect
 import random
+from collections import Counter
 
+import numpy as np
+
+from dframe.dataset.batching import bucketed_batch_generator
+from dframe.dataset.dedup import sample_digests, find_duplicates, unique_positions
+from dframe.dataset.instrumentation import memory_report
+from dframe.dataset.quantization import quantize_samples
 from dframe.dataset.sample import IO
+from dframe.dataset.sampling import sampled_batch_generator
+from dframe.dataset.schema import Schema
+from dframe.dataset.sparse import assemble_sparse_columns
+from dframe.dataset.split import split_indices, stratified_split_indices, k_fold_indices
+from dframe.dataset.view import SampleSequence, ConcatenatedSamples, IndexedSamples, IndexRange, as_indices
 
 
 class Dataset(IO):
-    """Class representing a dataset that holds its information as a list of samples."""
+    """Class representing a dataset that holds its information as a list of samples.
+
+    A dataset can optionally have a schema (dframe.dataset.schema.Schema) describing its samples. Then, the samples
+    added to it are validated against the schema and their data is formatted without inspecting them.
+
+    A dataset can also have an index of its samples (see build_index) for constant time lookups and removals in bulk.
+
+    Datasets can be views of other datasets (see view, concat and the + operator): they show the samples of those
+    without copying them. The samples shown by a view are the ones the datasets had when it was created, as a dataset
+    with views copies its list of samples before modifying it (copy on write). Likewise, modifying a view turns it into
+    a regular dataset with its own list, without modifying the datasets it comes from.
+    """
 
-    def __init__(self, samples=None):
+    def __init__(self, samples=None, schema=None):
         """The samples parameter should be a list of dframe.dataset.sample.Sample instances or
-        instances of subclasses"""
+        instances of subclasses. If a schema is given, all the samples are validated against it"""
 
         if samples:
-            if not isinstance(samples, list):
+            if not isinstance(samples, (list, SampleSequence)):
                 raise TypeError('The parameter samples must be a list or a subclass of list')
             self._samples = samples
         else:
             self._samples = []
+        self._samples_shared = False    # Whether some view holds the list of samples
+
+        self._schema = None
+        if schema is not None:
+            self.set_schema(schema)
+
+        self._index = None          # Key -> samples with that key (in insertion order)
+        self._index_key = None
 
     def get_samples(self):
+        """Returns the list of samples.
+
+        In a view (e.g. the result of +), the list is created on each call, so modifying it does not modify the view. Use
+        add and remove to modify a dataset.
+        """
+        if isinstance(self._samples, SampleSequence):
+            return list(self._samples)
         return self._samples
 
+    def is_view(self):
+        return isinstance(self._samples, SampleSequence)
+
+    def view(self, selection):
+        """Returns a dataset with the samples of this one in the given positions, without copying them.
+
+        Args:
+            selection: A slice (e.g. slice(100, 200)), which takes constant time and memory, or a sequence/array of
+                positions (which can be repeated and in any order)
+        """
+
+        indices = as_indices(selection, self.len())
+        view = Dataset(IndexedSamples(self._share_samples(), indices))
+        view._schema = self._schema
+        return view
+
+    @staticmethod
+    def concat(datasets):
+        """Returns a dataset with the samples of all the given datasets, without copying them"""
+        datasets = list(datasets)
+        try:
+            samples = ConcatenatedSamples([dataset._share_samples() for dataset in datasets])
+        except AttributeError:
+            raise TypeError('Only datasets (dframe.dataset.dataset.Dataset) can be concatenated')
+        schemas = set(id(dataset.get_schema()) for dataset in datasets)
+        view = Dataset(samples)
+        if len(schemas) == 1:
+            view._schema = datasets[0].get_schema()
+        return view
+
+    def get_labels(self, key=None):
+        """Returns the class of each sample, as used by the stratified splits and samplers.
+
+        Args:
+            key (callable): Function that returns the class of a sample (any hashable). By default, the output data of
+                the sample flattened into a tuple (so that array outputs, e.g. one-hot labels, are hashable)
+        """
+
+        key = key or _output_label
+        return [key(sample) for sample in self._samples]
+
+    def split(self, fractions, shuffle=True, seed=None):
+        """Splits the dataset into views (e.g. train, validation and test) that share the samples of this one.
+
+        Args:
+            fractions (list[float]): Fraction of samples of each view, e.g. (0.8, 0.1, 0.1). They must add up to 1 at
+                most. If they add up to less than 1, the remaining samples are left out
+            shuffle (bool): Whether to assign the samples to the views randomly or keep their order
+            seed (int): Seed of the shuffling. The same seed on the same dataset always gives the same split
+
+        Returns:
+            list[Dataset]: A view for each fraction
+        """
+
+        return [self.view(indices) for indices in split_indices(self.len(), fractions, shuffle, seed)]
+
+    def stratified_split(self, fractions, key=None, seed=None):
+        """Splits the dataset into views so that each of them has the same proportion of samples of each class.
+
+        Args:
+            fractions (list[float]): Fraction of samples of each view (see split)
+            key (callable): Function that returns the class of a sample (any hashable). By default, the output data of
+                the sample flattened into a tuple (so that array outputs, e.g. one-hot labels, are hashable)
+            seed (int): Seed of the shuffling, for reproducible splits
+
+        Returns:
+            list[Dataset]: A view for each fraction
+        """
+
+        labels = self.get_labels(key)
+        return [self.view(indices) for indices in stratified_split_indices(labels, fractions, seed)]
+
+    def k_fold(self, k, shuffle=True, seed=None, key=None):
+        """Generates the train and validation views of k-fold cross-validation.
+
+        Args:
+            k (int): Number of folds. Each sample is in the validation view of exactly one fold
+            shuffle (bool): Whether to shuffle the samples before making the folds
+            seed (int): Seed of the shuffling, for reproducible folds
+            key (callable): If given, the folds are stratified by the class this function returns for each sample
+
+        Yields:
+            tuple(Dataset, Dataset): The train and validation views of each fold
+        """
+
+        labels = self.get_labels(key) if key is not None else None
+        for train, validation in k_fold_indices(self.len(), k, shuffle, seed, labels):
+            yield self.view(train), self.view(validation)
+
+    def get_schema(self):
+        return self._schema
+
+    def set_schema(self, schema, validate=True):
+        """Sets the schema of the dataset, validating all its samples against it unless validate is False.
+
+        Use validate=False only when the samples are known to match the schema (e.g. they have been created from
+        homogeneous arrays), as it is the costly part. Passing None removes the schema.
+        """
+
+        if schema is not None and validate:
+            schema.validate_all(self._samples)
+        self._schema = schema
+
+    def infer_schema(self):
+        """Infers the schema from the first sample, validates the rest against it and sets it as the dataset schema.
+
+        The inferred schema is returned.
+        """
+
+        if not self._samples:
+            raise ValueError('The schema cannot be inferred from an empty dataset')
+        schema = Schema.infer(self._samples[0])
+        self.set_schema(schema)
+        return schema
+
     def add(self, samples):
-        """Add a single sample or a list of them"""
+        """Add a single sample or a list of them.
+
+        If the dataset has a schema, nothing is added unless all the samples match it.
+        """
 
         if not samples:
             return
 
         try:
             # samples is a collection (actually an Iterable)
-            self._samples.extend(samples)
+            samples = list(samples)
         except TypeError:
             # samples is a single item (or not Iterable)
-            self._samples.append(samples)
+            samples = [samples]
+
+        if self._schema is not None:
+            self._schema.validate_all(samples)
+        self._own_samples()
+        self._samples.extend(samples)
+        if self._index is not None:
+            for sample in samples:
+                self._index.setdefault(self._index_key(sample), []).append(sample)
 
     def remove(self, samples):
         """Remove a single sample or a list of them. If the sample/s is not found, an exception will be raised.
 
         If you are removing a list of samples and one of them is not present in the dataset, all the previous samples
         before that one will be effectively erased.
+
+        If the dataset has an index, the removal is done in a single pass whatever the number of samples removed, and
+        nothing is removed if any of them is not found. Samples are then matched by their index key.
         """
 
+        if self._index is not None:
+            try:
+                samples = list(samples)
+            except TypeError:
+                samples = [samples]
+            self._remove_indexed(samples)
+            return
+
+        self._own_samples()
         try:
             # Samples is a collection
             for sample in samples:
@@ -48,8 +226,88 @@ class Dataset(IO):
             # Samples is a single item
             self._samples.remove(samples)
 
+    def build_index(self, key=None):
+        """Builds an index of the samples, which is kept updated as samples are added or removed through the dataset.
+
+        With the index, checking if a sample is in the dataset (sample in dataset) and finding a sample by its key
+        take constant time, and removing m samples takes O(n + m) instead of O(n * m). Insertion order is kept.
+
+        Args:
+            key (callable): Function that returns the key of a sample (any hashable). By default, the identity of the
+                sample object is used
+        """
+
+        self._index_key = key if key is not None else id
+        self._index = {}
+        for sample in self._samples:
+            self._index.setdefault(self._index_key(sample), []).append(sample)
+
+    def drop_index(self):
+        self._index = None
+        self._index_key = None
+
+    def has_index(self):
+        return self._index is not None
+
+    def find(self, key):
+        """Returns the first sample added with the given key. It requires an index. KeyError is raised if not found"""
+        if self._index is None:
+            raise EnvironmentError('The dataset has no index. Call build_index first')
+        try:
+            return self._index[key][0]
+        except KeyError:
+            raise KeyError('There is no sample with key {}'.format(key))
+
+    def find_duplicates(self, batch_size=4096):
+        """Returns the positions of the samples whose data repeats the one of an earlier sample, and the position of
+        that earlier sample. Samples are compared by a digest of their data. See dframe.dataset.dedup"""
+
+        return find_duplicates(sample_digests(self, batch_size))
+
+    def drop_duplicates(self, batch_size=4096):
+        """Returns a view with the first occurrence of the data of each sample, in the original order"""
+        return self.view(unique_positions(sample_digests(self, batch_size)))
+
+    def quantize(self, policy, batch_size=4096):
+        """Returns a dataset with the data of this one, keeping the slots of the policy
+        (dframe.dataset.quantization.QuantizationPolicy) encoded with reduced precision in memory. The data is
+        decoded transparently when requested (get_input, get_output, batch_generator)"""
+
+        return Dataset(quantize_samples(self, policy, batch_size))
+
+    def memory_report(self, max_samples=None, seed=None):
+        """Returns the bytes taken by the data of each input/output slot and by the overhead of the objects holding
+        it. For large datasets, give max_samples to measure only that many random samples and extrapolate. See
+        dframe.dataset.instrumentation.memory_report"""
+
+        return memory_report(self._samples, max_samples, seed)
+
     def shuffle(self):
-        random.shuffle(self._samples)
+        if isinstance(self._samples, SampleSequence):
+            # Shuffle the indices of the view, the samples are not copied
+            if not isinstance(self._samples, IndexedSamples):
+                self._samples = IndexedSamples(self._samples, IndexRange(0, 1, len(self._samples)))
+            self._samples = self._samples.shuffled()
+        else:
+            self._own_samples()
+            random.shuffle(self._samples)
+
+    def map(self, function):
+        """Returns a lazy transformation of the dataset that replaces each sample by function(sample).
+
+        Nothing is computed until the samples are iterated, pulled in batches or materialized. See
+        dframe.dataset.transform.TransformedDataset.
+        """
+
+        from dframe.dataset.transform import TransformedDataset
+        return TransformedDataset(self).map(function)
+
+    def filter(self, predicate):
+        """Returns a lazy transformation of the dataset that keeps only the samples for which predicate(sample) is
+        true. See map"""
+
+        from dframe.dataset.transform import TransformedDataset
+        return TransformedDataset(self).filter(predicate)
 
     def get_input(self, axis_samples=True, offset=0, num_elems=None):
         """Return the dataset input.
@@ -73,19 +331,14 @@ class Dataset(IO):
         if num_elems is not None:
             end = offset + num_elems
 
+        schema = self._schema
         try:
-            if axis_samples:
-                inputs = [sample.get_input() for sample in self._samples[offset:end]]
+            if schema is not None:
+                inputs = [sample.get_input(schema) if _takes_schema(type(sample), 'get_input') else sample.get_input()
+                          for sample in self._samples[offset:end]]
             else:
-                num_inputs = self._samples[0].num_inputs
-                inputs = [[] for _ in range(num_inputs)]
-                map(
-                    lambda idx, val: inputs[idx].append(val),
-                    [input_num for sample in self._samples[offset:end] for input_num, _ in
-                     enumerate(sample.get_input())],
-                    [sample_input for sample in self._samples[offset:end] for sample_input in sample.get_input()]
-                )
-            return inputs
+                inputs = [sample.get_input() for sample in self._samples[offset:end]]
+            return inputs if axis_samples else self._transpose(inputs)
         except AttributeError:
             raise TypeError('Some of the samples are not an instance or subclass of dframe.dataset.sample.Sample')
         except IndexError:
@@ -113,30 +366,40 @@ class Dataset(IO):
         if num_elems is not None:
             end = offset + num_elems
 
+        schema = self._schema
         try:
-            if axis_samples:
-                outputs = [sample.get_output() for sample in self._samples[offset:end]]
+            if schema is not None:
+                outputs = [sample.get_output(schema) if _takes_schema(type(sample), 'get_output')
+                           else sample.get_output() for sample in self._samples[offset:end]]
             else:
-                num_outputs = self._samples[0].num_outputs
-                outputs = [[] for _ in range(num_outputs)]
-                map(
-                    lambda idx, val: outputs[idx].append(val),
-                    [output_num for sample in self._samples[offset:end] for output_num, _ in
-                     enumerate(sample.get_output())],
-                    [sample_output for sample in self._samples[offset:end] for sample_output in sample.get_output()]
-                )
-            return outputs
+                outputs = [sample.get_output() for sample in self._samples[offset:end]]
+            return outputs if axis_samples else self._transpose(outputs)
         except AttributeError:
             raise TypeError('Some of the samples are not an instance or subclass of dframe.dataset.sample.Sample '
                             'or they do not have output')
         except IndexError:
             raise ValueError('The dataset has data inconsistency as some of it samples differ in number of outputs')
 
-    def batch_generator(self, batch_size, shuffle=True):
+    def batch_generator(self, batch_size, shuffle=True, normalizer=None):
+        """Generates endlessly batches of the inputs and outputs of the samples.
+
+        Args:
+            batch_size (int): Number of samples of each batch
+            shuffle (bool): Whether to shuffle the samples at the end of each epoch
+            normalizer (dframe.dataset.statistics.Normalizer): If given, the inputs of each batch are normalized with
+                it, getting an array for each input. The inputs must be dense
+
+        The sparse inputs (dframe.dataset.sparse.SparseVector) of each batch are assembled into a
+        dframe.dataset.sparse.CSRBatch.
+        """
+
         batch_start = 0
         while True:
             # Get and yield the batch
             inputs = self.get_input(axis_samples=False, offset=batch_start, num_elems=batch_size)
+            if normalizer is not None:
+                inputs = normalizer.normalize(inputs)
+            inputs = assemble_sparse_columns(inputs)
             outputs = self.get_output(axis_samples=False, offset=batch_start, num_elems=batch_size)
             yield (inputs, outputs)
 
@@ -148,6 +411,20 @@ class Dataset(IO):
                 if shuffle:
                     self.shuffle()
 
+    def bucketed_batch_generator(self, batch_size, size=None, num_buckets=10, boundaries=None, shuffle=True,
+                                 pad=False, pad_value=0, normalizer=None):
+        """Like batch_generator, but each batch holds samples of similar size (e.g. sequences of similar length), and
+        they can be padded into pre-allocated arrays. See dframe.dataset.batching.bucketed_batch_generator"""
+
+        return bucketed_batch_generator(self, batch_size, size, num_buckets, boundaries, shuffle, pad, pad_value,
+                                        normalizer)
+
+    def sampled_batch_generator(self, batch_size, sampler, seed=None, normalizer=None):
+        """Like batch_generator, but the samples of each batch are drawn at random with replacement by the sampler
+        (e.g. class-balanced or weighted). See dframe.dataset.sampling"""
+
+        return sampled_batch_generator(self, batch_size, sampler, seed, normalizer)
+
     def len(self):
         return len(self._samples)
 
@@ -159,10 +436,10 @@ class Dataset(IO):
             raise TypeError('The object you provided is not a Dataset (dframe.dataset.dataset.Dataset)')
 
     def __add__(self, other):
-        try:
-            return Dataset(self._samples + other.get_samples())
-        except AttributeError:
+        """Returns a dataset with the samples of both datasets in a list of its own. Use concat to get a view instead"""
+        if not isinstance(other, Dataset):
             raise TypeError('A dataset cannot be added with \'' + type(other).__name__ + '\'')
+        return Dataset(self.get_samples() + other.get_samples())
 
     def __radd__(self, other):
         if other == 0:
@@ -172,3 +449,108 @@ class Dataset(IO):
 
     def __iter__(self):
         return self._samples.__iter__()
+
+    def __contains__(self, sample):
+        if self._index is not None:
+            return self._index_key(sample) in self._index
+        return sample in self._samples
+
+    def __copy__(self):
+        """Returns a dataset of the same class with the samples, schema and index of this one, in a list (and index) of
+        its own, so that adding or removing samples from either dataset does not modify the other. The samples are not
+        copied"""
+        copied = self.__class__.__new__(self.__class__)
+        copied.__dict__.update(self.__dict__)
+        copied._samples = list(self._samples)
+        copied._samples_shared = False
+        copied._schema = copy.deepcopy(self._schema)
+        if self._index is not None:
+            copied._index = {key: list(samples) for key, samples in self._index.items()}
+        return copied
+
+    def _remove_indexed(self, samples):
+        """Removes the samples compacting the list of samples in a single pass"""
+
+        key = self._index_key
+        to_remove = Counter(key(sample) for sample in samples)
+        for sample_key, count in to_remove.items():
+            if count > len(self._index.get(sample_key, [])):
+                raise ValueError('Some of the samples to remove are not in the dataset')
+
+        kept = []
+        removed = []
+        for sample in self._samples:
+            sample_key = key(sample)
+            if to_remove[sample_key] > 0:
+                to_remove[sample_key] -= 1
+                removed.append(sample)
+            else:
+                kept.append(sample)
+        # Modify the list in place, as it may be referenced from outside (get_samples)
+        self._own_samples()
+        self._samples[:] = kept
+
+        for sample in removed:
+            sample_key = key(sample)
+            same_key = self._index[sample_key]
+            for idx, indexed in enumerate(same_key):
+                if indexed is sample:
+                    del same_key[idx]
+                    break
+            if not same_key:
+                del self._index[sample_key]
+
+    def _share_samples(self):
+        """Returns the samples to be used by a view. From now on, they are copied before being modified"""
+        self._samples_shared = True
+        return self._samples
+
+    def _own_samples(self):
+        """Makes sure that the dataset has a list of samples of its own before modifying it"""
+        if self._samples_shared or isinstance(self._samples, SampleSequence):
+            self._samples = list(self._samples)
+            self._samples_shared = False
+
+    @staticmethod
+    def _transpose(rows):
+        """Turns a list with the data of each sample into a list with the data of each input/output.
+
+        The number of inputs/outputs is taken from the first sample. IndexError is raised if a sample has more.
+        """
+
+        if not rows:
+            return []
+        columns = [[] for _ in range(len(rows[0]))]
+        for row in rows:
+            for idx, value in enumerate(row):
+                columns[idx].append(value)
+        return columns
+
+
+# Whether the get_input/get_output methods of each sample class take the schema, by class and method name
+_SCHEMA_ARGUMENT = {}
+
+
+def _takes_schema(cls, method):
+    """Returns whether the given method of a sample class takes the schema (see dframe.dataset.sample.Sample.get_input).
+
+    Subclasses of Sample may override get_input/get_output without it, so the schema is only passed to the ones that
+    accept it.
+    """
+
+    takes = _SCHEMA_ARGUMENT.get((cls, method))
+    if takes is None:
+        function = getattr(cls, method)
+        try:
+            spec = inspect.getargspec(function)
+            takes = len(spec.args) > 1 or spec.varargs is not None
+        except TypeError:
+            # Not a Python function (e.g. a builtin), whose signature cannot be inspected
+            takes = False
+        _SCHEMA_ARGUMENT[(cls, method)] = takes
+    return takes
+
+
+def _output_label(sample):
+    """Default class of a sample for the stratified splits: its output data flattened into a tuple"""
+    return tuple(value for data in sample.get_output() for value in np.ravel(data).tolist())
@@ -0,0 +1,118 @@
+import hashlib
+
+import numpy as np
+
+# Digests are 16 bytes (MD5), so accidental collisions are negligible even with billions of samples, and storing them
+# takes 16 bytes per sample whatever the size of the samples
+DIGEST_DTYPE = np.dtype('S16')
+
+# dtype kinds whose batch arrays do not have the dtype of each sample (objects for variable shapes, and strings whose
+# length is the one of the longest in the batch), so they are hashed sample by sample
+VARIABLE_KINDS = 'OSUV'
+
+# Types of the items whose array has always the same dtype, so a column of them has the dtype of each of them
+_SCALAR_TYPES = (bool, int, float, complex)
+
+
+def sample_digests(dataset, batch_size=4096):
+    """Returns an array with a digest of the formatted input and output data of each sample of the dataset.
+
+    Samples with the same data (values, dtypes and shapes) have the same digest, whatever the other samples of their
+    batch. The data is gathered batch_size samples at a time, and when the inputs/outputs of a batch have a fixed shape
+    and the dtype of each sample, they are packed into a single byte matrix in a vectorized way and each row is hashed
+    in one call.
+    """
+
+    digests = np.empty(dataset.len(), DIGEST_DTYPE)
+    for offset in xrange(0, dataset.len(), batch_size):
+        columns = dataset.get_input(axis_samples=False, offset=offset, num_elems=batch_size)
+        try:
+            columns = columns + dataset.get_output(axis_samples=False, offset=offset, num_elems=batch_size)
+        except TypeError:
+            # The samples have no outputs
+            pass
+        digests[offset:offset + batch_size] = _batch_digests(columns)
+    return digests
+
+
+def find_duplicates(digests):
+    """Finds the repeated digests in O(n log n) time, sorting them instead of comparing samples.
+
+    Args:
+        digests (numpy.ndarray): The digest of each sample (see sample_digests)
+
+    Returns:
+        tuple(numpy.ndarray, numpy.ndarray): The positions of the samples that repeat an earlier one, in ascending
+            order, and the position of the first sample they repeat
+    """
+
+    if not len(digests):
+        return np.arange(0), np.arange(0)
+
+    order = np.argsort(digests, kind='mergesort')      # Stable, so the first of each group is its first occurrence
+    sorted_digests = digests[order]
+    repeated = np.empty(len(digests), bool)
+    repeated[0] = False
+    repeated[1:] = sorted_digests[1:] == sorted_digests[:-1]
+
+    group_firsts = order[~repeated]
+    groups = np.cumsum(~repeated) - 1
+    duplicates = order[repeated]
+    originals = group_firsts[groups[repeated]]
+
+    by_position = np.argsort(duplicates)
+    return duplicates[by_position], originals[by_position]
+
+
+def unique_positions(digests):
+    """Returns the positions of the first occurrence of each digest, in ascending order"""
+    duplicates, _ = find_duplicates(digests)
+    keep = np.ones(len(digests), bool)
+    keep[duplicates] = False
+    return np.flatnonzero(keep)
+
+
+def _batch_digests(columns):
+    """Returns the digest of each sample of a batch given as the data of each input/output for all its samples.
+
+    The digest of a sample is the MD5 of the dtype and shape of each of its inputs/outputs followed by their bytes.
+    """
+
+    arrays = [np.asarray(column) for column in columns]
+    if arrays and all(array.dtype.kind not in VARIABLE_KINDS and _has_sample_dtype(column, array.dtype)
+                      for column, array in zip(columns, arrays)):
+        # Fixed shapes: one byte row per sample, made of the bytes of all its inputs/outputs
+        header = ''.join(_header(array.dtype, array.shape[1:]) for array in arrays)
+        num_samples = len(arrays[0])
+        rows = np.hstack([np.ascontiguousarray(array).reshape(num_samples, -1).view(np.uint8) for array in arrays])
+        return [hashlib.md5(header + row.tostring()).digest() for row in rows]
+
+    # Variable shapes, objects or strings: each sample is serialized on its own, into the same bytes as above
+    digests = []
+    for sample_data in zip(*columns):
+        sample_data = [np.asarray(data) for data in sample_data]
+        md5 = hashlib.md5(''.join(_header(data.dtype, data.shape) for data in sample_data))
+        for data in sample_data:
+            md5.update(data.tostring() if data.dtype != object else repr(data.tolist()))
+        digests.append(md5.digest())
+    return digests
+
+
+def _has_sample_dtype(column, dtype):
+    """Returns whether the data of each sample of the column has the given dtype (the one of the column array), which
+    is not the case when the column mixes dtypes (e.g. ints and floats are upcast to floats)"""
+
+    if isinstance(column, np.ndarray):
+        return True
+    item_types = set(type(item) for item in column)
+    if len(item_types) == 1:
+        item_type = item_types.pop()
+        if item_type in _SCALAR_TYPES or issubclass(item_type, np.generic):
+            return True
+        if item_type is np.ndarray:
+            return all(item.dtype == dtype for item in column)
+    return all(np.asarray(item).dtype == dtype for item in column)
+
+
+def _header(dtype, shape):
+    return '{}{};'.format(dtype.str, shape)
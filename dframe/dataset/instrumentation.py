@@ -0,0 +1,298 @@
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+from dframe.dataset.quantization import QuantizedValue
+from dframe.dataset.sample import Value
+
+_logger = logging.getLogger(__name__)
+
+# Callables that receive the report (a dict) of every persistence operation (see record_operation)
+_listeners = []
+_listeners_lock = threading.Lock()
+
+
+def add_listener(listener):
+    """Registers a callable that is called with the report of every save/load made by the persistence managers.
+
+    The report is a dict with the keys manager (class name), operation (save, load, append or update), path,
+    num_samples, seconds, bytes (size of the file), error (the exception raised, or None) and phases: the seconds and
+    bytes of each phase of the operation (e.g. format, write, read and build), as a dict with the keys seconds and
+    bytes. Listeners are called from the thread that makes the operation, so they should be quick. The exceptions they
+    raise are logged, they do not make the operation fail.
+    """
+    with _listeners_lock:
+        _listeners.append(listener)
+
+
+def remove_listener(listener):
+    with _listeners_lock:
+        _listeners.remove(listener)
+
+
+class OperationRecorder(object):
+    """Measures the phases of a persistence operation. Use record_operation to create it and report it"""
+
+    def __init__(self, manager, operation, path):
+        self.manager = manager
+        self.operation = operation
+        self.path = path
+        self.num_samples = None
+        self.phases = {}
+
+    @contextmanager
+    def phase(self, name):
+        """Measures the time of a phase. Its bytes are counted with add_bytes. A phase can be measured several times,
+        its seconds are added up"""
+        start = time.time()
+        try:
+            yield
+        finally:
+            self._get_phase(name)['seconds'] += time.time() - start
+
+    def add_bytes(self, name, num_bytes):
+        self._get_phase(name)['bytes'] += int(num_bytes)
+
+    def _get_phase(self, name):
+        if name not in self.phases:
+            self.phases[name] = {'seconds': 0.0, 'bytes': 0}
+        return self.phases[name]
+
+
+@contextmanager
+def record_operation(manager, operation, path):
+    """Measures a persistence operation and reports it to the listeners once it is done (even if it fails).
+
+    Yields an OperationRecorder to measure its phases.
+    """
+
+    recorder = OperationRecorder(type(manager).__name__, operation, path)
+    start = time.time()
+    error = None
+    try:
+        yield recorder
+    except Exception as e:
+        error = e
+        raise
+    finally:
+        with _listeners_lock:
+            listeners = list(_listeners)
+        if listeners:
+            report = {
+                'manager': recorder.manager,
+                'operation': recorder.operation,
+                'path': recorder.path,
+                'num_samples': recorder.num_samples,
+                'seconds': time.time() - start,
+                'bytes': os.path.getsize(path) if os.path.isfile(path) else None,
+                'error': error,
+                'phases': recorder.phases,
+            }
+            for listener in listeners:
+                # A failing listener must not break the operation nor hide the exception raised by it
+                try:
+                    listener(report)
+                except Exception:
+                    _logger.exception('Error in a listener of the %s of %s', operation, path)
+
+
+class IOStatistics(object):
+    """Listener that accumulates the persistence operations reported, to be read by a metrics system.
+
+    Register it with add_listener. The totals are kept per manager and operation, and per phase.
+    """
+
+    def __init__(self):
+        self._totals = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, report):
+        key = '{}.{}'.format(report['manager'], report['operation'])
+        with self._lock:
+            totals = self._totals.setdefault(key, {'count': 0, 'errors': 0, 'seconds': 0.0, 'bytes': 0,
+                                                   'num_samples': 0, 'phases': {}})
+            totals['count'] += 1
+            totals['errors'] += report['error'] is not None
+            totals['seconds'] += report['seconds']
+            totals['bytes'] += report['bytes'] or 0
+            totals['num_samples'] += report['num_samples'] or 0
+            for name, phase in report['phases'].items():
+                phase_totals = totals['phases'].setdefault(name, {'seconds': 0.0, 'bytes': 0})
+                phase_totals['seconds'] += phase['seconds']
+                phase_totals['bytes'] += phase['bytes']
+
+    def to_dict(self):
+        """Returns the totals by '<manager>.<operation>' (e.g. H5pyPersistenceManager.save): count, errors, seconds,
+        bytes, num_samples and the seconds and bytes of each phase"""
+        with self._lock:
+            return {key: dict(totals, phases={name: dict(phase) for name, phase in totals['phases'].items()})
+                    for key, totals in self._totals.items()}
+
+    def reset(self):
+        with self._lock:
+            self._totals = {}
+
+
+def memory_report(samples, max_samples=None, seed=None):
+    """Returns how much memory the given samples take, telling the data apart from the overhead of the objects.
+
+    The sizes are measured with sys.getsizeof going through the inputs/outputs of the samples, and each object is
+    counted once even if several samples hold it. The payload of an input/output is the size of its data (the buffer of
+    numpy arrays, the characters of strings, 8 bytes per number...), its overhead is the rest (object headers, lists,
+    Value instances...).
+
+    Args:
+        samples (list): The samples, a list or a dframe.dataset.view.SampleSequence
+        max_samples (int): If given and there are more samples, only this many randomly chosen ones are measured and
+            the sizes are extrapolated to all of them
+        seed (int): Seed of the random choice of the measured samples
+
+    Returns:
+        dict: The keys are num_samples, measured_samples, inputs and outputs (the payload_bytes and overhead_bytes of
+            each slot, outputs is None if the samples have none), sample_overhead_bytes (the sample objects and the
+            lists of their inputs/outputs), cache_bytes (formatted data cached by the samples), container_bytes (the
+            list of samples or the indices of a view) and total_bytes
+    """
+
+    num_samples = len(samples)
+    if max_samples is not None and num_samples > max_samples:
+        positions = np.sort(np.random.RandomState(seed).choice(num_samples, max_samples, replace=False))
+        measured = [samples[position] for position in positions]
+    else:
+        measured = list(samples)
+
+    seen = set()
+    inputs = []
+    outputs = None
+    sample_overhead = cache = 0
+    for sample in measured:
+        sample_overhead += _object_size(sample, seen)
+        _add_slot_sizes(inputs, sample.get_exact_inputs(), seen)
+        sample_outputs = sample.get_exact_outputs()
+        if sample_outputs is not None:
+            outputs = [] if outputs is None else outputs
+            _add_slot_sizes(outputs, sample_outputs, seen)
+        # Wrapping lists of the cached data (the data itself is usually the inputs/outputs, already counted)
+        for name in ('_input_data', '_output_data'):
+            cache += sum(_size(getattr(sample, name, None), seen))
+        for elems in (sample.get_exact_inputs(), sample_outputs):
+            if isinstance(elems, (list, tuple)) and id(elems) not in seen:
+                seen.add(id(elems))
+                sample_overhead += sys.getsizeof(elems)
+
+    scale = num_samples / float(len(measured)) if measured else 0.0
+    inputs = [_scale(slot, scale) for slot in inputs]
+    outputs = [_scale(slot, scale) for slot in outputs] if outputs is not None else None
+    report = {
+        'num_samples': num_samples,
+        'measured_samples': len(measured),
+        'inputs': inputs,
+        'outputs': outputs,
+        'sample_overhead_bytes': int(sample_overhead * scale),
+        'cache_bytes': int(cache * scale),
+        'container_bytes': _container_size(samples),
+    }
+    report['total_bytes'] = (sum(slot['payload_bytes'] + slot['overhead_bytes'] for slot in inputs + (outputs or [])) +
+                             report['sample_overhead_bytes'] + report['cache_bytes'] + report['container_bytes'])
+    return report
+
+
+def object_size(obj):
+    """Returns the bytes taken by an object and the objects it holds (see memory_report)"""
+    return sum(_size(obj, set()))
+
+
+def _add_slot_sizes(slots, elems, seen):
+    """Adds the sizes of the inputs/outputs of a sample to the ones of each slot, split as in Sample.get_input"""
+    if isinstance(elems, Value):
+        elems = [elems]
+    else:
+        try:
+            elems = list(elems)
+        except TypeError:
+            elems = [elems]
+    for idx, elem in enumerate(elems):
+        if idx == len(slots):
+            slots.append({'payload_bytes': 0, 'overhead_bytes': 0})
+        payload, overhead = _size(elem, seen)
+        slots[idx]['payload_bytes'] += payload
+        slots[idx]['overhead_bytes'] += overhead
+
+
+def _size(obj, seen):
+    """Returns the (payload, overhead) bytes of an object and the objects it holds that have not been seen yet"""
+
+    if obj is None or id(obj) in seen:
+        return 0, 0
+    seen.add(id(obj))
+
+    if isinstance(obj, np.ndarray):
+        # Arrays that do not own their data (views) only take their header, but their data is still their payload
+        return obj.nbytes, sys.getsizeof(obj) - (obj.nbytes if obj.flags.owndata else 0)
+    if isinstance(obj, np.generic):
+        return obj.itemsize, sys.getsizeof(obj) - obj.itemsize
+    if isinstance(obj, (bool, int, long, float, complex)):
+        payload = 1 if isinstance(obj, bool) else 16 if isinstance(obj, complex) else 8
+        return payload, sys.getsizeof(obj) - payload
+    if isinstance(obj, basestring):
+        payload = len(obj) * (1 if isinstance(obj, str) else 4)
+        return payload, max(sys.getsizeof(obj) - payload, 0)
+
+    payload = 0
+    if isinstance(obj, dict):
+        children = [item for pair in obj.items() for item in pair]
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        children = list(obj)
+    elif isinstance(obj, QuantizedValue):
+        # The encoded column is shared by the values of a batch, so each value is charged its own row of it. Counting
+        # the whole column with the first value would be extrapolated as if every measured sample had one
+        payload, children = obj.data.nbytes, [obj.index, obj.quantizer]
+    else:
+        children = [getattr(obj, name) for name in _slot_names(obj) if hasattr(obj, name)]
+        if hasattr(obj, '__dict__'):
+            children.extend(vars(obj).values())
+
+    overhead = _object_size(obj, seen)
+    for child in children:
+        child_payload, child_overhead = _size(child, seen)
+        payload += child_payload
+        overhead += child_overhead
+    return payload, overhead
+
+
+def _object_size(obj, seen):
+    """Returns the size of the object itself (and its __dict__), without the objects it holds"""
+    size = sys.getsizeof(obj)
+    if hasattr(obj, '__dict__') and not isinstance(obj, type):
+        seen.add(id(obj.__dict__))
+        size += sys.getsizeof(obj.__dict__)
+    return size
+
+
+def _slot_names(obj):
+    names = []
+    for cls in type(obj).__mro__:
+        slots = cls.__dict__.get('__slots__', ())
+        names.extend([slots] if isinstance(slots, basestring) else slots)
+    return names
+
+
+def _scale(slot, scale):
+    return {name: int(value * scale) for name, value in slot.items()}
+
+
+def _container_size(samples):
+    if isinstance(samples, list):
+        return sys.getsizeof(samples)
+    # Views only hold their indices/offsets, the samples are held by the datasets they come from
+    size = sys.getsizeof(samples)
+    for name in ('indices', 'offsets', 'sequences'):
+        value = getattr(samples, name, None)
+        if value is not None:
+            size += sys.getsizeof(value)
+    return size
@@ -1,11 +1,17 @@
 import cPickle
+import importlib
 import os
 from abc import ABCMeta, abstractmethod
 
-import h5py
+import numpy as np
 
 from dframe.dataset.dataset import Dataset
+from dframe.dataset.instrumentation import record_operation
+from dframe.dataset.quantization import QUANTIZERS, QuantizationPolicy, quantized_rows, saves_memory
 from dframe.dataset.sample import Sample
+from dframe.dataset.schema import Schema
+from dframe.dataset.sparse import SparseVector, CSRBatch, is_sparse_column
+from dframe.dataset.statistics import FeatureStatistics, RunningStats
 
 
 # noinspection PyClassHasNoInit
@@ -57,45 +63,162 @@ class H5pyPersistenceManager(PersistenceManager):
 
     Note that with this manager, only the actual data is persisted and thus the load method will not be able to create
     the dataset with its original classes. Use this for large datasets where memory is a problem.
-    Use PicklePersistenceManager if a full recovery is needed"""
+    Use PicklePersistenceManager if a full recovery is needed.
+
+    h5py is imported when the manager is first used, so importing this module does not pay for it.
+    """
 
     INPUT_DATASET_NAME = 'inputs'
     OUTPUT_DATASET_NAME = 'outputs'
+    STATISTICS_GROUP_NAME = 'statistics'
+    QUANTIZER_ATTR = 'quantizer'
+
+    def __init__(self, policy=None, store_statistics=False):
+        """Creates an H5pyPersistenceManager.
+
+        Args:
+            policy (dframe.dataset.quantization.QuantizationPolicy): If given, the datasets are saved with a HDF5
+                dataset per input/output slot (in the groups inputs and outputs), and the slots of the policy are
+                stored encoded by their quantizer. When loading, the layout and quantizers are read from the file,
+                and the quantized slots are kept encoded in memory
+            store_statistics (bool): If true, save also computes the statistics of the inputs of the dataset (which
+                must be dense) and stores them with it (see save_statistics and load_statistics)
+
+        Datasets with sparse slots (dframe.dataset.sparse.SparseVector) are always saved with a slot per HDF5 dataset.
+        Each sparse slot is stored in CSR format, as a group with the HDF5 datasets data, indices and indptr.
+        """
+        self.policy = policy
+        self.store_statistics = store_statistics
 
     def save(self, dataset, path):
         """Saves the dataset in disk using HDF5.
 
-        Only the raw data will be persisted and thus the actual objects/classes will not be recovered when loading."""
+        Only the raw data will be persisted and thus the actual objects/classes will not be recovered when loading.
+        The HDF5 datasets are chunked and resizable along the samples axis, so that samples can be appended later
+        (see append)."""
         super(H5pyPersistenceManager, self).save(dataset, path)
-        # If file exists, truncate
-        with h5py.File(path, 'w') as f:
-            # Get inputs and persist into a dataset in HDF5 root group
-            inputs = dataset.get_input()
-            f.create_dataset(self.INPUT_DATASET_NAME, data=inputs)
-            # Get output (if some) and persist into a dataset in HDf5 root gorup
-            try:
-                outputs = dataset.get_output()
-                f.create_dataset(self.OUTPUT_DATASET_NAME, data=outputs)
-            except TypeError:
-                # If there are no outputs (e.g. test dataset), do nothing
-                pass
+        with record_operation(self, 'save', path) as recorder:
+            recorder.num_samples = dataset.len()
+            # If file exists, truncate
+            with _h5py().File(path, 'w') as f:
+                if self.policy is not None or self._has_sparse_slots(dataset):
+                    self._create_slots(f, dataset, recorder)
+                else:
+                    with recorder.phase('format'):
+                        inputs = np.asarray(dataset.get_input())
+                        try:
+                            outputs = np.asarray(dataset.get_output())
+                        except TypeError:
+                            # If there are no outputs (e.g. test dataset), only the inputs are persisted
+                            outputs = None
+                    # Persist the inputs and outputs (if some) into datasets in HDF5 root group
+                    with recorder.phase('write'):
+                        recorder.add_bytes('write', self._create_rows(f, self.INPUT_DATASET_NAME, inputs))
+                        if outputs is not None:
+                            recorder.add_bytes('write', self._create_rows(f, self.OUTPUT_DATASET_NAME, outputs))
+                if self.store_statistics:
+                    with recorder.phase('statistics'):
+                        self._write_statistics(f, FeatureStatistics.compute(dataset))
+
+    def append(self, dataset, path):
+        """Adds the samples of the dataset at the end of the ones saved in path, without rewriting them.
+
+        The file is created if it does not exist. The samples must have the same structure as the saved ones (number
+        and shape of inputs, and outputs only if the saved samples have them) and data that can be stored without
+        losing precision (e.g. floats are not appended to saved ints). Nothing is written if they do not.
+        """
+
+        if not os.path.isfile(path):
+            self.save(dataset, path)
+            return
+        if not self.supports_saving(dataset):
+            raise TypeError('This persistence manager cannot save this dataset')
+
+        with record_operation(self, 'append', path) as recorder, _h5py().File(path, 'a') as f:
+            recorder.num_samples = dataset.len()
+            self._write_samples(f, dataset, self._num_saved(f), recorder)
+            # Keep the saved statistics up to date by merging the ones of the new samples
+            if self.STATISTICS_GROUP_NAME in f:
+                with recorder.phase('statistics'):
+                    statistics = self._read_statistics(f)
+                    statistics.merge(FeatureStatistics.compute(dataset))
+                    self._write_statistics(f, statistics)
+
+    def update(self, dataset, path, offset):
+        """Overwrites the saved samples from position offset on with the samples of the dataset.
+
+        Only the overwritten rows are written. The samples must all be within the ones already saved (use append to
+        add new ones) and have the same structure.
+        """
+
+        if not os.path.isfile(path):
+            raise ValueError('There is no dataset saved in {} to update'.format(path))
+        if not self.supports_saving(dataset):
+            raise TypeError('This persistence manager cannot save this dataset')
+
+        with record_operation(self, 'update', path) as recorder, _h5py().File(path, 'a') as f:
+            recorder.num_samples = dataset.len()
+            num_samples = self._num_saved(f)
+            if offset < 0 or offset + dataset.len() > num_samples:
+                raise ValueError('The samples to update ({} from position {}) are not within the {} saved ones'.format(
+                    dataset.len(), offset, num_samples))
+            if offset + dataset.len() < num_samples and self._has_sparse_file_slots(f):
+                # Rows of a sparse slot can change their number of non-zero elements, which are stored one after
+                # the other, so only the last rows can be overwritten without rewriting the following ones
+                raise ValueError('Only the last samples can be updated in files with sparse slots')
+            self._write_samples(f, dataset, offset, recorder)
+            # The statistics of the overwritten samples cannot be taken out of the saved ones
+            if self.STATISTICS_GROUP_NAME in f:
+                del f[self.STATISTICS_GROUP_NAME]
+
+    def save_statistics(self, statistics, path):
+        """Stores the statistics (dframe.dataset.statistics.FeatureStatistics) of the dataset saved in path with it.
+
+        They are then updated as samples are appended, and dropped if samples are updated.
+        """
+
+        super(H5pyPersistenceManager, self).load(path)
+        with _h5py().File(path, 'a') as f:
+            self._write_statistics(f, statistics)
+
+    def load_statistics(self, path):
+        """Returns the statistics stored with the dataset in path, or None if there are none"""
+        super(H5pyPersistenceManager, self).load(path)
+        with _h5py().File(path, 'r') as f:
+            if self.STATISTICS_GROUP_NAME not in f:
+                return None
+            return self._read_statistics(f)
 
     def load(self, path):
         """Creates a Dataset object from the data saved in HDF5 file.
 
-        The dataset will contain plain Sample objects with the raw data.
+        The dataset will contain plain Sample objects with the raw data. As they all come from the same arrays, the
+        dataset schema is set from the first one without validating the rest.
         """
 
         super(H5pyPersistenceManager, self).load(path)
-        with h5py.File(path, 'r') as f:
-            inputs = f[self.INPUT_DATASET_NAME]
-            if self.OUTPUT_DATASET_NAME in f:
-                outputs = f[self.OUTPUT_DATASET_NAME]
-                samples = [Sample(sample_input, outputs[idx]) for idx, sample_input in enumerate(inputs)]
+        with record_operation(self, 'load', path) as recorder, _h5py().File(path, 'r') as f:
+            if self._has_slots(f):
+                samples = self._load_slots(f, recorder)
             else:
-                samples = [Sample(sample_input) for sample_input in inputs]
-
-            return Dataset(samples)
+                # Read each HDF5 dataset at once, which is much faster than reading it row by row
+                with recorder.phase('read'):
+                    inputs = f[self.INPUT_DATASET_NAME][()]
+                    outputs = f[self.OUTPUT_DATASET_NAME][()] if self.OUTPUT_DATASET_NAME in f else None
+                    recorder.add_bytes('read', inputs.nbytes + (outputs.nbytes if outputs is not None else 0))
+                with recorder.phase('build'):
+                    if outputs is not None:
+                        samples = [Sample(sample_input, sample_output)
+                                   for sample_input, sample_output in zip(inputs, outputs)]
+                    else:
+                        samples = [Sample(sample_input) for sample_input in inputs]
+
+            with recorder.phase('build'):
+                dataset = Dataset(samples)
+                if samples:
+                    dataset.set_schema(Schema.infer(samples[0]), validate=False)
+            recorder.num_samples = dataset.len()
+            return dataset
 
     def supports_saving(self, dataset):
         return isinstance(dataset, Dataset)
@@ -103,6 +226,254 @@ class H5pyPersistenceManager(PersistenceManager):
     def supports_loading(self, path):
         return os.path.isfile(path)
 
+    @staticmethod
+    def _create_rows(f, name, data):
+        """Creates a HDF5 dataset with the rows of data. Returns the number of bytes written"""
+        data = np.asarray(data)
+        f.create_dataset(name, data=data, maxshape=(None,) + data.shape[1:], chunks=True)
+        return data.nbytes
+
+    def _has_slots(self, f):
+        """Returns whether the file has a HDF5 dataset per slot instead of one for all the inputs/outputs"""
+        return isinstance(f[self.INPUT_DATASET_NAME], _h5py().Group)
+
+    def _num_saved(self, f):
+        inputs = f[self.INPUT_DATASET_NAME]
+        if not self._has_slots(f):
+            return inputs.shape[0]
+        slot = inputs['0']
+        return slot['indptr'].shape[0] - 1 if isinstance(slot, _h5py().Group) else slot.shape[0]
+
+    @staticmethod
+    def _has_sparse_slots(dataset):
+        if not dataset.len():
+            return False
+        sample = next(iter(dataset))
+        try:
+            slots = sample.get_input() + sample.get_output()
+        except AttributeError:
+            # The sample has no outputs
+            slots = sample.get_input()
+        return any(isinstance(data, SparseVector) for data in slots)
+
+    def _has_sparse_file_slots(self, f):
+        if not self._has_slots(f):
+            return False
+        return any(isinstance(slot, _h5py().Group) for name in (self.INPUT_DATASET_NAME, self.OUTPUT_DATASET_NAME)
+                   if name in f for slot in f[name].values())
+
+    def _write_samples(self, f, dataset, offset, recorder):
+        """Writes the data of the samples of the dataset from position offset on, in the layout of the file.
+
+        The data of every HDF5 dataset is checked before writing any of them, so that a failing write does not leave
+        the inputs and outputs of the file with a different number of samples.
+        """
+
+        with recorder.phase('format'):
+            if self._has_slots(f):
+                inputs = dataset.get_input(axis_samples=False)
+                try:
+                    outputs = dataset.get_output(axis_samples=False)
+                except TypeError:
+                    outputs = None
+            else:
+                inputs = np.asarray(dataset.get_input())
+                try:
+                    outputs = np.asarray(dataset.get_output())
+                except TypeError:
+                    outputs = None
+
+        if (outputs is not None) != (self.OUTPUT_DATASET_NAME in f):
+            raise ValueError('The samples must have outputs if and only if the saved samples have them')
+        writes = []     # (write method, arguments) of each HDF5 dataset/sparse slot, once all of them have been checked
+        for name, data in ((self.INPUT_DATASET_NAME, inputs), (self.OUTPUT_DATASET_NAME, outputs)):
+            if data is None or not dataset.len():
+                continue
+            if not self._has_slots(f):
+                self._check_rows(f, name, data, offset)
+                writes.append((self._write_rows, (f, name, data, offset)))
+                continue
+            group = f[name]
+            if len(data) != len(group):
+                raise ValueError('The samples have {} {} but the saved ones have {}'.format(len(data), name,
+                                                                                            len(group)))
+            with recorder.phase('format'):
+                for idx, column in enumerate(data):
+                    if isinstance(group[str(idx)], _h5py().Group):
+                        batch = CSRBatch.from_vectors(column)
+                        self._check_sparse_rows(group[str(idx)], batch, offset)
+                        writes.append((self._write_sparse_rows, (group[str(idx)], batch, offset)))
+                        continue
+                    quantizer = self._read_quantizer(group[str(idx)])
+                    rows = quantizer.encode(column) if quantizer is not None else np.asarray(column)
+                    if quantizer is not None and not quantizer.represents(column, rows):
+                        raise ValueError('The {} {} have values out of the range of its {} quantizer. Save the dataset '
+                                         'again with a quantizer that covers them'.format(name, idx, quantizer.name))
+                    self._check_rows(group, str(idx), rows, offset)
+                    writes.append((self._write_rows, (group, str(idx), rows, offset)))
+
+        with recorder.phase('write'):
+            for write, args in writes:
+                recorder.add_bytes('write', write(*args))
+
+    def _create_sparse_rows(self, group, vectors):
+        batch = CSRBatch.from_vectors(vectors)
+        group.attrs['size'] = batch.shape[1]
+        return (self._create_rows(group, 'data', batch.data) + self._create_rows(group, 'indices', batch.indices) +
+                self._create_rows(group, 'indptr', batch.indptr))
+
+    def _check_sparse_rows(self, group, batch, offset):
+        """Raises ValueError if the rows of the batch (CSRBatch) cannot be written into a sparse slot from offset on"""
+
+        if batch.shape[1] != group.attrs['size']:
+            raise ValueError('The sparse vectors have size {} but the saved ones have {}'.format(batch.shape[1],
+                                                                                                group.attrs['size']))
+        start = group['indptr'][offset]
+        self._check_rows(group, 'data', batch.data, start)
+        self._check_rows(group, 'indices', batch.indices, start)
+        self._check_rows(group, 'indptr', batch.indptr[1:] + start, offset + 1)
+
+    def _write_sparse_rows(self, group, batch, offset):
+        """Writes the rows of the batch (CSRBatch) into a sparse slot from position offset on, which must be the
+        position of the last saved rows or the end"""
+
+        self._check_sparse_rows(group, batch, offset)
+        start = group['indptr'][offset]
+        num_bytes = (self._write_rows(group, 'data', batch.data, start) +
+                     self._write_rows(group, 'indices', batch.indices, start) +
+                     self._write_rows(group, 'indptr', batch.indptr[1:] + start, offset + 1))
+        # Drop the elements of the overwritten rows beyond the new ones
+        end = start + batch.nnz
+        for name in ('data', 'indices'):
+            group[name].resize(end, axis=0)
+        return num_bytes
+
+    def _create_slots(self, f, dataset, recorder):
+        """Saves the dataset with a HDF5 dataset per slot, encoding the ones of the policy"""
+
+        policy = self.policy or QuantizationPolicy()
+        with recorder.phase('format'):
+            inputs = dataset.get_input(axis_samples=False)
+            try:
+                outputs = dataset.get_output(axis_samples=False)
+            except TypeError:
+                # The samples have no outputs
+                outputs = None
+        self._create_slot_group(f, self.INPUT_DATASET_NAME, inputs, policy, policy.inputs, recorder)
+        if outputs is not None:
+            self._create_slot_group(f, self.OUTPUT_DATASET_NAME, outputs, policy, policy.outputs, recorder)
+
+    def _create_slot_group(self, f, name, columns, policy, quantizers, recorder):
+        group = f.create_group(name)
+        with recorder.phase('format'):
+            encoded, slot_quantizers = policy.encode_columns(columns, quantizers)
+        with recorder.phase('write'):
+            for idx, (data, quantizer) in enumerate(zip(encoded, slot_quantizers)):
+                if is_sparse_column(data):
+                    recorder.add_bytes('write', self._create_sparse_rows(group.create_group(str(idx)), data))
+                    continue
+                recorder.add_bytes('write', self._create_rows(group, str(idx), data))
+                if quantizer is not None:
+                    h5_dataset = group[str(idx)]
+                    h5_dataset.attrs[self.QUANTIZER_ATTR] = quantizer.name
+                    for attr, value in quantizer.get_attrs().items():
+                        h5_dataset.attrs[attr] = value
+
+    def _read_quantizer(self, h5_dataset):
+        """Returns the quantizer of a slot of the file, or None if it is not quantized"""
+        attrs = dict(h5_dataset.attrs)
+        name = attrs.pop(self.QUANTIZER_ATTR, None)
+        if name is None:
+            return None
+        return QUANTIZERS[name].from_attrs({str(attr): value for attr, value in attrs.items()})
+
+    def _load_slots(self, f, recorder):
+        inputs = self._load_slot_group(f[self.INPUT_DATASET_NAME], recorder)
+        outputs = None
+        if self.OUTPUT_DATASET_NAME in f:
+            outputs = self._load_slot_group(f[self.OUTPUT_DATASET_NAME], recorder)
+        with recorder.phase('build'):
+            if outputs is None:
+                return [Sample(sample_inputs) for sample_inputs in inputs]
+            return [Sample(sample_inputs, sample_outputs) for sample_inputs, sample_outputs in zip(inputs, outputs)]
+
+    def _load_slot_group(self, group, recorder):
+        """Returns the inputs/outputs of each sample, keeping the quantized slots encoded"""
+        columns = []
+        for idx in range(len(group)):
+            slot = group[str(idx)]
+            if isinstance(slot, _h5py().Group):
+                with recorder.phase('read'):
+                    batch = CSRBatch(slot['data'][()], slot['indices'][()], slot['indptr'][()], slot.attrs['size'])
+                    recorder.add_bytes('read', batch.data.nbytes + batch.indices.nbytes + batch.indptr.nbytes)
+                with recorder.phase('build'):
+                    columns.append([batch.row(row) for row in xrange(batch.shape[0])])
+            else:
+                with recorder.phase('read'):
+                    columns.append(slot[()])
+                    recorder.add_bytes('read', columns[-1].nbytes)
+        quantizers = [self._read_quantizer(group[str(idx)]) for idx in range(len(group))]
+        with recorder.phase('build'):
+            for idx, (column, quantizer) in enumerate(zip(columns, quantizers)):
+                # Slots that take more memory quantized (e.g. scalars) are decoded right away
+                if quantizer is not None and not saves_memory(quantizer.decode(column[:1]), quantizer):
+                    columns[idx], quantizers[idx] = quantizer.decode(column), None
+            return quantized_rows(columns, quantizers)
+
+    def _write_statistics(self, f, statistics):
+        if self.STATISTICS_GROUP_NAME in f:
+            del f[self.STATISTICS_GROUP_NAME]
+        group = f.create_group(self.STATISTICS_GROUP_NAME)
+        for idx, stats in enumerate(statistics.inputs or []):
+            stats_group = group.create_group(str(idx))
+            stats_group.attrs['count'] = stats.count
+            for name in ('mean', 'm2', 'min', 'max'):
+                stats_group.create_dataset(name, data=getattr(stats, name))
+
+    def _read_statistics(self, f):
+        group = f[self.STATISTICS_GROUP_NAME]
+        inputs = []
+        for idx in range(len(group)):
+            stats_group = group[str(idx)]
+            inputs.append(RunningStats(int(stats_group.attrs['count']), stats_group['mean'][()],
+                                       stats_group['m2'][()], stats_group['min'][()], stats_group['max'][()]))
+        return FeatureStatistics(inputs or None)
+
+    @staticmethod
+    def _check_rows(f, name, rows, offset):
+        """Raises ValueError if the rows cannot be written into the HDF5 dataset from offset on"""
+
+        h5_dataset = f[name]
+        if not len(rows):
+            return
+        if rows.shape[1:] != h5_dataset.shape[1:]:
+            raise ValueError('The {} have shape {} but the saved ones have {}'.format(name, rows.shape[1:],
+                                                                                      h5_dataset.shape[1:]))
+        if not np.can_cast(rows.dtype, h5_dataset.dtype, 'same_kind'):
+            raise ValueError('The {} have dtype {}, which cannot be stored as the saved {}'.format(name, rows.dtype,
+                                                                                                 h5_dataset.dtype))
+        if not np.can_cast(rows.dtype, h5_dataset.dtype, 'safe') and not _fits(rows, h5_dataset.dtype):
+            raise ValueError('Some of the {} overflow or are truncated when stored as the saved {}'.format(
+                name, h5_dataset.dtype))
+        if offset + len(rows) > h5_dataset.shape[0] and h5_dataset.maxshape[0] is not None:
+            raise ValueError('The {} of the file cannot grow. Save the dataset again to make them '
+                             'resizable'.format(name))
+
+    @classmethod
+    def _write_rows(cls, f, name, rows, offset):
+        """Writes the rows into the HDF5 dataset from offset on, growing it if needed. Returns the number of bytes
+        written"""
+
+        cls._check_rows(f, name, rows, offset)
+        if not len(rows):
+            return 0
+        h5_dataset = f[name]
+        end = offset + len(rows)
+        if end > h5_dataset.shape[0]:
+            h5_dataset.resize(end, axis=0)
+        h5_dataset[offset:end] = rows
+        return rows.nbytes
+
 
 # noinspection PyClassHasNoInit
 class PicklePersistenceManager(PersistenceManager):
@@ -114,16 +485,90 @@ class PicklePersistenceManager(PersistenceManager):
 
     def save(self, dataset, path):
         super(PicklePersistenceManager, self).save(dataset, path)
-        with open(path, 'w') as f:
-            cPickle.dump(dataset, f)
+        with record_operation(self, 'save', path) as recorder:
+            recorder.num_samples = dataset.len()
+            with recorder.phase('write'), open(path, 'w') as f:
+                cPickle.dump(dataset, f)
+            recorder.add_bytes('write', os.path.getsize(path))
 
     def load(self, path):
         super(PicklePersistenceManager, self).load(path)
-        with open(path) as f:
-            return cPickle.load(f)
+        with record_operation(self, 'load', path) as recorder:
+            with recorder.phase('read'), open(path) as f:
+                dataset = cPickle.load(f)
+            recorder.add_bytes('read', os.path.getsize(path))
+            recorder.num_samples = dataset.len() if isinstance(dataset, Dataset) else None
+            return dataset
 
     def supports_saving(self, dataset):
         return isinstance(dataset, Dataset)
 
     def supports_loading(self, path):
         return os.path.isfile(path)
+
+
+# Persistence managers by name, given as 'module:class' paths so that a backend, and the libraries it needs, are only
+# imported when it is first used (see get_persistence_manager). New backends are added with
+# register_persistence_manager
+PERSISTENCE_MANAGERS = {
+    'h5py': 'dframe.dataset.persistence:H5pyPersistenceManager',
+    'pickle': 'dframe.dataset.persistence:PicklePersistenceManager',
+    'sharded': 'dframe.dataset.sharding:ShardedPersistenceManager',
+}
+
+
+def register_persistence_manager(name, target):
+    """Registers a persistence manager under the given name.
+
+    Args:
+        name (str): Name of the persistence manager, e.g. the one given in the configuration of a project
+        target (str|type): The PersistenceManager subclass, or its path as 'module:class' to import it lazily
+    """
+
+    if not isinstance(target, basestring):
+        if not (isinstance(target, type) and issubclass(target, PersistenceManager)):
+            raise TypeError('The persistence manager must be a PersistenceManager subclass or its module:class path')
+    elif ':' not in target:
+        raise ValueError('The persistence manager path must be given as module:class')
+    PERSISTENCE_MANAGERS[name] = target
+
+
+def get_persistence_manager_class(name):
+    """Returns the persistence manager class registered with the given name, importing its module if needed"""
+
+    if name not in PERSISTENCE_MANAGERS:
+        raise ValueError('Unknown persistence manager {}. Registered ones are {}'.format(name,
+                                                                                        sorted(PERSISTENCE_MANAGERS)))
+    target = PERSISTENCE_MANAGERS[name]
+    if isinstance(target, basestring):
+        module_name, class_name = target.split(':', 1)
+        target = getattr(importlib.import_module(module_name), class_name)
+        PERSISTENCE_MANAGERS[name] = target
+    return target
+
+
+def get_persistence_manager(name, *args, **kwargs):
+    """Returns a new instance of the persistence manager registered with the given name, created with the given
+    arguments"""
+    return get_persistence_manager_class(name)(*args, **kwargs)
+
+
+def _fits(values, dtype):
+    """Returns whether the values (an array) keep their value when cast to dtype, of the same kind as theirs.
+
+    Floats and complex numbers must stay finite, but may lose precision (e.g. float64 values saved as float32). Any
+    other value must be exactly the same.
+    """
+
+    with np.errstate(over='ignore', invalid='ignore'):
+        stored = values.astype(dtype)
+        if dtype.kind in 'fc':
+            return np.array_equal(np.isfinite(values), np.isfinite(stored))
+        return np.array_equal(stored.astype(values.dtype), values)
+
+
+def _h5py():
+    """Returns the h5py module, which is imported the first time it is needed so that importing this module does not
+    pay for it"""
+    import h5py
+    return h5py
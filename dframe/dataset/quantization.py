@@ -0,0 +1,261 @@
+import sys
+from abc import ABCMeta, abstractmethod
+
+import numpy as np
+
+from dframe.dataset.sample import Sample, Value
+
+
+# noinspection PyClassHasNoInit
+class Quantizer:
+    """Interface like class for the storage codecs of an input/output slot: they encode its data into a smaller dtype
+    (in memory and on disk) and decode it back when the data is used.
+
+    Quantizers are vectorized: they encode and decode the data of a whole batch (first axis) as well as of a single
+    sample.
+    """
+
+    __metaclass__ = ABCMeta
+
+    # Name of the quantizer in the persistence files (see QUANTIZERS)
+    name = None
+
+    @abstractmethod
+    def encode(self, values):
+        pass
+
+    @abstractmethod
+    def decode(self, data):
+        pass
+
+    def represents(self, values, data):
+        """Returns whether the encoded data (encode(values)) keeps the values within the precision of the quantizer,
+        that is, whether none of them is out of its range"""
+        return True
+
+    def get_attrs(self):
+        """Returns the parameters of the quantizer, which are persisted with the encoded data"""
+        return {}
+
+    @classmethod
+    def from_attrs(cls, attrs):
+        return cls(**attrs)
+
+
+class Float16Quantizer(Quantizer):
+    """Stores floats with half precision (2 bytes) and decodes them as float32"""
+
+    name = 'float16'
+
+    def encode(self, values):
+        return np.asarray(values, np.float16)
+
+    def decode(self, data):
+        return np.asarray(data, np.float32)
+
+    def represents(self, values, data):
+        # Values beyond the float16 range become inf
+        return np.array_equal(np.isfinite(np.asarray(values, np.float64)), np.isfinite(data))
+
+
+class Int8Quantizer(Quantizer):
+    """Stores floats as int8 (1 byte) mapping them linearly, value = code * scale + offset, and decodes them as float32.
+
+    Values outside offset +- 127 * scale are clipped (appending them to a saved file raises ValueError instead). Use
+    fit or from_statistics to cover the range of the data.
+    """
+
+    name = 'int8'
+
+    def __init__(self, scale=1.0, offset=0.0):
+        """Creates an Int8Quantizer. scale and offset can be arrays, with a scale and offset per element"""
+        self.scale = np.asarray(scale, np.float32)
+        self.offset = np.asarray(offset, np.float32)
+        if (self.scale <= 0).any():
+            raise ValueError('The scale must be positive')
+
+    @classmethod
+    def fit(cls, values):
+        """Returns the quantizer covering the range of the values of a batch, element wise"""
+        values = np.asarray(values)
+        return cls._from_range(values.min(axis=0), values.max(axis=0))
+
+    @classmethod
+    def from_statistics(cls, stats):
+        """Returns the quantizer covering the range of an input given its dframe.dataset.statistics.RunningStats, so
+        that the data does not need to be gone through again"""
+        return cls._from_range(stats.min, stats.max)
+
+    def encode(self, values):
+        codes = np.round((np.asarray(values, np.float32) - self.offset) / self.scale)
+        return np.clip(codes, -127, 127).astype(np.int8)
+
+    def decode(self, data):
+        return np.asarray(data, np.float32) * self.scale + self.offset
+
+    def represents(self, values, data):
+        # Clipped values are decoded more than a step (scale) away from them
+        return bool(np.all(np.abs(self.decode(data) - np.asarray(values, np.float32)) <= self.scale))
+
+    def get_attrs(self):
+        return {'scale': self.scale, 'offset': self.offset}
+
+    @classmethod
+    def _from_range(cls, minimum, maximum):
+        minimum = np.asarray(minimum, np.float32)
+        maximum = np.asarray(maximum, np.float32)
+        # Constant elements get scale 1, so that they are encoded as 0 and decoded exactly
+        scale = np.where(maximum > minimum, (maximum - minimum) / 254.0, 1.0)
+        return cls(scale, (maximum + minimum) / 2.0)
+
+
+class BitPackQuantizer(Quantizer):
+    """Stores booleans as bits (8 per byte) along their last axis and decodes them as bool arrays"""
+
+    name = 'bitpack'
+
+    def __init__(self, length=None):
+        """Creates a BitPackQuantizer.
+
+        Args:
+            length (int): Length of the last axis of the data. By default, it is taken from the first data encoded
+        """
+        self.length = length
+
+    def encode(self, values):
+        values = np.asarray(values, bool)
+        if self.length is None:
+            self.length = values.shape[-1]
+        elif values.shape[-1] != self.length:
+            raise ValueError('The data has length {} but the quantizer {}'.format(values.shape[-1], self.length))
+        return np.packbits(values, axis=-1)
+
+    def decode(self, data):
+        if self.length is None:
+            raise ValueError('The quantizer does not know the length of the data. Encode some data first')
+        return np.unpackbits(np.asarray(data, np.uint8), axis=-1)[..., :self.length].astype(bool)
+
+    def get_attrs(self):
+        return {'length': self.length}
+
+
+# Quantizers by their name, used to recover them from the persistence files
+QUANTIZERS = {quantizer.name: quantizer for quantizer in (Float16Quantizer, Int8Quantizer, BitPackQuantizer)}
+
+
+class QuantizedValue(Value):
+    """Value holding the encoded data of an input/output, which is decoded by its quantizer when requested.
+
+    The encoded data of the samples of a batch is kept in a single array (column), shared by their values, so that
+    each value only holds its position in it instead of an array of its own.
+    """
+
+    __slots__ = ('column', 'index', 'quantizer')
+
+    def __init__(self, column, index, quantizer):
+        self.column = column
+        self.index = index
+        self.quantizer = quantizer
+
+    @property
+    def data(self):
+        """The encoded data of the value"""
+        return self.column[self.index]
+
+    def get_data(self):
+        return self.quantizer.decode(self.column[self.index])
+
+
+class QuantizationPolicy(object):
+    """Quantizer of each input/output slot that is stored with reduced precision. The rest are stored as they are"""
+
+    def __init__(self, inputs=None, outputs=None):
+        """Creates a QuantizationPolicy.
+
+        Args:
+            inputs (dict): Quantizer (Quantizer) of each input slot, by its position
+            outputs (dict): Quantizer of each output slot, by its position
+        """
+        self.inputs = dict(inputs or {})
+        self.outputs = dict(outputs or {})
+
+    def encode_columns(self, columns, quantizers):
+        """Returns the columns (the data of each slot for all the samples of a batch) with the quantized ones
+        encoded into arrays, and the quantizer of each column (None for the ones stored as they are)"""
+
+        slot_quantizers = [quantizers.get(idx) for idx in range(len(columns))]
+        encoded = [quantizer.encode(column) if quantizer is not None else column
+                   for column, quantizer in zip(columns, slot_quantizers)]
+        return encoded, slot_quantizers
+
+
+def quantize_samples(dataset, policy, batch_size=4096):
+    """Returns new samples with the data of the samples of the dataset, holding the data of the quantized slots encoded.
+
+    The quantized slots are held by QuantizedValue instances, so the samples give the decoded data as usual (e.g. in
+    get_input and batch generation) while keeping only the encoded data in memory. Slots whose samples would take more
+    memory quantized (see saves_memory) are kept as they are.
+
+    Args:
+        dataset (dframe.dataset.dataset.Dataset): The dataset to quantize. It is not modified
+        policy (QuantizationPolicy): The quantizers of the slots
+        batch_size (int): Number of samples encoded at a time
+    """
+
+    samples = []
+    input_quantizers = output_quantizers = None
+    for offset in xrange(0, dataset.len(), batch_size):
+        inputs = dataset.get_input(axis_samples=False, offset=offset, num_elems=batch_size)
+        try:
+            outputs = dataset.get_output(axis_samples=False, offset=offset, num_elems=batch_size)
+        except TypeError:
+            outputs = None
+
+        # The slots worth quantizing are chosen from the first batch, so that all the samples are stored alike
+        if input_quantizers is None:
+            input_quantizers = _memory_saving_quantizers(inputs, policy.inputs)
+        input_rows = quantized_rows(*policy.encode_columns(inputs, input_quantizers))
+        if outputs is None:
+            samples.extend(Sample(sample_inputs) for sample_inputs in input_rows)
+        else:
+            if output_quantizers is None:
+                output_quantizers = _memory_saving_quantizers(outputs, policy.outputs)
+            output_rows = quantized_rows(*policy.encode_columns(outputs, output_quantizers))
+            samples.extend(Sample(sample_inputs, sample_outputs)
+                           for sample_inputs, sample_outputs in zip(input_rows, output_rows))
+    return samples
+
+
+def quantized_rows(columns, quantizers):
+    """Turns encoded columns (see QuantizationPolicy.encode_columns) into the list of inputs/outputs of each sample,
+    wrapping the data of the quantized ones in QuantizedValue instances that share the encoded column"""
+    # The rows are allocated with their final length, as lists grown by appending take room for more items
+    rows = [[None] * len(columns) for _ in xrange(len(columns[0]) if columns else 0)]
+    for idx, (column, quantizer) in enumerate(zip(columns, quantizers)):
+        for position, row in enumerate(rows):
+            row[idx] = column[position] if quantizer is None else QuantizedValue(column, position, quantizer)
+    return rows
+
+
+def saves_memory(column, quantizer):
+    """Returns whether the data of a slot for the samples of a batch takes less memory encoded by the quantizer (in
+    QuantizedValue instances) than as it is.
+
+    Each QuantizedValue takes some memory of its own, so slots with little data per sample (e.g. scalars) take more
+    memory quantized. The comparison is made with the first sample.
+    """
+
+    # Imported here as the memory report of dframe.dataset.instrumentation depends on this module
+    from dframe.dataset.instrumentation import object_size
+
+    if not len(column):
+        return False
+    encoded = quantizer.encode(column[:1])
+    quantized_size = sys.getsizeof(QuantizedValue(encoded, 0, quantizer)) + sys.getsizeof(len(column)) + \
+        encoded[0].nbytes
+    return quantized_size < object_size(column[0])
+
+
+def _memory_saving_quantizers(columns, quantizers):
+    return {idx: quantizer for idx, quantizer in quantizers.items()
+            if idx < len(columns) and saves_memory(columns[idx], quantizer)}
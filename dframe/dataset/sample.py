@@ -6,6 +6,7 @@ class IO:
     """Interface like class for classes that have input-output operations"""
 
     __metaclass__ = ABCMeta
+    __slots__ = ()
 
     @abstractmethod
     def get_input(self):
@@ -21,6 +22,7 @@ class Value:
     """Interface like class for all the classes that are meant to be part of a sample (input or output)"""
 
     __metaclass__ = ABCMeta
+    __slots__ = ()
 
     @abstractmethod
     def get_data(self):
@@ -29,9 +31,15 @@ class Value:
 
 
 class Sample(IO):
-    """Base class to hold the information of an example/sample in a dataset"""
+    """Base class to hold the information of an example/sample in a dataset.
 
-    def __init__(self, inputs, outputs=None):
+    Samples use __slots__ to keep their memory footprint low, as datasets usually hold millions of them. Subclasses
+    that do not define __slots__ get a __dict__ as usual.
+    """
+
+    __slots__ = ('_inputs', '_outputs', 'num_inputs', 'num_outputs', '_cache', '_input_data', '_output_data')
+
+    def __init__(self, inputs, outputs=None, cache=False):
         """Creates a sample out of its inputs and outputs.
 
         They can be either collections or single objects. For 'non-primitive' types it is recomended to use classes
@@ -43,6 +51,9 @@ class Sample(IO):
             - Sample(1, None) -> sample with a single input (with value 1)
             - Sample([1, 2, 3], None) -> sample with 3 inputs with values 1, 2 and 3 respectively
             - Sample([[1, 2, 3]], None) -> sample with a single input which is a collection of three values
+
+        If cache is True, the formatted data is computed the first time it is requested and kept, so that it is not
+        computed again in every epoch. This trades memory for time and assumes that the inputs/outputs do not change.
         """
 
         if inputs is None:
@@ -54,27 +65,56 @@ class Sample(IO):
         self.num_inputs = self._get_elems_length(inputs)
         self.num_outputs = self._get_elems_length(outputs)
 
-    def get_input(self):
+        self._cache = cache
+        self._input_data = None
+        self._output_data = None
+
+    def set_cache(self, cache):
+        """Enables or disables the caching of the formatted data. Disabling it frees the data already cached"""
+        self._cache = cache
+        if not cache:
+            self._input_data = None
+            self._output_data = None
+
+    def get_input(self, schema=None):
         """Get the formatted input, the actual data.
 
-        It will always return a list with as many items as inputs, each one holding the data of its input
+        It will always return a list with as many items as inputs, each one holding the data of its input. If the
+        sample caches its data, the same list is returned in every call, so it should not be modified.
+
+        If the schema (dframe.dataset.schema.Schema) of the sample is given, it is used to format the data without
+        inspecting the inputs.
         """
-        return self._get_data(self._inputs)
+
+        if self._input_data is not None:
+            return self._input_data
+        data = schema.format_input(self._inputs) if schema is not None else self._get_data(self._inputs)
+        if self._cache:
+            self._input_data = data
+        return data
 
     def get_exact_inputs(self):
         """Get the exact inputs that were given in creation time (in the constructor) as they are"""
         return self._inputs
 
-    def get_output(self):
+    def get_output(self, schema=None):
         """Get the formatted output, the actual data.
 
         If the sample has ouputs, it will return a list with as many items as outputs, each one holding the data of
         its output. Otherwise will raise an error as to sample do not have ouputs to get data from
+
+        If the schema (dframe.dataset.schema.Schema) of the sample is given, it is used to format the data without
+        inspecting the outputs.
         """
 
         if self._outputs is None:
             raise AttributeError('This sample has no output/s')
-        return self._get_data(self._outputs)
+        if self._output_data is not None:
+            return self._output_data
+        data = schema.format_output(self._outputs) if schema is not None else self._get_data(self._outputs)
+        if self._cache:
+            self._output_data = data
+        return data
 
     def get_exact_outputs(self):
         """Get the exact outputs that were given in creation time (in the constructor) as they are"""
@@ -85,32 +125,23 @@ class Sample(IO):
         """Obtains the data from the elements given, using the interface Value for complex items."""
 
         # If None
-        if not elems:
+        if elems is None:
             return
 
-        try:  # Collection
-            try:
-                # Collection of items extending from Value ('complex' inputs)
-                data = [i.get_data() for i in elems]
-            except AttributeError:
-                # Mixed collection with Value and non-Value objects
-                data = []
-                for item in elems:
-                    if isinstance(item, Value):
-                        data.append(item.get_data())
-                    else:
-                        data.append(item)
-        except TypeError:  # Single item
-            if isinstance(elems, Value):
-                # Value
-                # Wrap in a list to be consistent with the scenario where we have multiple elems
-                data = [elems.get_data()]
-            else:
-                # Non-Value
-                # Wrap in a list to be consistent with the scenario where we have multiple elems
-                data = [elems]
+        if isinstance(elems, Value):
+            # Single Value
+            # Wrap in a list to be consistent with the scenario where we have multiple elems
+            return [elems.get_data()]
 
-        return data
+        try:
+            items = iter(elems)
+        except TypeError:
+            # Single non-Value item
+            # Wrap in a list to be consistent with the scenario where we have multiple elems
+            return [elems]
+
+        # Collection, possibly mixing Value ('complex' inputs) and non-Value objects
+        return [item.get_data() if isinstance(item, Value) else item for item in items]
 
     @staticmethod
     def _get_elems_length(elems):
@@ -122,3 +153,18 @@ class Sample(IO):
                 length = 1
 
         return length
+
+    def __getstate__(self):
+        # Slots are not pickled by default. The cached data is not persisted, it is computed again if needed
+        state = dict(getattr(self, '__dict__', {}))
+        for name in ('_inputs', '_outputs', 'num_inputs', 'num_outputs', '_cache'):
+            state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        # The cache flag is missing in samples pickled before it existed
+        self._cache = False
+        for name, value in state.items():
+            setattr(self, name, value)
+        self._input_data = None
+        self._output_data = None
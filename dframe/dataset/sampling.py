@@ -0,0 +1,239 @@
+from abc import ABCMeta, abstractmethod
+
+import numpy as np
+
+from dframe.dataset.sparse import assemble_sparse_columns
+
+
+# noinspection PyClassHasNoInit
+class Sampler:
+    """Interface like class for the classes that draw positions of samples of a dataset at random.
+
+    The positions are drawn with replacement, each one with a probability that depends on the sampler.
+    """
+
+    __metaclass__ = ABCMeta
+
+    @abstractmethod
+    def sample(self, size, random_state=None):
+        """Returns an array with size positions drawn at random.
+
+        Args:
+            size (int): Number of positions to draw
+            random_state (numpy.random.RandomState): Source of randomness. Default is the global numpy one
+        """
+        pass
+
+    @abstractmethod
+    def __len__(self):
+        """Returns the number of positions the sampler draws from"""
+        pass
+
+
+class AliasSampler(Sampler):
+    """Sampler that draws positions proportionally to their weights in constant time (Vose's alias method).
+
+    Building the alias table takes O(n) time, and so does updating a weight, which rebuilds it. Use CumulativeSampler
+    if the weights change often.
+    """
+
+    def __init__(self, weights):
+        """Creates an AliasSampler.
+
+        Args:
+            weights (list[float]): The weight of each position. They must be non-negative and some must be positive
+        """
+
+        self._weights = _check_weights(weights)
+        self._build()
+
+    @property
+    def weights(self):
+        return self._weights.copy()
+
+    def update(self, position, weight):
+        """Changes the weight of the given position, rebuilding the alias table"""
+        weights = self._weights.copy()
+        weights[position] = weight
+        self._weights = _check_weights(weights)
+        self._build()
+
+    def sample(self, size, random_state=None):
+        random_state = random_state or np.random
+        columns = random_state.randint(0, len(self._probabilities), size)
+        coins = random_state.random_sample(size)
+        return np.where(coins < self._probabilities[columns], columns, self._aliases[columns])
+
+    def __len__(self):
+        return len(self._weights)
+
+    def _build(self):
+        num_weights = len(self._weights)
+        scaled = self._weights * num_weights / self._weights.sum()
+        self._probabilities = np.ones(num_weights)
+        self._aliases = np.arange(num_weights)
+
+        small = [idx for idx in xrange(num_weights) if scaled[idx] < 1]
+        large = [idx for idx in xrange(num_weights) if scaled[idx] >= 1]
+        while small and large:
+            less, more = small.pop(), large.pop()
+            self._probabilities[less] = scaled[less]
+            self._aliases[less] = more
+            scaled[more] -= 1 - scaled[less]
+            if scaled[more] < 1:
+                small.append(more)
+            else:
+                large.append(more)
+        # The remaining columns are full (up to rounding errors), so they never take their alias
+
+
+class CumulativeSampler(Sampler):
+    """Sampler that draws positions proportionally to their weights using a binary indexed tree (Fenwick tree) of
+    their cumulative sums.
+
+    Both drawing a position and updating a weight take O(log n) time, so it suits weights that change as the samples
+    are used (e.g. prioritized by their last loss).
+    """
+
+    def __init__(self, weights):
+        """Creates a CumulativeSampler.
+
+        Args:
+            weights (list[float]): The weight of each position. They must be non-negative and some must be positive
+        """
+
+        self._weights = _check_weights(weights)
+        # tree[i] (1-based) holds the sum of the weights of the positions (i - lowbit(i), i]
+        self._tree = np.zeros(len(self._weights) + 1)
+        self._tree[1:] = self._weights
+        for idx in xrange(1, len(self._tree)):
+            parent = idx + (idx & -idx)
+            if parent < len(self._tree):
+                self._tree[parent] += self._tree[idx]
+        # Highest power of two not greater than the number of positions, where the tree descent starts
+        self._top = 1 << (len(self._weights).bit_length() - 1)
+
+    @property
+    def weights(self):
+        return self._weights.copy()
+
+    def total(self):
+        """Returns the sum of all the weights"""
+        total = 0.0
+        idx = len(self._weights)
+        while idx > 0:
+            total += self._tree[idx]
+            idx -= idx & -idx
+        return total
+
+    def update(self, position, weight):
+        """Changes the weight of the given position"""
+        if weight < 0:
+            raise ValueError('The weights cannot be negative')
+        delta = weight - self._weights[position]
+        self._weights[position] = weight
+        idx = position + 1
+        while idx < len(self._tree):
+            self._tree[idx] += delta
+            idx += idx & -idx
+
+    def sample(self, size, random_state=None):
+        random_state = random_state or np.random
+        total = self.total()
+        if total <= 0:
+            raise ValueError('Some weight must be positive')
+        targets = random_state.random_sample(size) * total
+        return np.array([self._find(target) for target in targets], dtype=np.intp)
+
+    def __len__(self):
+        return len(self._weights)
+
+    def _find(self, target):
+        """Returns the position where the cumulative sum of the weights exceeds target"""
+        position = 0
+        step = self._top
+        while step:
+            following = position + step
+            if following < len(self._tree) and self._tree[following] <= target:
+                position = following
+                target -= self._tree[following]
+            step >>= 1
+        # Rounding errors can lead past the last position with positive weight
+        while position >= len(self._weights) or self._weights[position] == 0:
+            position -= 1
+        return position
+
+
+class StratifiedSampler(Sampler):
+    """Sampler that draws a class first and then a position of that class uniformly, so that the classes are
+    balanced (or follow the given class weights) whatever their number of samples. Draws take constant time."""
+
+    def __init__(self, labels, class_weights=None):
+        """Creates a StratifiedSampler.
+
+        Args:
+            labels (list): The class of each position (any hashable), e.g. from
+                dframe.dataset.dataset.Dataset.get_labels
+            class_weights (dict): The weight of each class. By default, all the classes are drawn equally
+        """
+
+        positions = {}
+        for position, label in enumerate(labels):
+            positions.setdefault(label, []).append(position)
+        if not positions:
+            raise ValueError('There must be some label to sample from')
+
+        self.classes = sorted(positions)
+        self._num_positions = len(labels)
+        self._class_positions = [np.array(positions[label], dtype=np.intp) for label in self.classes]
+        weights = [1.0] * len(self.classes) if class_weights is None else \
+            [class_weights.get(label, 0.0) for label in self.classes]
+        self._class_sampler = AliasSampler(weights)
+
+    def sample(self, size, random_state=None):
+        random_state = random_state or np.random
+        classes = self._class_sampler.sample(size, random_state)
+        result = np.empty(size, dtype=np.intp)
+        for class_idx in np.unique(classes):
+            draws = classes == class_idx
+            class_positions = self._class_positions[class_idx]
+            result[draws] = class_positions[random_state.randint(0, len(class_positions), draws.sum())]
+        return result
+
+    def __len__(self):
+        return self._num_positions
+
+
+def sampled_batch_generator(dataset, batch_size, sampler, seed=None, normalizer=None):
+    """Generates endlessly batches of samples of the dataset drawn by the sampler, like
+    dframe.dataset.dataset.Dataset.batch_generator.
+
+    Args:
+        dataset (dframe.dataset.dataset.Dataset): The dataset to get the samples from
+        batch_size (int): Number of samples of each batch
+        sampler (Sampler): The sampler of the positions of the dataset. It is used as it is on each batch, so updating
+            its weights affects the next batches
+        seed (int): Seed of the draws, for reproducible batches
+        normalizer (dframe.dataset.statistics.Normalizer): If given, the inputs of each batch are normalized with it
+    """
+
+    if len(sampler) != dataset.len():
+        raise ValueError('The sampler draws from {} positions but the dataset has {} samples'.format(
+            len(sampler), dataset.len()))
+
+    random_state = np.random.RandomState(seed)
+    while True:
+        batch = dataset.view(sampler.sample(batch_size, random_state))
+        inputs = batch.get_input(axis_samples=False)
+        if normalizer is not None:
+            inputs = normalizer.normalize(inputs)
+        yield assemble_sparse_columns(inputs), batch.get_output(axis_samples=False)
+
+
+def _check_weights(weights):
+    weights = np.array(weights, dtype=np.float64)
+    if weights.ndim != 1 or not len(weights):
+        raise ValueError('The weights must be a non-empty list')
+    if (weights < 0).any() or weights.sum() <= 0:
+        raise ValueError('The weights cannot be negative and some must be positive')
+    return weights
@@ -0,0 +1,197 @@
+import numpy as np
+
+from dframe.dataset.sample import Sample, Value
+from dframe.dataset.sparse import SparseVector
+
+
+# dtype kinds that are considered compatible among them (e.g. an int and a float label)
+NUMERIC_KINDS = 'biufc'
+
+
+class SlotSchema(object):
+    """Description of an input/output slot of a sample: whether it is a Value and the dtype/shape of its data.
+
+    The dimensions of the shape that differ among samples are None. The shape of a sparse slot
+    (dframe.dataset.sparse.SparseVector) is its size, which must be the same for all the samples.
+    """
+
+    __slots__ = ('is_value', 'dtype', 'shape')
+
+    def __init__(self, is_value, dtype, shape):
+        self.is_value = is_value
+        self.dtype = np.dtype(dtype)
+        self.shape = tuple(shape)
+
+    @classmethod
+    def infer(cls, item):
+        is_value = isinstance(item, Value)
+        data = item.get_data() if is_value else item
+        if isinstance(data, SparseVector):
+            return cls(is_value, data.values.dtype, (data.size,))
+        data = np.asarray(data)
+        return cls(is_value, data.dtype, data.shape)
+
+    def __repr__(self):
+        return 'SlotSchema(is_value={}, dtype={}, shape={})'.format(self.is_value, self.dtype, self.shape)
+
+
+class Schema(object):
+    """Structure of the samples of a homogeneous dataset: number, kind and dtype/shape of their inputs and outputs.
+
+    Once a dataset knows its schema, the data of its samples is formatted straight away, without inspecting the type
+    of each element of each sample, and the samples added to it are validated against the schema.
+    """
+
+    def __init__(self, input_slots, output_slots=None, inputs_collection=True, outputs_collection=True):
+        """Creates a Schema.
+
+        Args:
+            input_slots (list[SlotSchema]): The description of each input
+            output_slots (list[SlotSchema]): The description of each output. None if the samples have no outputs
+            inputs_collection (bool): Whether the inputs are given to the samples as a collection or as a single item
+            outputs_collection (bool): Whether the outputs are given to the samples as a collection or as a single item
+        """
+
+        if not input_slots:
+            raise ValueError('A schema must have some input slot')
+        if not inputs_collection and len(input_slots) != 1:
+            raise ValueError('A single item input can only have one slot')
+        if output_slots is not None and not outputs_collection and len(output_slots) != 1:
+            raise ValueError('A single item output can only have one slot')
+
+        self.input_slots = list(input_slots)
+        self.output_slots = list(output_slots) if output_slots is not None else None
+        self.inputs_collection = inputs_collection
+        self.outputs_collection = outputs_collection
+
+        # Positions of the slots holding Value objects, the only ones whose data needs to be obtained
+        self._input_values = [idx for idx, slot in enumerate(self.input_slots) if slot.is_value]
+        self._output_values = [idx for idx, slot in enumerate(self.output_slots or []) if slot.is_value]
+
+    @property
+    def num_inputs(self):
+        return len(self.input_slots)
+
+    @property
+    def num_outputs(self):
+        return len(self.output_slots) if self.output_slots is not None else 0
+
+    @classmethod
+    def infer(cls, sample):
+        """Creates the schema that describes the given sample"""
+
+        if not isinstance(sample, Sample):
+            raise TypeError('The schema can only be inferred from a dframe.dataset.sample.Sample')
+
+        inputs_collection, input_items = cls._items(sample.get_exact_inputs())
+        outputs = sample.get_exact_outputs()
+        if outputs is None:
+            outputs_collection, output_slots = True, None
+        else:
+            outputs_collection, output_items = cls._items(outputs)
+            output_slots = [SlotSchema.infer(item) for item in output_items]
+
+        return cls([SlotSchema.infer(item) for item in input_items], output_slots, inputs_collection,
+                   outputs_collection)
+
+    def validate(self, sample):
+        """Raises an exception if the sample does not match this schema.
+
+        Dimensions of the slots shapes that differ from the ones seen so far are marked as variable (None), once the
+        whole sample has been validated (the schema is left untouched if it does not match).
+        """
+        self.validate_all([sample])
+
+    def validate_all(self, samples):
+        """Raises an exception if any of the samples does not match this schema.
+
+        Like validate, but the shapes of the slots are only widened once all the samples have been validated, so the
+        schema is left untouched if any of them does not match.
+        """
+
+        slots = self.input_slots + (self.output_slots or [])
+        shapes = [slot.shape for slot in slots]
+        for sample in samples:
+            shapes = [tuple(dim if dim == sample_dim else None for dim, sample_dim in zip(shape, sample_shape))
+                      for shape, sample_shape in zip(shapes, self._sample_shapes(sample))]
+        for slot, shape in zip(slots, shapes):
+            slot.shape = shape
+
+    def _sample_shapes(self, sample):
+        """Raises an exception if the sample does not match this schema. Returns the slots shapes widened to it"""
+
+        if not isinstance(sample, Sample):
+            raise TypeError('Only dframe.dataset.sample.Sample instances can be validated against a schema')
+
+        input_shapes = self._validate_elems('input', sample.get_exact_inputs(), self.input_slots,
+                                            self.inputs_collection)
+        output_shapes = []
+        outputs = sample.get_exact_outputs()
+        if self.output_slots is None:
+            if outputs is not None:
+                raise ValueError('The sample has outputs but the schema does not')
+        elif outputs is None:
+            raise ValueError('The sample has no outputs but the schema does')
+        else:
+            output_shapes = self._validate_elems('output', outputs, self.output_slots, self.outputs_collection)
+        return input_shapes + output_shapes
+
+    def format_input(self, inputs):
+        """Returns the formatted data of the given inputs (see dframe.dataset.sample.Sample.get_input)"""
+        return self._format(inputs, self.input_slots, self.inputs_collection, self._input_values)
+
+    def format_output(self, outputs):
+        """Returns the formatted data of the given outputs (see dframe.dataset.sample.Sample.get_output)"""
+        return self._format(outputs, self.output_slots, self.outputs_collection, self._output_values)
+
+    @staticmethod
+    def _format(elems, slots, collection, value_positions):
+        if not collection:
+            return [elems.get_data() if slots[0].is_value else elems]
+        data = list(elems)
+        for idx in value_positions:
+            data[idx] = data[idx].get_data()
+        return data
+
+    @staticmethod
+    def _items(elems):
+        """Returns whether elems is a collection and its items"""
+        if isinstance(elems, Value):
+            return False, [elems]
+        try:
+            return True, list(elems)
+        except TypeError:
+            return False, [elems]
+
+    def _validate_elems(self, name, elems, slots, collection):
+        """Raises an exception if the elems do not match the slots. Returns the shapes of the slots widened to them"""
+        elems_collection, items = self._items(elems)
+        if elems_collection != collection:
+            raise ValueError('The sample {}s are {}given as a collection, unlike the schema ones'.format(
+                name, '' if elems_collection else 'not '))
+        if len(items) != len(slots):
+            raise ValueError('The sample has {} {}s but the schema has {}'.format(len(items), name, len(slots)))
+
+        shapes = []
+        for idx, (item, slot) in enumerate(zip(items, slots)):
+            item_slot = SlotSchema.infer(item)
+            if item_slot.is_value != slot.is_value:
+                raise ValueError('The {} {} of the sample is {}a Value, unlike the schema one'.format(
+                    name, idx, '' if item_slot.is_value else 'not '))
+            if isinstance(item, SparseVector) and item_slot.shape != slot.shape:
+                raise ValueError('The {} {} of the sample is a sparse vector of size {} but the schema has {}'.format(
+                    name, idx, item_slot.shape[0], slot.shape))
+            if len(item_slot.shape) != len(slot.shape):
+                raise ValueError('The {} {} of the sample has shape {} but the schema has {}'.format(
+                    name, idx, item_slot.shape, slot.shape))
+            if not self._compatible(item_slot.dtype, slot.dtype):
+                raise ValueError('The {} {} of the sample has dtype {} but the schema has {}'.format(
+                    name, idx, item_slot.dtype, slot.dtype))
+            shapes.append(tuple(dim if dim == item_dim else None for dim, item_dim in zip(slot.shape, item_slot.shape)))
+        return shapes
+
+    @staticmethod
+    def _compatible(dtype, other):
+        if dtype.kind in NUMERIC_KINDS and other.kind in NUMERIC_KINDS:
+            return True
+        return dtype.kind == other.kind
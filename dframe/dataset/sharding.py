@@ -0,0 +1,314 @@
+import json
+import os
+import random
+import uuid
+from multiprocessing import Pool, cpu_count
+
+import numpy as np
+
+from dframe.dataset.batching import bounded_imap
+from dframe.dataset.dataset import Dataset
+from dframe.dataset.persistence import PersistenceManager, get_persistence_manager
+from dframe.dataset.sparse import assemble_sparse_columns
+from dframe.dataset.dedup import DIGEST_DTYPE, sample_digests, find_duplicates
+from dframe.dataset.statistics import FeatureStatistics
+
+
+# Formats the shards can be saved in: registered persistence manager name (see
+# dframe.dataset.persistence.PERSISTENCE_MANAGERS) -> file extension
+SHARD_FORMATS = {
+    'h5py': 'h5',
+    'pickle': 'pkl',
+}
+
+
+class ShardedPersistenceManager(PersistenceManager):
+    """Persistence manager that saves a dataset as a directory of shard files plus a manifest.
+
+    Each shard holds a consecutive chunk of samples and is saved with the persistence manager of the chosen format (see
+    SHARD_FORMATS). The manifest (a JSON file) lists the shards in order with their number of samples, so new shards
+    can be appended without rewriting the existing ones.
+
+    Shard files are never overwritten: each save or append writes its shards under new names (through temporary files)
+    and then replaces the manifest, so readers see either the old shards or the new ones, never a mix of them or
+    partially written ones. The shards of a replaced dataset are removed once the new manifest is written.
+
+    The shards are loaded in parallel by a pool of worker processes, either all of them into a single dataset (load)
+    or one after the other as they are needed (iter_shards and batch_generator).
+    """
+
+    MANIFEST_NAME = 'manifest.json'
+    MANIFEST_VERSION = 1
+
+    def __init__(self, shard_format='h5py', shard_size=10000, processes=None, store_statistics=False):
+        """Creates a ShardedPersistenceManager.
+
+        Args:
+            shard_format (str): Format of the shards when saving, one of SHARD_FORMATS. When loading, the format is
+                read from the manifest
+            shard_size (int): Maximum number of samples of each shard
+            processes (int): Number of worker processes loading shards. Default is the number of CPUs (at most the
+                number of shards). With 1, shards are loaded in this process
+            store_statistics (bool): If true, save also computes the statistics of the inputs of the dataset and
+                stores them in the manifest (see compute_statistics and load_statistics)
+        """
+
+        if shard_format not in SHARD_FORMATS:
+            raise ValueError('Unknown shard format {}. Supported formats are {}'.format(shard_format,
+                                                                                        sorted(SHARD_FORMATS)))
+        if shard_size < 1:
+            raise ValueError('The shard size must be positive')
+        self.shard_format = shard_format
+        self.shard_size = shard_size
+        self.processes = processes
+        self.store_statistics = store_statistics
+
+    def save(self, dataset, path):
+        """Saves the dataset in shards into the directory path, replacing any sharded dataset already there"""
+        super(ShardedPersistenceManager, self).save(dataset, path)
+        if not os.path.isdir(path):
+            os.makedirs(path)
+
+        old_manifest = self.read_manifest(path) if self.supports_loading(path) else None
+        manifest = {'version': self.MANIFEST_VERSION, 'format': self.shard_format, 'shards': []}
+        if self.store_statistics:
+            manifest['statistics'] = FeatureStatistics.compute(dataset).to_dict()
+        self._save_shards(dataset, path, manifest, write_manifest=True)
+
+        # Remove the shards of the replaced dataset that have not been overwritten
+        if old_manifest is not None:
+            new_files = set(shard['file'] for shard in manifest['shards'])
+            for shard in old_manifest['shards']:
+                shard_path = os.path.join(path, shard['file'])
+                if shard['file'] not in new_files and os.path.isfile(shard_path):
+                    os.remove(shard_path)
+
+    def append(self, dataset, path):
+        """Adds the samples of the dataset as new shards of the sharded dataset in path, or creates it if there is
+        none. The existing shards are not modified"""
+
+        if not self.supports_loading(path):
+            self.save(dataset, path)
+            return
+        if not self.supports_saving(dataset):
+            raise TypeError('This persistence manager cannot save this dataset')
+
+        manifest = self.read_manifest(path)
+        # Keep the stored statistics up to date by merging the ones of the new samples
+        if manifest.get('statistics') is not None:
+            statistics = FeatureStatistics.from_dict(manifest['statistics'])
+            statistics.merge(FeatureStatistics.compute(dataset))
+            manifest['statistics'] = statistics.to_dict()
+        self._save_shards(dataset, path, manifest, write_manifest=True)
+
+    def compute_statistics(self, path, save=True):
+        """Computes the statistics (dframe.dataset.statistics.FeatureStatistics) of the inputs of the sharded dataset.
+
+        Each worker process computes the statistics of a shard, which are then merged. If save is true, they are
+        stored in the manifest (see load_statistics) and kept up to date as shards are appended.
+        """
+
+        statistics = FeatureStatistics()
+        for shard in self._map_shards(path, _compute_shard_statistics):
+            statistics.merge(shard)
+        if save:
+            manifest = self.read_manifest(path)
+            manifest['statistics'] = statistics.to_dict()
+            self._write_manifest(manifest, path)
+        return statistics
+
+    def load_statistics(self, path):
+        """Returns the statistics stored in the manifest, or None if they have not been computed"""
+        statistics = self.read_manifest(path).get('statistics')
+        return FeatureStatistics.from_dict(statistics) if statistics is not None else None
+
+    def find_duplicates(self, path):
+        """Finds the samples of the sharded dataset whose data repeats the one of an earlier sample, in any shard.
+
+        Each worker process computes the digests of a shard (see dframe.dataset.dedup), so only 16 bytes per sample
+        are gathered in this process, never the samples of several shards.
+
+        Returns:
+            tuple(numpy.ndarray, numpy.ndarray): The positions of the repeated samples across all the shards (as in
+                load), and the positions of the earlier samples they repeat
+        """
+
+        digests = self._map_shards(path, _compute_shard_digests)
+        return find_duplicates(np.concatenate([np.empty(0, DIGEST_DTYPE)] + digests))
+
+    def load(self, path):
+        """Loads all the shards in parallel and returns a single dataset with their samples.
+
+        If the shards have the same schema (e.g. they are saved with H5py), it is set as the dataset schema.
+        """
+
+        super(ShardedPersistenceManager, self).load(path)
+        samples = []
+        schemas = []
+        for shard in self.iter_shards(path):
+            samples.extend(shard.get_samples())
+            schemas.append(shard.get_schema())
+
+        dataset = Dataset(samples)
+        if schemas and _same_schemas(schemas):
+            dataset.set_schema(schemas[0], validate=False)
+        return dataset
+
+    def iter_shards(self, path, shuffle=False):
+        """Generates the dataset of each shard, in order or in random order if shuffle is true.
+
+        The worker processes load the next shards while the current one is used, so that the shards are streamed
+        without holding the whole dataset in memory: at most one shard per worker process is loaded ahead.
+        """
+
+        if not self.supports_loading(path):
+            raise TypeError('This persistence manager cannot load the dataset from the specified path')
+        manifest = self.read_manifest(path)
+        tasks = [(manifest['format'], os.path.join(path, shard['file'])) for shard in manifest['shards']]
+        if shuffle:
+            random.shuffle(tasks)
+
+        processes = self.processes or min(cpu_count(), len(tasks))
+        if processes <= 1:
+            for task in tasks:
+                yield _load_shard(task)
+            return
+
+        pool = Pool(processes)
+        try:
+            for shard in bounded_imap(pool, _load_shard, tasks, processes):
+                yield shard
+        finally:
+            pool.terminate()
+            pool.join()
+
+    def batch_generator(self, path, batch_size, shuffle=True, normalizer=None):
+        """Generates endlessly batches of samples streamed from the shards, like
+        dframe.dataset.dataset.Dataset.batch_generator.
+
+        If shuffle is true, both the order of the shards and the samples of each shard are shuffled on each epoch.
+        Batches can hold samples of two consecutive shards. If a normalizer (dframe.dataset.statistics.Normalizer) is
+        given, e.g. built from the stored statistics (see load_statistics), the inputs of each batch are normalized.
+        """
+
+        while True:
+            pending = Dataset()
+            for shard in self.iter_shards(path, shuffle):
+                if shuffle:
+                    shard.shuffle()
+                pending = Dataset.concat([pending, shard]) if pending.len() else shard
+                num_full = pending.len() // batch_size * batch_size
+                for batch_start in xrange(0, num_full, batch_size):
+                    yield self._batch(pending.view(slice(batch_start, batch_start + batch_size)), normalizer)
+                # The samples left (less than a batch) get a list of their own, so that they do not keep the shard
+                pending = Dataset(pending.view(slice(num_full, None)).get_samples())
+            if pending.len():
+                yield self._batch(pending, normalizer)
+
+    def read_manifest(self, path):
+        with open(os.path.join(path, self.MANIFEST_NAME)) as f:
+            manifest = json.load(f)
+        if manifest.get('version') != self.MANIFEST_VERSION:
+            raise ValueError('Unsupported manifest version {}'.format(manifest.get('version')))
+        return manifest
+
+    def supports_saving(self, dataset):
+        return isinstance(dataset, Dataset)
+
+    def supports_loading(self, path):
+        return os.path.isfile(os.path.join(path, self.MANIFEST_NAME))
+
+    def _map_shards(self, path, function):
+        """Returns the results of calling function with the (format, path) of each shard, in worker processes"""
+
+        if not self.supports_loading(path):
+            raise TypeError('This persistence manager cannot load the dataset from the specified path')
+        manifest = self.read_manifest(path)
+        tasks = [(manifest['format'], os.path.join(path, shard['file'])) for shard in manifest['shards']]
+
+        processes = self.processes or min(cpu_count(), len(tasks))
+        if processes <= 1:
+            return [function(task) for task in tasks]
+        pool = Pool(processes)
+        try:
+            return pool.map(function, tasks)
+        finally:
+            pool.terminate()
+            pool.join()
+
+    @staticmethod
+    def _batch(dataset, normalizer):
+        inputs = dataset.get_input(axis_samples=False)
+        if normalizer is not None:
+            inputs = normalizer.normalize(inputs)
+        return assemble_sparse_columns(inputs), dataset.get_output(axis_samples=False)
+
+    def _save_shards(self, dataset, path, manifest, write_manifest=False):
+        """Saves the dataset in new shards after the ones in the manifest, adding them to it.
+
+        The shards get names that no manifest has used, and each one is written into a temporary file first. If
+        write_manifest is true, the manifest is written once all of them are complete. If anything fails, the new
+        shards are removed.
+        """
+
+        if manifest['format'] != self.shard_format:
+            raise ValueError('The sharded dataset is in {} format, not {}'.format(manifest['format'],
+                                                                                  self.shard_format))
+        extension = SHARD_FORMATS[self.shard_format]
+        manager = get_persistence_manager(self.shard_format)
+        save_id = uuid.uuid4().hex[:8]
+        new_files = []
+        try:
+            for start in xrange(0, dataset.len(), self.shard_size):
+                shard = dataset.view(slice(start, start + self.shard_size))
+                file_name = 'shard-{:05d}-{}.{}'.format(len(manifest['shards']), save_id, extension)
+                shard_path = os.path.join(path, file_name)
+                temp_path = '{}.{}.tmp'.format(shard_path, os.getpid())
+                new_files.append(temp_path)
+                manager.save(shard, temp_path)
+                os.rename(temp_path, shard_path)
+                new_files[-1] = shard_path
+                manifest['shards'].append({'file': file_name, 'num_samples': shard.len()})
+            if write_manifest:
+                self._write_manifest(manifest, path)
+        except:
+            for file_path in new_files:
+                if os.path.isfile(file_path):
+                    os.remove(file_path)
+            raise
+
+    def _write_manifest(self, manifest, path):
+        # Write and rename, so that readers never see a partially written manifest
+        manifest['num_samples'] = sum(shard['num_samples'] for shard in manifest['shards'])
+        manifest_path = os.path.join(path, self.MANIFEST_NAME)
+        temp_path = '{}.{}.tmp'.format(manifest_path, os.getpid())
+        with open(temp_path, 'w') as f:
+            json.dump(manifest, f, indent=2)
+        os.rename(temp_path, manifest_path)
+
+
+def _load_shard(task):
+    shard_format, path = task
+    return get_persistence_manager(shard_format).load(path)
+
+
+def _compute_shard_statistics(task):
+    return FeatureStatistics.compute(_load_shard(task))
+
+
+def _compute_shard_digests(task):
+    return sample_digests(_load_shard(task))
+
+
+def _same_schemas(schemas):
+    """Returns whether all the given schemas describe the same slots"""
+
+    def describe(schema):
+        if schema is None:
+            return None
+        slots = schema.input_slots + (schema.output_slots or [])
+        return (schema.inputs_collection, schema.outputs_collection, schema.output_slots is None,
+                [(slot.is_value, slot.dtype, slot.shape) for slot in slots])
+
+    first = describe(schemas[0])
+    return first is not None and all(describe(schema) == first for schema in schemas[1:])
@@ -0,0 +1,119 @@
+import numpy as np
+
+from dframe.dataset.sample import Value
+
+
+class SparseVector(Value):
+    """Value of a sparse input/output slot (e.g. a bag of words): only its non-zero elements are stored.
+
+    Its formatted data (get_data) is the sparse vector itself, so that it is never turned into a dense array unless
+    requested (to_dense). The sparse vectors of a batch are assembled into a CSRBatch (see assemble_sparse_columns).
+    """
+
+    __slots__ = ('indices', 'values', 'size')
+
+    def __init__(self, indices, values, size):
+        """Creates a SparseVector.
+
+        Args:
+            indices (list[int]): Positions of the non-zero elements, in ascending order
+            values (list): The non-zero elements
+            size (int): Length of the (dense) vector
+        """
+
+        self.indices = np.asarray(indices, np.int64)
+        self.values = np.asarray(values)
+        self.size = int(size)
+        if self.indices.shape != self.values.shape or self.indices.ndim != 1:
+            raise ValueError('The indices and values of a sparse vector must be 1D and of the same length')
+        if len(self.indices) and (self.indices.min() < 0 or self.indices.max() >= self.size):
+            raise ValueError('The indices of a sparse vector must be within its size')
+
+    @classmethod
+    def from_dense(cls, dense):
+        dense = np.asarray(dense)
+        indices = np.flatnonzero(dense)
+        return cls(indices, dense[indices], len(dense))
+
+    @property
+    def nnz(self):
+        return len(self.indices)
+
+    def get_data(self):
+        return self
+
+    def to_dense(self):
+        dense = np.zeros(self.size, self.values.dtype)
+        dense[self.indices] = self.values
+        return dense
+
+    def __eq__(self, other):
+        return isinstance(other, SparseVector) and self.size == other.size and \
+            np.array_equal(self.indices, other.indices) and np.array_equal(self.values, other.values)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return 'SparseVector(indices={}, values={}, size={})'.format(self.indices.tolist(), self.values.tolist(),
+                                                                     self.size)
+
+
+class CSRBatch(object):
+    """Batch of sparse vectors in compressed sparse row (CSR) format: the non-zero elements of row i are
+    data[indptr[i]:indptr[i + 1]], in the columns indices[indptr[i]:indptr[i + 1]]"""
+
+    def __init__(self, data, indices, indptr, num_columns):
+        self.data = data
+        self.indices = indices
+        self.indptr = indptr
+        self.shape = (len(indptr) - 1, num_columns)
+
+    @classmethod
+    def from_vectors(cls, vectors):
+        """Assembles the given sparse vectors (SparseVector) of the same size as the rows of a batch"""
+
+        if not vectors:
+            raise ValueError('A batch must have some sparse vector')
+        num_columns = vectors[0].size
+        if any(vector.size != num_columns for vector in vectors):
+            raise ValueError('The sparse vectors of a batch must have the same size')
+        indptr = np.zeros(len(vectors) + 1, np.int64)
+        np.cumsum([vector.nnz for vector in vectors], out=indptr[1:])
+        data = np.concatenate([vector.values for vector in vectors])
+        indices = np.concatenate([vector.indices for vector in vectors])
+        return cls(data, indices, indptr, num_columns)
+
+    @property
+    def nnz(self):
+        return len(self.data)
+
+    def row(self, idx):
+        start, end = self.indptr[idx], self.indptr[idx + 1]
+        return SparseVector(self.indices[start:end], self.data[start:end], self.shape[1])
+
+    def to_dense(self):
+        dense = np.zeros(self.shape, self.data.dtype)
+        rows = np.repeat(np.arange(self.shape[0]), np.diff(self.indptr))
+        dense[rows, self.indices] = self.data
+        return dense
+
+    def to_scipy(self):
+        """Returns the batch as a scipy.sparse.csr_matrix. It requires scipy"""
+        try:
+            from scipy.sparse import csr_matrix
+        except ImportError:
+            raise EnvironmentError('scipy is required to get sparse batches as scipy matrices. Install it with '
+                                   'pip install DeepFramework[sparse]')
+        return csr_matrix((self.data, self.indices, self.indptr), shape=self.shape)
+
+
+def is_sparse_column(column):
+    """Returns whether the data of a slot for the samples of a batch is made of sparse vectors"""
+    return len(column) > 0 and isinstance(column[0], SparseVector)
+
+
+def assemble_sparse_columns(columns):
+    """Returns the columns of a batch (get_input with axis_samples=False) with the sparse ones assembled into a
+    CSRBatch each, so that the batch size scales with the number of non-zero elements"""
+    return [CSRBatch.from_vectors(column) if is_sparse_column(column) else column for column in columns]
@@ -0,0 +1,115 @@
+import numpy as np
+
+
+def split_indices(num_samples, fractions, shuffle=True, seed=None):
+    """Splits the positions 0..num_samples-1 into consecutive parts with the given fractions of samples.
+
+    Args:
+        num_samples (int): Number of samples to split
+        fractions (list[float]): Fraction of samples of each part. They must be positive and add up to 1 at most. If
+            they add up to less than 1, the remaining samples are not in any part
+        shuffle (bool): Whether to shuffle the positions before splitting them
+        seed (int): Seed of the shuffling, for reproducible splits
+
+    Returns:
+        list[numpy.ndarray]: The positions of each part
+    """
+
+    _check_fractions(fractions)
+    positions = np.arange(num_samples)
+    if shuffle:
+        np.random.RandomState(seed).shuffle(positions)
+    return _split(positions, fractions)
+
+
+def stratified_split_indices(labels, fractions, seed=None):
+    """Splits the positions of the given labels so that each part has the same proportion of each label.
+
+    Args:
+        labels (list): The label (any hashable) of each sample
+        fractions (list[float]): Fraction of samples of each part (see split_indices)
+        seed (int): Seed of the shuffling, for reproducible splits
+
+    Returns:
+        list[numpy.ndarray]: The positions of each part, shuffled
+    """
+
+    _check_fractions(fractions)
+    random_state = np.random.RandomState(seed)
+    parts = [[] for _ in fractions]
+    for positions in _positions_by_label(labels):
+        random_state.shuffle(positions)
+        for part, label_part in zip(parts, _split(positions, fractions)):
+            part.append(label_part)
+
+    result = []
+    for part in parts:
+        part = np.concatenate(part) if part else np.arange(0)
+        random_state.shuffle(part)
+        result.append(part)
+    return result
+
+
+def k_fold_indices(num_samples, k, shuffle=True, seed=None, labels=None):
+    """Generates the positions of the train and validation parts of each of the k folds.
+
+    Args:
+        num_samples (int): Number of samples
+        k (int): Number of folds. Each sample is in the validation part of exactly one fold
+        shuffle (bool): Whether to shuffle the positions before making the folds
+        seed (int): Seed of the shuffling, for reproducible folds
+        labels (list): If given, the label of each sample, so that the folds are stratified (each fold has the same
+            proportion of each label)
+
+    Yields:
+        tuple(numpy.ndarray, numpy.ndarray): The train and validation positions of each fold
+    """
+
+    if k < 2 or k > num_samples:
+        raise ValueError('The number of folds must be between 2 and the number of samples')
+
+    random_state = np.random.RandomState(seed)
+    if labels is None:
+        positions = np.arange(num_samples)
+        if shuffle:
+            random_state.shuffle(positions)
+        folds = np.array_split(positions, k)
+    else:
+        folds = [[] for _ in range(k)]
+        for label_idx, positions in enumerate(_positions_by_label(labels)):
+            if shuffle:
+                random_state.shuffle(positions)
+            # Rotate the folds of each label so that the bigger chunks are not always in the first folds
+            for chunk_idx, chunk in enumerate(np.array_split(positions, k)):
+                folds[(chunk_idx + label_idx) % k].append(chunk)
+        folds = [np.concatenate(fold) for fold in folds]
+
+    for validation_idx in range(k):
+        train = np.concatenate([fold for idx, fold in enumerate(folds) if idx != validation_idx])
+        yield train, folds[validation_idx]
+
+
+def _check_fractions(fractions):
+    if not fractions or any(fraction <= 0 for fraction in fractions):
+        raise ValueError('The fractions must be positive')
+    if sum(fractions) > 1 + 1e-9:
+        raise ValueError('The fractions cannot add up to more than 1')
+
+
+def _split(positions, fractions):
+    boundaries = np.round(np.cumsum(fractions) * len(positions)).astype(int)
+    boundaries = np.minimum(boundaries, len(positions))
+    starts = np.concatenate([[0], boundaries[:-1]])
+    return [positions[start:end] for start, end in zip(starts, boundaries)]
+
+
+def _positions_by_label(labels):
+    """Returns an array with the positions of each label, in order of first appearance"""
+    positions = {}
+    order = []
+    for position, label in enumerate(labels):
+        if label not in positions:
+            positions[label] = []
+            order.append(label)
+        positions[label].append(position)
+    return [np.array(positions[label]) for label in order]
@@ -0,0 +1,138 @@
+import numpy as np
+
+
+class RunningStats(object):
+    """Mean, variance, minimum and maximum of a feature computed in a single pass over batches of its values.
+
+    The statistics of different batches or different parts of a dataset (e.g. shards processed in parallel) can be
+    merged, giving the same result as computing them at once (Welford's algorithm generalized by Chan et al.). The
+    statistics are element wise, so a feature can be an array (e.g. an image).
+    """
+
+    def __init__(self, count=0, mean=0.0, m2=0.0, minimum=None, maximum=None):
+        self.count = count
+        self.mean = np.asarray(mean, np.float64)
+        self.m2 = np.asarray(m2, np.float64)     # Sum of the squared differences from the mean
+        self.min = None if minimum is None else np.asarray(minimum)
+        self.max = None if maximum is None else np.asarray(maximum)
+
+    @property
+    def variance(self):
+        return self.m2 / self.count if self.count else np.zeros_like(self.m2)
+
+    @property
+    def std(self):
+        return np.sqrt(self.variance)
+
+    def update(self, values):
+        """Adds the values of a batch, an array with the values of each sample along its first axis"""
+        values = np.asarray(values)
+        if not len(values):
+            return
+        mean = values.mean(axis=0, dtype=np.float64)
+        m2 = np.square(values - mean).sum(axis=0)
+        self._combine(len(values), mean, m2, values.min(axis=0), values.max(axis=0))
+
+    def merge(self, other):
+        """Adds the statistics of other (computed over other values) to these ones"""
+        if other.count:
+            self._combine(other.count, other.mean, other.m2, other.min, other.max)
+
+    def to_dict(self):
+        return {'count': self.count, 'mean': self.mean.tolist(), 'm2': self.m2.tolist(),
+                'min': None if self.min is None else self.min.tolist(),
+                'max': None if self.max is None else self.max.tolist()}
+
+    @classmethod
+    def from_dict(cls, values):
+        return cls(values['count'], values['mean'], values['m2'], values['min'], values['max'])
+
+    def _combine(self, count, mean, m2, minimum, maximum):
+        if not self.count:
+            self.count, self.mean, self.m2 = count, np.asarray(mean, np.float64), np.asarray(m2, np.float64)
+            self.min, self.max = np.asarray(minimum), np.asarray(maximum)
+            return
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean = self.mean + delta * count / total
+        self.m2 = self.m2 + m2 + np.square(delta) * self.count * count / total
+        self.min = np.minimum(self.min, minimum)
+        self.max = np.maximum(self.max, maximum)
+        self.count = total
+
+
+class FeatureStatistics(object):
+    """Running statistics (RunningStats) of each input of the samples of a dataset.
+
+    All the samples must have the same number of inputs, and each input the same shape in all of them.
+    """
+
+    def __init__(self, inputs=None):
+        """Creates a FeatureStatistics.
+
+        Args:
+            inputs (list[RunningStats]): The statistics of each input. By default, they are created on the first update
+        """
+        self.inputs = list(inputs) if inputs is not None else None
+
+    @property
+    def count(self):
+        return self.inputs[0].count if self.inputs else 0
+
+    @classmethod
+    def compute(cls, dataset, batch_size=1024):
+        """Computes the statistics of the inputs of the dataset in a single pass, batch_size samples at a time"""
+        statistics = cls()
+        for offset in xrange(0, dataset.len(), batch_size):
+            statistics.update(dataset.get_input(axis_samples=False, offset=offset, num_elems=batch_size))
+        return statistics
+
+    def update(self, columns):
+        """Adds a batch given as the data of each input for all its samples (get_input with axis_samples=False)"""
+        if self.inputs is None:
+            self.inputs = [RunningStats() for _ in columns]
+        if len(columns) != len(self.inputs):
+            raise ValueError('The batch has {} inputs but the statistics have {}'.format(len(columns),
+                                                                                       len(self.inputs)))
+        for stats, column in zip(self.inputs, columns):
+            stats.update(column)
+
+    def merge(self, other):
+        """Adds the statistics of other (e.g. of another shard of the dataset) to these ones"""
+        if other.inputs is None:
+            return
+        if self.inputs is None:
+            self.inputs = [RunningStats() for _ in other.inputs]
+        if len(other.inputs) != len(self.inputs):
+            raise ValueError('Statistics of different number of inputs cannot be merged')
+        for stats, other_stats in zip(self.inputs, other.inputs):
+            stats.merge(other_stats)
+
+    def to_dict(self):
+        return {'inputs': [stats.to_dict() for stats in self.inputs or []]}
+
+    @classmethod
+    def from_dict(cls, values):
+        return cls([RunningStats.from_dict(stats) for stats in values['inputs']] or None)
+
+
+class Normalizer(object):
+    """Standardizes the inputs of batches, (value - mean) / std, with previously computed statistics, so that
+    normalizing does not need an extra pass over the data (see dframe.dataset.dataset.Dataset.batch_generator)"""
+
+    def __init__(self, statistics, epsilon=1e-8):
+        """Creates a Normalizer.
+
+        Args:
+            statistics (FeatureStatistics): The statistics of the inputs
+            epsilon (float): Added to the standard deviations to avoid dividing by zero with constant inputs
+        """
+
+        if not statistics.count:
+            raise ValueError('The statistics must have been computed over some samples')
+        self._means = [stats.mean for stats in statistics.inputs]
+        self._scales = [1.0 / (stats.std + epsilon) for stats in statistics.inputs]
+
+    def normalize(self, columns):
+        """Returns the normalized arrays of a batch given as the data of each input (axis_samples=False)"""
+        return [(np.asarray(column) - mean) * scale for column, mean, scale in zip(columns, self._means, self._scales)]
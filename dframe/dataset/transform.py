@@ -0,0 +1,261 @@
+import functools
+import hashlib
+import itertools
+import os
+import types
+from multiprocessing import Pool, cpu_count
+
+import numpy as np
+
+from dframe.dataset.batching import bounded_imap
+from dframe.dataset.dataset import Dataset
+from dframe.dataset.persistence import PicklePersistenceManager
+from dframe.dataset.sparse import assemble_sparse_columns
+
+KIND_MAP = 'map'
+KIND_FILTER = 'filter'
+
+# Transformed datasets being processed, registered before the pool workers are forked so that they inherit the
+# source samples and the transforms (which can then be lambdas or closures). Tasks only carry sample positions
+_chains = {}
+_next_token = itertools.count()
+
+
+class TransformedDataset(object):
+    """Chain of lazy transformations (map and filter) over the samples of a dataset (dframe.dataset.dataset.Dataset).
+
+    Nothing is computed when transforms are added. The samples are transformed as they are iterated or pulled in
+    batches (see batch_generator), so the transformed samples are never all in memory unless they are materialized
+    (see materialize), which can store them in a disk cache to skip the transforms in later runs.
+
+    The samples are transformed in this process or, if a number of processes is given, in a pool of worker processes.
+    """
+
+    # Chunks of samples that each worker process transforms ahead of the batches pulled
+    PREFETCH_PER_PROCESS = 2
+
+    def __init__(self, source, transforms=()):
+        """Creates a TransformedDataset.
+
+        Args:
+            source (dframe.dataset.dataset.Dataset): The dataset whose samples are transformed
+            transforms (tuple): The (kind, function) pairs of the transforms, in order
+        """
+
+        if not isinstance(source, Dataset):
+            raise TypeError('Only datasets (dframe.dataset.dataset.Dataset) can be transformed')
+        self.source = source
+        self.transforms = tuple(transforms)
+
+    def map(self, function):
+        """Returns the chain with a new transform that replaces each sample by function(sample)"""
+        return TransformedDataset(self.source, self.transforms + ((KIND_MAP, function),))
+
+    def filter(self, predicate):
+        """Returns the chain with a new transform that keeps only the samples for which predicate(sample) is true"""
+        return TransformedDataset(self.source, self.transforms + ((KIND_FILTER, predicate),))
+
+    def __iter__(self):
+        return iter(self._apply(self.source))
+
+    def batch_generator(self, batch_size, shuffle=True, processes=None):
+        """Generates endlessly batches of transformed samples, like dframe.dataset.dataset.Dataset.batch_generator.
+
+        The source samples are transformed in chunks of batch_size as the batches are pulled (the worker processes
+        only get PREFETCH_PER_PROCESS chunks each ahead of them). As filters may drop samples, a batch can be made of
+        samples from several chunks, and the last batch of an epoch may be smaller.
+
+        Args:
+            batch_size (int): Number of samples of each batch
+            shuffle (bool): Whether to go through the samples in a different random order on each epoch
+            processes (int): Number of worker processes transforming the chunks. None transforms them in this process
+
+        Raises:
+            ValueError: If an epoch gives no samples at all (the source is empty or the filters drop all its samples)
+        """
+
+        pool, token = self._start_pool(processes)
+        try:
+            while True:
+                positions = np.random.permutation(self.source.len()) if shuffle else np.arange(self.source.len())
+                tasks = [(token, chunk) for chunk in _chunks(positions, batch_size)]
+                if pool is None:
+                    transformed = (_transform_chunk(task) for task in tasks)
+                else:
+                    transformed = bounded_imap(pool, _transform_chunk, tasks,
+                                               self.PREFETCH_PER_PROCESS * (processes or cpu_count()))
+
+                batch = []
+                empty_epoch = True
+                for samples in transformed:
+                    batch.extend(samples)
+                    empty_epoch = empty_epoch and not samples
+                    while len(batch) >= batch_size:
+                        yield self._format(batch[:batch_size])
+                        batch = batch[batch_size:]
+                if batch:
+                    yield self._format(batch)
+                if empty_epoch:
+                    raise ValueError('The transformed dataset has no samples to generate batches from')
+        finally:
+            self._stop_pool(pool, token)
+
+    def materialize(self, processes=None, cache_dir=None, cache_key=None):
+        """Transforms all the samples and returns them in a new dataset.
+
+        Args:
+            processes (int): Number of worker processes transforming the samples. None transforms them in this process
+            cache_dir (str): If given, the directory of the disk cache. The transformed dataset is loaded from the cache
+                if it has been stored there before with the same transforms and key, and stored there otherwise
+            cache_key (str): Identifier of the source dataset in the cache (e.g. the path it was loaded from and its
+                version). Required with cache_dir, as the cache cannot tell apart two source datasets of the same length
+                otherwise
+        """
+
+        if cache_dir is not None:
+            if cache_key is None:
+                raise ValueError('A cache key identifying the source dataset is required to use the cache')
+            path = os.path.join(cache_dir, self.cache_name(cache_key))
+            if os.path.isfile(path):
+                return PicklePersistenceManager().load(path)
+
+        pool, token = self._start_pool(processes)
+        try:
+            tasks = [(token, chunk) for chunk in _chunks(np.arange(self.source.len()), 1024)]
+            if pool is None:
+                chunks = [_transform_chunk(task) for task in tasks]
+            else:
+                chunks = pool.map(_transform_chunk, tasks)
+        finally:
+            self._stop_pool(pool, token)
+        dataset = Dataset([sample for chunk in chunks for sample in chunk])
+
+        if cache_dir is not None:
+            if not os.path.isdir(cache_dir):
+                os.makedirs(cache_dir)
+            # Write to a temporary file first so that an interrupted run does not leave a corrupt entry
+            temp_path = '{}.{}.tmp'.format(path, os.getpid())
+            PicklePersistenceManager().save(dataset, temp_path)
+            os.rename(temp_path, path)
+        return dataset
+
+    def cache_name(self, cache_key=None):
+        """Returns the file name of the transformed dataset in the cache.
+
+        It depends on the cache key, the length of the source and each transform: its module, name and code, and the
+        values it uses (defaults, closure variables and globals), so changing any of them invalidates the cached
+        results. Values are described by their repr (arrays by their data), so objects without a stable repr (e.g. the
+        default one, with their address) make the cache miss on every run.
+        """
+
+        digest = hashlib.sha1(repr((cache_key, self.source.len())))
+        for kind, function in self.transforms:
+            digest.update(kind)
+            digest.update(_describe(function))
+        return 'transformed-{}.pkl'.format(digest.hexdigest())
+
+    def _apply(self, samples):
+        """Applies the transforms to the given samples, lazily"""
+        for kind, function in self.transforms:
+            if kind == KIND_MAP:
+                samples = itertools.imap(function, samples)
+            else:
+                samples = itertools.ifilter(function, samples)
+        return samples
+
+    def _start_pool(self, processes):
+        token = next(_next_token)
+        _chains[token] = self
+        if processes is None:
+            return None, token
+        try:
+            return Pool(processes or cpu_count()), token
+        except:
+            del _chains[token]
+            raise
+
+    @staticmethod
+    def _stop_pool(pool, token):
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+        del _chains[token]
+
+    @staticmethod
+    def _format(samples):
+        batch = Dataset(samples)
+        return assemble_sparse_columns(batch.get_input(axis_samples=False)), batch.get_output(axis_samples=False)
+
+
+def _transform_chunk(task):
+    token, positions = task
+    chain = _chains[token]
+    return list(chain._apply(iter(chain.source.view(positions))))
+
+
+def _chunks(positions, size):
+    return [positions[start:start + size] for start in xrange(0, len(positions), size)]
+
+
+def _describe(function, seen=None):
+    """Returns a string that changes when the function, its code or the values it uses change"""
+
+    seen = set() if seen is None else seen
+    if id(function) in seen:
+        return '<seen>'
+    seen.add(id(function))
+
+    if isinstance(function, types.MethodType):
+        return _describe(function.__func__, seen) + _describe_value(function.__self__, seen)
+    if isinstance(function, functools.partial):
+        return 'partial' + ''.join(_describe_value(value, seen) for value in (function.func, function.args,
+                                                                              function.keywords))
+
+    description = '{}.{}'.format(getattr(function, '__module__', ''), getattr(function, '__name__', repr(function)))
+    code = getattr(function, '__code__', None)
+    if code is None:
+        return description
+    description += _describe_code(code)
+    description += _describe_value(function.__defaults__, seen)
+    for cell in function.__closure__ or ():
+        try:
+            description += _describe_value(cell.cell_contents, seen)
+        except ValueError:
+            # Empty cell, e.g. a nested function that refers to itself
+            description += '<empty>'
+    for name in sorted(_global_names(code)):
+        if name in function.__globals__:
+            description += name + _describe_value(function.__globals__[name], seen)
+    return description
+
+
+def _describe_value(value, seen):
+    if isinstance(value, (types.FunctionType, types.MethodType, functools.partial)):
+        return _describe(value, seen)
+    if isinstance(value, np.ndarray):
+        return 'ndarray{}{}{}'.format(value.dtype.str, value.shape, hashlib.sha1(value.tobytes()).hexdigest())
+    if isinstance(value, (list, tuple, dict)):
+        if id(value) in seen:
+            return '<seen>'
+        seen.add(id(value))
+    if isinstance(value, (list, tuple)):
+        return '({})'.format(','.join(_describe_value(item, seen) for item in value))
+    if isinstance(value, dict):
+        return '{{{}}}'.format(','.join('{}:{}'.format(_describe_value(key, seen), _describe_value(item, seen))
+                                        for key, item in sorted(value.items())))
+    return repr(value)
+
+
+def _describe_code(code):
+    # Nested code objects (e.g. lambdas inside the function) are described by their code, not by their address
+    consts = [_describe_code(const) if hasattr(const, 'co_code') else repr(const) for const in code.co_consts]
+    return code.co_code + ''.join(consts)
+
+
+def _global_names(code):
+    """Returns the names used by the code (and its nested code objects) that can refer to globals"""
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if hasattr(const, 'co_code'):
+            names.update(_global_names(const))
+    return names
@@ -0,0 +1,188 @@
+import random
+from abc import ABCMeta, abstractmethod
+
+import numpy as np
+
+
+class IndexRange(object):
+    """Range of indices (start, start + step, ...) that takes constant memory, unlike an array of indices"""
+
+    __slots__ = ('start', 'step', 'count')
+
+    def __init__(self, start, step, count):
+        self.start = start
+        self.step = step
+        self.count = max(count, 0)
+
+    @classmethod
+    def from_slice(cls, selection, length):
+        start, stop, step = selection.indices(length)
+        return cls(start, step, len(xrange(start, stop, step)))
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        return iter(xrange(self.start, self.start + self.count * self.step, self.step))
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            start, stop, step = item.indices(self.count)
+            return IndexRange(self.start + start * self.step, self.step * step, len(xrange(start, stop, step)))
+        if item < 0:
+            item += self.count
+        if not 0 <= item < self.count:
+            raise IndexError('Index out of range')
+        return self.start + item * self.step
+
+    def to_array(self):
+        return np.arange(self.start, self.start + self.count * self.step, self.step, dtype=np.intp)
+
+
+# noinspection PyClassHasNoInit
+class SampleSequence(object):
+    """Interface like class for read-only sequences of samples that are not held in a list of their own (see
+    dframe.dataset.dataset.Dataset.view).
+
+    It supports len, iteration, indexing with integers (returning a sample) and slicing (returning a list).
+    """
+
+    __metaclass__ = ABCMeta
+
+    @abstractmethod
+    def __len__(self):
+        pass
+
+    @abstractmethod
+    def take(self, positions):
+        """Returns a list with the samples in the given positions (an iterable of ints or an IndexRange)"""
+        pass
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return self.take(IndexRange.from_slice(item, len(self)))
+        if item < 0:
+            item += len(self)
+        if not 0 <= item < len(self):
+            raise IndexError('Sample index out of range')
+        return self.take([item])[0]
+
+    def __iter__(self):
+        chunk_size = 1024
+        for offset in xrange(0, len(self), chunk_size):
+            for sample in self[offset:offset + chunk_size]:
+                yield sample
+
+    def __contains__(self, sample):
+        return any(sample is item or sample == item for item in self)
+
+    def __reduce__(self):
+        # Pickled as a plain list, so that only the samples in the view are persisted
+        return list, (list(self),)
+
+
+class ConcatenatedSamples(SampleSequence):
+    """Concatenation of several sequences of samples (lists or SampleSequence) without copying them.
+
+    The sequences must not change their length while being part of the concatenation.
+    """
+
+    def __init__(self, sequences):
+        self.sequences = []
+        for sequence in sequences:
+            # Flatten nested concatenations so that adding datasets one by one does not build deep chains
+            if isinstance(sequence, ConcatenatedSamples):
+                self.sequences.extend(sequence.sequences)
+            elif len(sequence):
+                self.sequences.append(sequence)
+        # offsets[i] is the position of the first sample of the sequence i
+        self.offsets = np.cumsum([0] + [len(sequence) for sequence in self.sequences])
+
+    def __len__(self):
+        return int(self.offsets[-1])
+
+    def take(self, positions):
+        if isinstance(positions, IndexRange) and positions.step == 1:
+            return self._take_contiguous(positions.start, positions.start + positions.count)
+
+        positions = positions.to_array() if isinstance(positions, IndexRange) else np.asarray(positions, np.intp)
+        sequence_ids = np.searchsorted(self.offsets, positions, side='right') - 1
+        return [self.sequences[sequence_id][position - self.offsets[sequence_id]]
+                for sequence_id, position in zip(sequence_ids, positions)]
+
+    def _take_contiguous(self, start, end):
+        samples = []
+        first = max(np.searchsorted(self.offsets, start, side='right') - 1, 0)
+        for sequence_id in xrange(first, len(self.sequences)):
+            offset = self.offsets[sequence_id]
+            if offset >= end:
+                break
+            samples.extend(self.sequences[sequence_id][max(start - offset, 0):end - offset])
+        return samples
+
+
+class IndexedSamples(SampleSequence):
+    """Samples of a sequence (list or ConcatenatedSamples) in the given positions: an IndexRange or an array"""
+
+    def __init__(self, sequence, indices):
+        if isinstance(sequence, IndexedSamples):
+            # Compose the indices instead of chaining the views
+            indices = select(sequence.indices, indices)
+            sequence = sequence.sequence
+        self.sequence = sequence
+        self.indices = indices
+
+    def __len__(self):
+        return len(self.indices)
+
+    def take(self, positions):
+        indices = select(self.indices, positions)
+        if isinstance(self.sequence, SampleSequence):
+            return self.sequence.take(indices)
+        if isinstance(indices, IndexRange) and indices.step == 1:
+            return self.sequence[indices.start:indices.start + indices.count]
+        return [self.sequence[idx] for idx in indices]
+
+    def shuffled(self):
+        """Returns the same samples in random order (only the indices are shuffled).
+
+        The order comes from the random module, as when shuffling a list of samples, so random.seed applies to both.
+        """
+        permutation = range(len(self))
+        random.shuffle(permutation)
+        return IndexedSamples(self.sequence, select(self.indices, np.asarray(permutation, dtype=np.intp)))
+
+
+def select(indices, selection):
+    """Returns the indices in the positions given by selection (an IndexRange, a slice or an array)"""
+
+    if isinstance(selection, slice):
+        selection = IndexRange.from_slice(selection, len(indices))
+    if isinstance(indices, IndexRange):
+        if isinstance(selection, IndexRange):
+            return IndexRange(indices.start + selection.start * indices.step, indices.step * selection.step,
+                              selection.count)
+        return indices.start + np.asarray(selection, np.intp) * indices.step
+    if isinstance(selection, IndexRange):
+        if selection.step == 1:
+            # Slicing a numpy array does not copy it
+            return indices[selection.start:selection.start + selection.count]
+        return indices[selection.to_array()]
+    return indices[np.asarray(selection, np.intp)]
+
+
+def as_indices(selection, length):
+    """Normalizes a selection of positions of a sequence of the given length (a slice, an IndexRange or any sequence
+    of ints) into an IndexRange or an array, raising IndexError if any of them is out of range"""
+
+    if isinstance(selection, slice):
+        return IndexRange.from_slice(selection, length)
+    if isinstance(selection, IndexRange):
+        if len(selection) and not (0 <= selection[0] < length and 0 <= selection[-1] < length):
+            raise IndexError('Sample index out of range')
+        return selection
+    indices = np.asarray(selection, np.intp).ravel()
+    indices = np.where(indices < 0, indices + length, indices)
+    if len(indices) and (indices.min() < 0 or indices.max() >= length):
+        raise IndexError('Sample index out of range')
+    return indices
@@ -0,0 +1,122 @@
+import itertools
+import numbers
+from multiprocessing import Pool, cpu_count
+
+import numpy as np
+
+from dframe.dataset.split import k_fold_indices
+
+
+# Datasets being evaluated, registered before the worker processes are forked so that they inherit them instead of
+# receiving pickled copies. Workers only receive the indices of their folds
+_datasets = {}
+_next_token = itertools.count()
+
+
+def cross_validate(model_factory, dataset, k=5, model_kwargs=None, processes=None, shuffle=True, seed=None,
+                   key=None):
+    """Trains and validates a model on each of the k folds of the dataset, with the folds running concurrently.
+
+    Args:
+        model_factory (callable): Class (or module level function) that creates the dframe.model.model.Model to
+            evaluate. A new model is created for each fold
+        dataset (dframe.dataset.dataset.Dataset): The dataset to evaluate the model on
+        k (int): Number of folds
+        model_kwargs (dict): Keyword arguments of the model factory
+        processes (int): Number of worker processes. Default is the number of CPUs (at most k). With 1, the folds are
+            run one after the other in this process
+        shuffle (bool): Whether to shuffle the samples before making the folds
+        seed (int): Seed of the shuffling, for reproducible folds
+        key (callable): If given, the folds are stratified by the class this function returns for each sample
+
+    Returns:
+        dict: The metrics of each fold ('folds') and their mean ('mean') and standard deviation ('std'). See aggregate
+    """
+
+    labels = dataset.get_labels(key) if key is not None else None
+    splits = list(k_fold_indices(dataset.len(), k, shuffle, seed, labels))
+    return evaluate(model_factory, dataset, splits, model_kwargs, processes)
+
+
+def evaluate(model_factory, dataset, splits, model_kwargs=None, processes=None):
+    """Trains and validates a new model on each of the given splits of the dataset, concurrently.
+
+    The workers are forked after the dataset is registered, so they see its samples without copying them through the
+    pool. Each task only carries the positions of the train and validation samples, and the worker builds the views
+    (dframe.dataset.dataset.Dataset.view) of the split from them.
+
+    Args:
+        model_factory (callable): Class (or module level function) that creates the model of each split
+        dataset (dframe.dataset.dataset.Dataset): The dataset to evaluate the model on
+        splits (list[tuple]): The train and validation positions of each split (e.g. from
+            dframe.dataset.split.k_fold_indices)
+        model_kwargs (dict): Keyword arguments of the model factory
+        processes (int): Number of worker processes (see cross_validate)
+
+    Returns:
+        dict: The metrics of each split and their mean and standard deviation. See aggregate
+    """
+
+    model_kwargs = model_kwargs or {}
+    if processes is None:
+        processes = min(cpu_count(), len(splits))
+
+    token = next(_next_token)
+    _datasets[token] = dataset
+    try:
+        tasks = [(token, model_factory, model_kwargs, train, validation) for train, validation in splits]
+        if processes <= 1:
+            metrics = [_run_split(task) for task in tasks]
+        else:
+            pool = Pool(processes)
+            try:
+                metrics = pool.map(_run_split, tasks, chunksize=1)
+            finally:
+                pool.terminate()
+                pool.join()
+    finally:
+        del _datasets[token]
+
+    return aggregate(metrics)
+
+
+def aggregate(metrics):
+    """Returns the mean and standard deviation of the metrics of several evaluations.
+
+    Args:
+        metrics (list): What Model.validate returned in each evaluation: a number or a dictionary of metrics
+
+    Returns:
+        dict: With the keys 'folds' (the given metrics), 'mean' and 'std'. If the metrics are dictionaries, the mean and
+            standard deviation are dictionaries with the keys whose values are numbers in every evaluation (the other
+            values, e.g. labels or confusion matrices, are only in the metrics of each fold)
+    """
+
+    result = {'folds': metrics}
+    if metrics and isinstance(metrics[0], dict):
+        names = [name for name in metrics[0]
+                 if all(isinstance(metric, dict) and _is_number(metric.get(name)) for metric in metrics)]
+        result['mean'] = {name: float(np.mean([metric[name] for metric in metrics])) for name in names}
+        result['std'] = {name: float(np.std([metric[name] for metric in metrics])) for name in names}
+    elif metrics and all(_is_number(metric) for metric in metrics):
+        result['mean'] = float(np.mean(metrics))
+        result['std'] = float(np.std(metrics))
+    else:
+        result['mean'] = result['std'] = None
+    return result
+
+
+def _is_number(value):
+    return isinstance(value, numbers.Real)
+
+
+def _run_split(task):
+    token, model_factory, model_kwargs, train, validation = task
+    try:
+        dataset = _datasets[token]
+    except KeyError:
+        raise EnvironmentError('The dataset is not available in the worker. Evaluations in parallel require the worker '
+                               'processes to be forked')
+    model = model_factory(**model_kwargs)
+    model.train(dataset.view(train))
+    return model.validate(dataset.view(validation))
@@ -0,0 +1,99 @@
+import threading
+
+
+class Autoscaler(object):
+    """Adjusts the number of workers (replicas) of each core of a pipeline to its load.
+
+    A background thread checks periodically each core. If the estimated time to go through its queue (queue depth times
+    the processing time, divided among its workers) is greater than max_wait, a replica is added. If the queue has been
+    empty for scale_down_checks consecutive checks, a replica is retired. Retired replicas finish their current package
+    before stopping, as they are stopped with a poison pill.
+    """
+
+    def __init__(self, min_replicas=1, max_replicas=4, max_wait=1.0, interval=1.0, scale_down_checks=3, bounds=None):
+        """Creates an Autoscaler.
+
+        Args:
+            min_replicas (int): Minimum number of workers of each core. Default is 1
+            max_replicas (int): Maximum number of workers of each core. Default is 4
+            max_wait (float): Seconds a package is allowed to wait in a core's queue before scaling it up
+            interval (float): Seconds between checks
+            scale_down_checks (int): Number of consecutive checks with an empty queue needed to retire a replica
+            bounds (dict): Overrides the min and max replicas of some cores. Its keys are the index of the core in the
+                pipeline (counting the remote ones, see dframe.pipeline.pipeline.Pipeline.KEY_REMOTE) and its values
+                (min_replicas, max_replicas) tuples
+        """
+
+        if min_replicas < 1 or max_replicas < min_replicas:
+            raise ValueError('The replicas bounds must satisfy 1 <= min_replicas <= max_replicas')
+
+        self.min_replicas = min_replicas
+        self.max_replicas = max_replicas
+        self.max_wait = max_wait
+        self.interval = interval
+        self.scale_down_checks = scale_down_checks
+        self.bounds = bounds or {}
+
+        self._cores = []
+        self._stages = []
+        self._idle_checks = {}
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self, cores, stages=None):
+        """Starts watching the given (already started) cores.
+
+        Args:
+            cores (list[dframe.pipeline.core.Core]): The cores to scale
+            stages (list[int]): The index of each core in the pipeline. By default, their index in cores
+        """
+        self._cores = cores
+        self._stages = list(stages) if stages is not None else range(len(cores))
+        self._idle_checks = dict((stage, 0) for stage in self._stages)
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """Stops watching the cores. The current replicas are kept"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def scale(self, idx, core):
+        """Adds or retires a replica of the core number idx of the pipeline if needed.
+
+        Returns +1 if a replica has been added, -1 if it has been retired or 0 otherwise.
+        """
+
+        core.reap_replicas()
+        min_replicas, max_replicas = self.bounds.get(idx, (self.min_replicas, self.max_replicas))
+        replicas = core.num_replicas()
+        depth = core.queue_depth()
+
+        # If the processing time is still unknown, assume that each worker can take a package within max_wait
+        wait = depth * (core.processing_time() or self.max_wait) / float(replicas)
+        if replicas < min_replicas or (wait > self.max_wait and replicas < max_replicas):
+            self._idle_checks[idx] = 0
+            core.add_replica()
+            return 1
+
+        if depth == 0 and replicas > min_replicas:
+            self._idle_checks[idx] = self._idle_checks.get(idx, 0) + 1
+            if self._idle_checks[idx] >= self.scale_down_checks:
+                self._idle_checks[idx] = 0
+                if core.remove_replica():
+                    return -1
+        else:
+            self._idle_checks[idx] = 0
+        return 0
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            for stage, core in zip(self._stages, self._cores):
+                if not core.is_alive() and not core.replicas:
+                    # Stopped core
+                    continue
+                self.scale(stage, core)
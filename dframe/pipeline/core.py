@@ -1,8 +1,13 @@
-from multiprocessing import Queue, Process
+import heapq
+import itertools
+import time
+from Queue import Full
+from multiprocessing import Queue, Process, Lock, Value, Event
 
 from abc import ABCMeta
 
-from dframe.pipeline.package import PackageProcessor
+from dframe.pipeline.package import PackageProcessor, Package
+from dframe.pipeline.profiling import WorkerProfiler, default_profile_dir
 
 
 class Core(Process, PackageProcessor):
@@ -12,20 +17,49 @@ class Core(Process, PackageProcessor):
     overriding the process_package method defined in dframe.pipeline.package.PackageProcessor, which Core extends from.
     The run method only deals with getting the package, delivering it to process_package and sending the result through
     the output pipe, and thus it should commonly remain untouched (not overrided)
+
+    Packages are processed by priority (see dframe.pipeline.package.Package). The ones whose deadline has passed are
+    not processed: they are flagged as expired and sent to the next block right away. If drop_expired is set, their data
+    is dropped and only their tombstone (see dframe.pipeline.package.Package.tombstone) is sent, so that the pipeline
+    still gets a result for them.
+
+    The core process is the first worker of the core. More workers (replicas) consuming from the same processing queue
+    can be added and retired at any time after starting it (see dframe.pipeline.autoscaler.Autoscaler). They are forked
+    from the process that started the core, so they get a copy of the core as it was at that moment.
+
+    The processing of the packages can be profiled with cProfile, without changing the core, by enabling the profiling
+    (before or after starting it). Each worker writes its stats into profile_dir (see dframe.pipeline.profiling).
     """
 
     __metaclass__ = ABCMeta
 
-    def __init__(self, pipe_in, pipe_out):
+    # Size of the processing queue. It is kept small so that waiting packages stay in the producer, sorted by priority
+    QUEUE_SIZE = 1
+    # Weight of the last package in the moving average of the processing time
+    PROCESSING_TIME_WEIGHT = 0.1
+
+    def __init__(self, pipe_in, pipe_out, drop_expired=False):
         super(Core, self).__init__()
-        self.queue = Queue()        # FIFO queue
-        self.pipe_in = pipe_in      # The input channel. Package get into the core through this pipe
-        self.pipe_out = pipe_out    # The output channel. The core send the result through this pipe
+        self.queue = Queue(self.QUEUE_SIZE)     # Processing queue, fed by the producer with the most urgent packages
+        self.pipe_in = pipe_in                  # The input channel. Package get into the core through this pipe
+        self.pipe_out = pipe_out                # The output channel. The core send the result through this pipe
+        self.drop_expired = drop_expired        # If True, only the tombstone of expired packages is sent
 
         # Child process that listens for incoming packages through pipe_in and adds them to the processing queue.
         # From the Core perspective, this is the producer of packages (the one that puts them in the processing queue)
         self.producer = PipeConsumer(self.pipe_in, self.queue)
 
+        # State shared by all the workers of the core
+        self.replicas = []                      # Worker processes besides the core process itself
+        self._send_lock = Lock()                # Workers share the output pipe
+        self._num_workers = Value('i', 1)       # Workers alive. The last one to stop propagates the poison pill
+        self._num_retiring = Value('i', 0)      # Retire pills in the queue not consumed yet
+        self._processing_time = Value('d', 0.0)
+
+        # Profiling. The directory must be set before starting the core, the profiling can be toggled at any time
+        self.profile_dir = default_profile_dir()
+        self._profiling = Event()
+
     def start(self):
         # Start the producer process before starting this one
         self.producer.start()
@@ -42,9 +76,79 @@ class Core(Process, PackageProcessor):
         # Terminate the producer process and wait until it has completely finished
         self.producer.terminate()
         self.producer.join()
+        # Terminate the replicas
+        for replica in self.replicas:
+            replica.terminate()
+            replica.join()
+        self.replicas = []
         # Terminate self process
         super(Core, self).terminate()
 
+    def add_replica(self):
+        """Starts a new worker process for this core"""
+        with self._num_workers.get_lock():
+            self._num_workers.value += 1
+        replica = Process(target=self.run)
+        replica.start()
+        self.replicas.append(replica)
+
+    def remove_replica(self):
+        """Retires a worker of this core (not necessarily the last one added) once it finishes its current package.
+
+        A retire pill is put in the processing queue, so this may block until there is room for it. The core always
+        keeps at least one worker, so nothing is done (and False returned) if there is only one left.
+        """
+
+        with self._num_workers.get_lock():
+            if self.num_replicas() <= 1:
+                return False
+            with self._num_retiring.get_lock():
+                self._num_retiring.value += 1
+        self.queue.put(_RetirePill())
+        return True
+
+    def reap_replicas(self):
+        """Joins the replicas that have already finished"""
+        finished = [replica for replica in self.replicas if not replica.is_alive()]
+        for replica in finished:
+            replica.join()
+            self.replicas.remove(replica)
+
+    def num_replicas(self):
+        """Returns the number of workers of the core, not counting those that are already retiring"""
+        return self._num_workers.value - self._num_retiring.value
+
+    def queue_depth(self):
+        """Returns the number of packages waiting to be processed"""
+        try:
+            queued = self.queue.qsize()
+        except NotImplementedError:
+            # Not available in some platforms (Mac OS X)
+            queued = 0
+        return queued + self.producer.num_pending.value
+
+    def enable_profiling(self, profile_dir=None):
+        """Starts profiling the processing of the packages.
+
+        Args:
+            profile_dir (str): Directory where the workers write their profiles. It can only be changed before starting
+                the core. By default, dframe.pipeline.profiling.default_profile_dir()
+        """
+
+        if profile_dir is not None:
+            if self.is_alive():
+                raise EnvironmentError('The profile directory cannot be changed once the core has been started')
+            self.profile_dir = profile_dir
+        self._profiling.set()
+
+    def disable_profiling(self):
+        """Stops profiling. Each worker dumps its stats when it gets its next package (or when it stops)"""
+        self._profiling.clear()
+
+    def processing_time(self):
+        """Returns the moving average of the time (in seconds) it takes to process a package. 0 if none processed"""
+        return self._processing_time.value
+
     def run(self):
         """Logic of the core is executed here in a different process.
 
@@ -52,36 +156,144 @@ class Core(Process, PackageProcessor):
         sent to the next module through the output pipe.
         """
 
+        profiler = WorkerProfiler(self.profile_dir, self.name)
         while True:
             # Get the next package to process from the queue. Blocking if there is none
             package = self.queue.get()
-            # If we receive None, propagate the signal through the pipe and break the infinite loop to stop
-            # the process
+            # Wake up the producer if it is waiting for room in the queue
+            self.producer.room.set()
+            # If we receive None, propagate the signal through the pipe (once all the workers have stopped) and break
+            # the infinite loop to stop the process
             if package is None:
-                self.pipe_out.send(package)
+                profiler.dump()
+                self._stop_worker()
                 break
-            # Process the package
-            self.process_package(package)
+            if isinstance(package, _RetirePill):
+                if self._retire_worker():
+                    profiler.dump()
+                    break
+                continue
+            if isinstance(package, Package) and package.is_expired():
+                # Fast-fail: skip the processing and let it (or its tombstone) flow to the end of the pipeline
+                package.expired = True
+                if self.drop_expired:
+                    package = package.tombstone()
+            else:
+                # Process the package
+                start = time.time()
+                if self._profiling.is_set():
+                    profiler.run(self.process_package, package)
+                else:
+                    profiler.dump()
+                    self.process_package(package)
+                self._update_processing_time(time.time() - start)
             # Send the result to the next block through the output pipe
-            self.pipe_out.send(package)
+            with self._send_lock:
+                self.pipe_out.send(package)
+
+    def _stop_worker(self):
+        with self._num_workers.get_lock():
+            self._num_workers.value -= 1
+            last = self._num_workers.value <= 0
+        if last:
+            with self._send_lock:
+                self.pipe_out.send(None)
+        else:
+            # Leave the poison pill for the next worker
+            self.queue.put(None)
+
+    def _retire_worker(self):
+        """Returns whether this worker should stop. The last worker never retires, as it has to propagate the poison
+        pill"""
+
+        with self._num_workers.get_lock():
+            with self._num_retiring.get_lock():
+                self._num_retiring.value -= 1
+            if self._num_workers.value <= 1:
+                return False
+            self._num_workers.value -= 1
+            return True
+
+    def _update_processing_time(self, elapsed):
+        with self._processing_time.get_lock():
+            if self._processing_time.value == 0:
+                self._processing_time.value = elapsed
+            else:
+                self._processing_time.value += self.PROCESSING_TIME_WEIGHT * (elapsed - self._processing_time.value)
+
+
+class _RetirePill(object):
+    """Poison pill that stops a single worker of a core without propagating the signal"""
+    pass
 
 
 class PipeConsumer(Process):
-    """Process that is in charge of reading a pipe and putting the incoming packages in a queue"""
+    """Process that is in charge of reading a pipe and putting the incoming packages in a queue.
+
+    While the queue is full, the incoming packages wait here sorted by priority (higher first and FIFO for the same
+    priority), so that the queue is always fed with the most urgent package. Meanwhile, the consumer sleeps until the
+    ones taking packages from the queue set the room event.
+    """
+
+    # Maximum seconds to wait for room in the queue before receiving the packages arrived in the meantime, so that they
+    # are counted as pending while the queue stays full
+    WAIT_INTERVAL = 0.5
 
     def __init__(self, pipe, queue):
         super(PipeConsumer, self).__init__()
         self.pipe = pipe
         self.queue = queue
+        self.room = Event()                 # Set each time a package is taken from the queue
+        self._pending = []                  # Heap of (-priority, arrival order, package)
+        self._arrival = itertools.count()
+        self.num_pending = Value('i', 0)    # Size of the heap, readable from other processes
 
     def run(self):
         while True:
             try:
-                # Wait for the other end of the pipe to send the package and add it to the processing queue
-                package = self.pipe.recv()
-                self.queue.put(package)
-                # If we receive None, break the infinite loop so that the process dies
-                if package is None:
+                # Wait for the other end of the pipe to send a package, only if there is nothing pending
+                if not self._pending and not self._receive():
                     break
+                # Take the packages that have already arrived, so that they compete for the queue by priority
+                while self.pipe.poll():
+                    if not self._receive():
+                        return
+                self._feed_queue()
             except EOFError:
+                self._flush()
                 break
+
+    def _receive(self):
+        """Receives a package and adds it to the pending ones.
+
+        If we receive None, it is put in the queue after all the pending packages and False is returned so that the
+        infinite loop breaks and the process dies.
+        """
+
+        package = self.pipe.recv()
+        if package is None:
+            self._flush()
+            self.queue.put(package)
+            return False
+        heapq.heappush(self._pending, (-getattr(package, 'priority', 0), next(self._arrival), package))
+        self.num_pending.value = len(self._pending)
+        return True
+
+    def _feed_queue(self):
+        """Puts the most urgent pending package in the processing queue if it has room. Otherwise, waits until a package
+        is taken from it (at most WAIT_INTERVAL), leaving the packages that arrive meanwhile in the pipe"""
+        # Cleared before trying, so that a package taken right after failing still wakes this up
+        self.room.clear()
+        try:
+            self.queue.put(self._pending[0][-1], block=False)
+        except Full:
+            self.room.wait(self.WAIT_INTERVAL)
+            return
+        heapq.heappop(self._pending)
+        self.num_pending.value = len(self._pending)
+
+    def _flush(self):
+        """Moves all the pending packages to the processing queue, blocking if needed"""
+        while self._pending:
+            self.queue.put(heapq.heappop(self._pending)[-1])
+            self.num_pending.value = len(self._pending)
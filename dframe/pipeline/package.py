@@ -1,3 +1,4 @@
+import time
 from abc import ABCMeta, abstractmethod
 
 
@@ -8,10 +9,17 @@ class Package:
     The package is a stack of layers, the first layer being the input (what needs to be processed by the pipeline/core)
     and the following ones being the result of each of the cores composing a pipeline. Therefore, the last layer (the
     one at the top) is the final result of the whole processing chain.
+
+    Packages with higher priority are processed first by the cores. If a package has a deadline (timestamp as returned
+    by time.time()) and it has passed when a core is about to process it, the package is not processed: it is flagged as
+    expired and sent straight to the next core (or just its tombstone, depending on the core).
     """
 
-    def __init__(self, package_id):
+    def __init__(self, package_id, priority=0, deadline=None):
         self.package_id = package_id
+        self.priority = priority
+        self.deadline = deadline
+        self.expired = False
         self._layers = []
 
     def add_layer(self, layer):
@@ -44,6 +52,19 @@ class Package:
         except IndexError:
             raise ValueError('This package does not have an output layer')
 
+    def is_expired(self, now=None):
+        """Returns whether the deadline of the package has passed (always False if it has no deadline)"""
+        if self.deadline is None:
+            return False
+        return (now if now is not None else time.time()) > self.deadline
+
+    def tombstone(self):
+        """Returns an expired copy of the package without its layers, to let the end of the pipeline know that the
+        package has expired without carrying its data"""
+        tombstone = Package(self.package_id, priority=self.priority, deadline=self.deadline)
+        tombstone.expired = True
+        return tombstone
+
 
 # noinspection PyClassHasNoInit
 class PackageProcessor:
@@ -1,7 +1,9 @@
-from multiprocessing import Pipe, Manager
+from multiprocessing import Manager
 from multiprocessing import Process
 
 from dframe.pipeline.package import PackageProcessor
+from dframe.pipeline.profiling import collect_profiles, default_profile_dir
+from dframe.pipeline.transport import PipeTransport
 
 
 class Pipeline(PackageProcessor):
@@ -10,24 +12,50 @@ class Pipeline(PackageProcessor):
     Note: as the pipeline is made of cores, and each of them spawns two processes, the number of processes that this
     pipeline will create is (2*num_cores + 2). The last two are needed for the pipeline itself, one to put the results
     of the last core into the results dictionary (to be able to access them) and the second one is the
-    multiprocessing.Manager that holds this shared results dictionary.
+    multiprocessing.Manager that holds this shared results dictionary. Each replica added to a core by an autoscaler is
+    one more process.
     """
 
     KEY_CLASS = 'class'
     KEY_KWARGS = 'kwargs'
+    KEY_REMOTE = 'remote'
 
-    def __init__(self, core_classes_map):
+    def __init__(self, core_classes_map, transport=None, autoscaler=None, profile_dir=None, profile=False):
         """Creates a Pipeline object.
 
         Args:
             core_classes_map (list[dict]): Each element in the list corresponds to a Core. The element must be a
                 dictionary with the key Pipeline.KEY_CLASS and value the class that should be instantiated (the Core
-                subclass). You can provide arguments to the constructor using the key Pipeline.KEY_KWARGS.
+                subclass). You can provide arguments to the constructor using the key Pipeline.KEY_KWARGS. If the key
+                Pipeline.KEY_REMOTE is True, the core is connected but not instantiated, as it is expected to be run
+                by another node (see dframe.pipeline.transport.SocketTransport.core_endpoints)
+            transport (dframe.pipeline.transport.Transport): The transport used to connect the cores. By default
+                they are connected with multiprocessing pipes (PipeTransport), use SocketTransport to span the
+                pipeline across several machines
+            autoscaler (dframe.pipeline.autoscaler.Autoscaler): If given, the number of worker processes of each local
+                core is adjusted to its load while the pipeline is running
+            profile_dir (str): Directory where the cores write their profiles. By default,
+                dframe.pipeline.profiling.default_profile_dir()
+            profile (bool): If True, the cores are profiled from the start. Profiling can also be enabled later with
+                enable_profiling
         """
 
-        self.input_pipe, self.output_pipe = self._construct_pipes(core_classes_map)
-        # Instantiate the core classes, connecting them with the created pipes
-        self.cores = [core_class[self.KEY_CLASS](**core_class[self.KEY_KWARGS]) for core_class in core_classes_map]
+        self.transport = transport if transport is not None else PipeTransport()
+        self.input_pipe, self.output_pipe = self._construct_pipes(core_classes_map, self.transport)
+        # Instantiate the local core classes, connecting them with the created pipes
+        self.cores = [core_class[self.KEY_CLASS](**core_class[self.KEY_KWARGS]) for core_class in core_classes_map
+                      if not core_class.get(self.KEY_REMOTE, False)]
+        # Index in the pipeline of each local core
+        self.stages = [idx for idx, core_class in enumerate(core_classes_map)
+                       if not core_class.get(self.KEY_REMOTE, False)]
+        # Name the cores after their stage so that their profiles can be told apart
+        self.profile_dir = profile_dir if profile_dir is not None else default_profile_dir()
+        for stage, core in zip(self.stages, self.cores):
+            core.name = 'stage{}-{}'.format(stage, type(core).__name__)
+            core.profile_dir = self.profile_dir
+            if profile:
+                core.enable_profiling()
+        self.autoscaler = autoscaler
         self.started = False
         self.results_manager = Manager()
         self.results = self.results_manager.dict()
@@ -42,6 +70,8 @@ class Pipeline(PackageProcessor):
         for core in self.cores:
             core.start()
         self.results_producer.start()
+        if self.autoscaler is not None:
+            self.autoscaler.start(self.cores, self.stages)
 
         self.started = True
 
@@ -55,14 +85,20 @@ class Pipeline(PackageProcessor):
                 calling process until all cores are stopped.
         """
 
+        if self.autoscaler is not None:
+            self.autoscaler.stop()
         self.input_pipe.send(None)
         if block:
             self.results_producer.join()
+            for core in self.cores:
+                core.reap_replicas()
         self.started = False
 
     def terminate(self):
         """Terminates the pipeline and all its cores in a hard way"""
 
+        if self.autoscaler is not None:
+            self.autoscaler.stop()
         for core in self.cores:
             # Terminate a core and wait until it finish
             core.terminate()
@@ -70,6 +106,20 @@ class Pipeline(PackageProcessor):
         self.results_producer.terminate()
         self.results_producer.join()
 
+    def enable_profiling(self):
+        """Starts profiling all the cores (see dframe.pipeline.core.Core.enable_profiling)"""
+        for core in self.cores:
+            core.enable_profiling()
+
+    def disable_profiling(self):
+        for core in self.cores:
+            core.disable_profiling()
+
+    def collect_profiles(self):
+        """Returns the profiles written so far by the cores, as a dictionary with the core names as keys and the merged
+        pstats.Stats of their workers as values"""
+        return collect_profiles(self.profile_dir)
+
     def process_package(self, package):
         if not self.started:
             raise EnvironmentError('The pipeline is not ready to process any package. You need to call '
@@ -85,22 +135,25 @@ class Pipeline(PackageProcessor):
         return self.results.pop(package_id, None)
 
     @staticmethod
-    def _construct_pipes(core_classes_map):
-        """Creates all the pipes needed to connect the cores"""
+    def _construct_pipes(core_classes_map, transport=None):
+        """Creates all the pipes needed to connect the cores, using the given transport (pipes by default)"""
+
+        if transport is None:
+            transport = PipeTransport()
 
         # Create the first pipe
-        receiver, sender = Pipe(duplex=False)
+        receiver, sender = transport.channel(0)
         # The input pipe of the pipeline is the sender end (introduced the packages to the first core)
         input_pipe = sender
 
-        for core_class in core_classes_map:
+        for idx, core_class in enumerate(core_classes_map):
             # If no kwargs passed, initialize as empty object
             if Pipeline.KEY_KWARGS not in core_class:
                 core_class[Pipeline.KEY_KWARGS] = {}
             # The input pipe of a core is the end that receives packages
             core_class[Pipeline.KEY_KWARGS]['pipe_in'] = receiver
             # Create the inter-core pipe
-            receiver, sender = Pipe(duplex=False)
+            receiver, sender = transport.channel(idx + 1)
             # The output pipe of a core is the end that sends the result
             core_class[Pipeline.KEY_KWARGS]['pipe_out'] = sender
 
@@ -0,0 +1,82 @@
+import cProfile
+import glob
+import os
+import pstats
+import tempfile
+import time
+import uuid
+
+
+# Extension of the profile files written by the cores
+PROFILE_EXTENSION = '.prof'
+
+
+def default_profile_dir():
+    """Directory where the cores write their profiles if no other is given.
+
+    Each call returns a new directory (e.g. one per pipeline), so that the profiles of earlier runs are never collected
+    with the ones of the current run. It is created when the first profile is written.
+    """
+    return os.path.join(tempfile.gettempdir(), 'dframe-profiles-{}-{}'.format(os.getpid(), uuid.uuid4().hex[:8]))
+
+
+class WorkerProfiler(object):
+    """Profiles the packages processed by a worker process of a core.
+
+    The stats are accumulated in a cProfile.Profile and dumped (atomically) into <profile_dir>/<name>.<pid>.prof every
+    dump_interval seconds and when the profiling stops, so that the parent process can collect them while the
+    pipeline is running. Each worker writes its own file.
+    """
+
+    def __init__(self, profile_dir, name, dump_interval=1.0):
+        self.profile_dir = profile_dir
+        self.name = name
+        self.dump_interval = dump_interval
+        self._profile = None
+        self._last_dump = None
+        self._dirty = False     # Whether something has been profiled since the last dump
+
+    def run(self, function, *args):
+        """Calls function with args under the profiler"""
+        if self._profile is None:
+            self._profile = cProfile.Profile()
+            self._last_dump = time.time()
+        result = self._profile.runcall(function, *args)
+        self._dirty = True
+        if time.time() - self._last_dump >= self.dump_interval:
+            self.dump()
+        return result
+
+    def dump(self):
+        """Writes the stats accumulated so far. Nothing is done if nothing has been profiled since the last dump"""
+        if not self._dirty:
+            return
+        if not os.path.isdir(self.profile_dir):
+            try:
+                os.makedirs(self.profile_dir)
+            except OSError:
+                # Created by another worker in the meantime
+                pass
+        path = os.path.join(self.profile_dir, '{}.{}{}'.format(self.name, os.getpid(), PROFILE_EXTENSION))
+        self._profile.dump_stats(path + '.tmp')
+        os.rename(path + '.tmp', path)
+        self._last_dump = time.time()
+        self._dirty = False
+
+
+def collect_profiles(profile_dir):
+    """Merges the profiles written by the workers in profile_dir.
+
+    Returns a dictionary whose keys are the core names and values pstats.Stats with the merged stats of all the
+    workers of that core.
+    """
+
+    stats = {}
+    for path in sorted(glob.glob(os.path.join(profile_dir, '*' + PROFILE_EXTENSION))):
+        # <name>.<pid>.prof
+        name = os.path.basename(path)[:-len(PROFILE_EXTENSION)].rsplit('.', 1)[0]
+        if name in stats:
+            stats[name].add(path)
+        else:
+            stats[name] = pstats.Stats(path)
+    return stats
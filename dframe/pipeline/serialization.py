@@ -0,0 +1,189 @@
+import cPickle
+import struct
+import sys
+import zlib
+from abc import ABCMeta, abstractmethod
+from cStringIO import StringIO
+
+from dframe.pipeline.package import Package
+
+# Header of the BinaryCodec payloads: kind of object, size of its pickle and number of array buffers
+_HEADER = struct.Struct('<cII')
+
+
+# noinspection PyClassHasNoInit
+class Codec:
+    """Interface like class for the classes that turn the packages (and the None that stops a core) into bytes to be
+    sent through the channels of a pipeline, and back.
+
+    Both ends of a channel must use the same codec (see CodecConnection).
+    """
+
+    __metaclass__ = ABCMeta
+
+    @abstractmethod
+    def encode(self, obj):
+        """Returns the bytes (str) of the given object"""
+        pass
+
+    @abstractmethod
+    def decode(self, data):
+        """Returns the object encoded in the given bytes"""
+        pass
+
+
+class PickleCodec(Codec):
+    """Codec that pickles the objects with the highest protocol. Any picklable object can be sent with it"""
+
+    def encode(self, obj):
+        return cPickle.dumps(obj, cPickle.HIGHEST_PROTOCOL)
+
+    def decode(self, data):
+        return cPickle.loads(data)
+
+
+class BinaryCodec(Codec):
+    """Compact codec for packages whose layers are made of numpy arrays, bytes, numbers and small containers.
+
+    Packages are written without their class path: just their fields (id, priority, deadline, expired flag and
+    layers). The fields are pickled with the C pickler, which is the fastest way to write numbers, strings and
+    containers, except for numpy arrays (of non object dtype): they are taken out of the pickle stream and appended as
+    their raw buffers, so that they are neither reduced to Python objects nor copied into it.
+
+    Payloads larger than compress_threshold bytes are compressed with zlib, which pays off for large layers in slow
+    channels (e.g. SocketTransport between nodes).
+    """
+
+    # First byte of the payload: whether the rest is compressed
+    RAW = '\x00'
+    COMPRESSED = '\x01'
+    # Second byte of the payload: whether the pickled object is the fields of a Package or any other object
+    PACKAGE = 'K'
+    OBJECT = 'o'
+
+    def __init__(self, compress_threshold=None, compress_level=1):
+        """Creates a BinaryCodec.
+
+        Args:
+            compress_threshold (int): Size in bytes from which payloads are compressed. Default is None (never)
+            compress_level (int): zlib compression level, from 1 (fastest) to 9 (smallest)
+        """
+        self.compress_threshold = compress_threshold
+        self.compress_level = compress_level
+
+    def encode(self, obj):
+        # Package is an old style class, so the class has to be checked instead of the type. Subclasses are pickled
+        if getattr(obj, '__class__', None) is Package:
+            kind = self.PACKAGE
+            obj = (obj.package_id, obj.priority, obj.deadline, obj.expired, obj._layers)
+        else:
+            kind = self.OBJECT
+
+        buffers = []
+        stream = StringIO()
+        pickler = cPickle.Pickler(stream, cPickle.HIGHEST_PROTOCOL)
+        # numpy is only looked for if it has already been imported, as otherwise there cannot be any array
+        np = sys.modules.get('numpy')
+        if np is not None:
+            pickler.inst_persistent_id = lambda value: self._buffer_id(np, value, buffers)
+        pickler.dump(obj)
+        pickled = stream.getvalue()
+
+        chunks = [_HEADER.pack(kind, len(pickled), len(buffers)), pickled]
+        chunks.append(struct.pack('<{}Q'.format(len(buffers)), *[len(data) for data in buffers]))
+        chunks.extend(buffers)
+        payload = ''.join(chunks)
+        if self.compress_threshold is not None and len(payload) >= self.compress_threshold:
+            return self.COMPRESSED + zlib.compress(payload, self.compress_level)
+        return self.RAW + payload
+
+    def decode(self, data):
+        if data[:1] == self.COMPRESSED:
+            data = zlib.decompress(buffer(data, 1))
+            offset = 0
+        elif data[:1] == self.RAW:
+            offset = 1
+        else:
+            raise ValueError('The data has not been encoded with a BinaryCodec')
+
+        kind, pickled_size, num_buffers = _HEADER.unpack_from(data, offset)
+        offset += _HEADER.size
+        pickled = data[offset:offset + pickled_size]
+        offset += pickled_size
+        sizes = struct.unpack_from('<{}Q'.format(num_buffers), data, offset)
+        offset += 8 * num_buffers
+        starts = []
+        for size in sizes:
+            starts.append(offset)
+            offset += size
+        if offset != len(data):
+            raise ValueError('The data has {} bytes but {} were expected'.format(len(data), offset))
+
+        unpickler = cPickle.Unpickler(StringIO(pickled))
+        unpickler.persistent_load = lambda buffer_id: self._load_buffer(buffer_id, data, starts, sizes)
+        obj = unpickler.load()
+
+        if kind == self.PACKAGE:
+            package_id, priority, deadline, expired, layers = obj
+            obj = Package(package_id, priority=priority, deadline=deadline)
+            obj.expired = expired
+            obj._layers = layers
+        return obj
+
+    @staticmethod
+    def _buffer_id(np, value, buffers):
+        """Returns the id that replaces a numpy array in the pickle stream, appending its buffer, or None for the rest
+        of the objects (that are pickled). Subclasses of numpy arrays (e.g. masked arrays) are pickled, so that they
+        keep their class and state"""
+        if type(value) is not np.ndarray or value.dtype.hasobject:
+            return None
+        buffers.append(value.tostring())
+        return len(buffers) - 1, value.dtype.descr if value.dtype.fields else value.dtype.str, value.shape
+
+    @staticmethod
+    def _load_buffer(buffer_id, data, starts, sizes):
+        import numpy as np
+        idx, dtype, shape = buffer_id
+        dtype = np.dtype(dtype)
+        if not sizes[idx]:
+            return np.empty(shape, dtype)
+        # Copy, as the arrays built on the received bytes would be read only
+        array = np.frombuffer(data, dtype, count=sizes[idx] // dtype.itemsize, offset=starts[idx])
+        return array.reshape(shape).copy()
+
+
+class CodecConnection(object):
+    """End of a channel that sends/receives the objects encoded with a codec, instead of pickling them.
+
+    It wraps an end that exchanges raw messages with send_bytes/recv_bytes (e.g. the ends of a multiprocessing.Pipe or
+    the socket ends of dframe.pipeline.transport), and it behaves as the wrapped one (send, recv, poll and close).
+    """
+
+    def __init__(self, connection, codec):
+        self.connection = connection
+        self.codec = codec
+
+    def send(self, obj):
+        self.connection.send_bytes(self.codec.encode(obj))
+
+    def recv(self):
+        return self.codec.decode(self.connection.recv_bytes())
+
+    def poll(self, timeout=0.0):
+        return self.connection.poll(timeout)
+
+    def close(self):
+        self.connection.close()
+
+    @property
+    def address(self):
+        return self.connection.address
+
+
+def wrap_channel(channel, codec):
+    """Returns the (receiver, sender) ends of the channel wrapped to use the given codec, or as they are if it is
+    None"""
+    if codec is None:
+        return channel
+    receiver, sender = channel
+    return CodecConnection(receiver, codec), CodecConnection(sender, codec)
@@ -0,0 +1,258 @@
+import os
+import select
+import threading
+from abc import ABCMeta, abstractmethod
+from multiprocessing import Pipe, AuthenticationError
+from multiprocessing.connection import Listener, Client
+
+from dframe.pipeline.serialization import wrap_channel
+
+
+# noinspection PyClassHasNoInit
+class Transport:
+    """Interface like class for the classes that create the channels connecting the cores of a pipeline.
+
+    A channel is made of two ends: a receiver, that the next core reads the packages from (recv), and a sender, that the
+    previous core (or the pipeline itself) writes the packages to (send).
+
+    By default the packages are pickled. Transports created with a codec (dframe.pipeline.serialization.Codec) send
+    them encoded with it instead, e.g. with the compact BinaryCodec.
+    """
+
+    __metaclass__ = ABCMeta
+
+    @abstractmethod
+    def channel(self, index):
+        """Returns a tuple (receiver, sender) with the two ends of the channel number index.
+
+        The channel 0 is the input of the pipeline (connects it with the first core) and the channel num_cores is its
+        output (connects the last core with the pipeline results).
+        """
+        pass
+
+
+class PipeTransport(Transport):
+    """Transport that connects the cores through multiprocessing pipes. All the cores must run in the same machine"""
+
+    def __init__(self, codec=None):
+        """Creates a PipeTransport.
+
+        Args:
+            codec (dframe.pipeline.serialization.Codec): Codec the packages are sent with. Default is pickle
+        """
+        self.codec = codec
+
+    def channel(self, index):
+        return wrap_channel(Pipe(duplex=False), self.codec)
+
+
+class SocketTransport(Transport):
+    """Transport that connects the cores through TCP sockets, so that the cores can run in different machines.
+
+    The channels use multiprocessing.connection Listener/Client, so the packages are framed and pickled the same way as
+    in a pipe. The receiver end listens in the channel address and the sender end connects to it, both lazily (the first
+    time they are used), so that the ends can be shipped to other processes or nodes before being opened.
+    """
+
+    def __init__(self, addresses=None, host='localhost', authkey=None, codec=None):
+        """Creates a SocketTransport.
+
+        Args:
+            addresses (list[tuple]): The (host, port) address of each channel. In a pipeline with N cores, N+1
+                addresses are needed. This is mandatory if the cores run in different nodes, as all the nodes must
+                agree on them. If not given, the receiver of each channel listens right away in a port of host picked
+                by the system, and its processes (forked after creating the channel) accept the connections
+            host (str): The host to pick the free ports from when no addresses are given. Default is localhost
+            authkey (str): Key used to authenticate the connections. Strongly recommended if the sockets are exposed
+                to a network, as the packages are unpickled on reception
+            codec (dframe.pipeline.serialization.Codec): Codec the packages are sent with. Default is pickle. All the
+                nodes must use the same one
+        """
+
+        self.addresses = addresses
+        self.host = host
+        self.authkey = authkey
+        self.codec = codec
+
+    def channel(self, index):
+        if self.addresses is None:
+            receiver = SocketReceiver.listening(self.host, self.authkey)
+        else:
+            try:
+                receiver = SocketReceiver(tuple(self.addresses[index]), self.authkey)
+            except IndexError:
+                raise ValueError('There is no address for the channel {}. A pipeline with N cores needs N+1 '
+                                 'addresses'.format(index))
+
+        return wrap_channel((receiver, SocketSender(receiver.address, self.authkey)), self.codec)
+
+    def core_endpoints(self, index):
+        """Returns the kwargs (pipe_in and pipe_out) that the core number index of a pipeline receives.
+
+        This is meant to be used in the node that runs a remote core (see Pipeline.KEY_REMOTE) to instantiate it with
+        the same channels the pipeline has created for it. Explicit addresses are needed for that.
+        """
+
+        if self.addresses is None:
+            raise ValueError('The core endpoints can only be rebuilt with explicit addresses')
+        receiver, _ = self.channel(index)
+        _, sender = self.channel(index + 1)
+        return {'pipe_in': receiver, 'pipe_out': sender}
+
+
+class SocketReceiver(object):
+    """Receiver end of a socket channel. It behaves as the reading end of a multiprocessing.Pipe.
+
+    Several senders can be connected at the same time (e.g. the replicas of a core), the packages of all of them are
+    received through the same end. EOFError is raised once all the connected senders have closed their connection.
+    """
+
+    # Seconds between checks for new senders while waiting for packages
+    ACCEPT_INTERVAL = 0.1
+
+    def __init__(self, address, authkey=None):
+        self.address = address
+        self.authkey = authkey
+        self._listener = None
+        self._accepter_pid = None       # Process whose thread accepts the connections (threads are not forked)
+        self._connections = []
+        self._lock = threading.Lock()
+        self._connected = threading.Event()
+
+    @classmethod
+    def listening(cls, host, authkey=None):
+        """Creates a receiver that already listens in a port of host picked by the system, so that no other process
+        can take the port before it listens"""
+        listener = Listener((host, 0), authkey=authkey)
+        receiver = cls(listener.address, authkey)
+        receiver._listener = listener
+        return receiver
+
+    def recv(self):
+        return self._receive(lambda connection: connection.recv())
+
+    def recv_bytes(self):
+        """Receives a message without unpickling it (see dframe.pipeline.serialization.CodecConnection)"""
+        return self._receive(lambda connection: connection.recv_bytes())
+
+    def poll(self, timeout=0.0):
+        """Returns whether there is any package waiting to be received, waiting at most timeout seconds"""
+        return self._ready_connection(timeout) is not None
+
+    def close(self):
+        with self._lock:
+            for connection in self._connections:
+                connection.close()
+            self._connections = []
+        if self._listener is not None:
+            self._listener.close()
+            self._listener = None
+            self._accepter_pid = None
+
+    def _receive(self, read):
+        while True:
+            connection = self._ready_connection(None)
+            try:
+                return read(connection)
+            except (EOFError, IOError):
+                # This sender has gone, keep receiving from the others (if any)
+                self._drop(connection)
+
+    def _ready_connection(self, timeout):
+        """Returns a connection with data ready to be read, or None if there is none after timeout seconds.
+
+        If timeout is None, it blocks until one is ready.
+        """
+
+        self._listen()
+        # Block until the first sender connects
+        if not self._connected.wait(timeout):
+            return None
+
+        waited = 0.0
+        while True:
+            with self._lock:
+                connections = list(self._connections)
+            if not connections:
+                raise EOFError('All the senders of the channel {} have closed their connection'.format(self.address))
+
+            interval = self.ACCEPT_INTERVAL if timeout is None else min(self.ACCEPT_INTERVAL, timeout - waited)
+            readable, _, _ = select.select(connections, [], [], max(interval, 0))
+            if readable:
+                return readable[0]
+            waited += interval
+            if timeout is not None and waited >= timeout:
+                return None
+
+    def _listen(self):
+        if self._accepter_pid == os.getpid():
+            return
+        if self._listener is None:
+            self._listener = Listener(self.address, authkey=self.authkey)
+        self._accepter_pid = os.getpid()
+        accepter = threading.Thread(target=self._accept, args=(self._listener,))
+        accepter.daemon = True
+        accepter.start()
+
+    def _accept(self, listener):
+        while True:
+            try:
+                connection = listener.accept()
+            except AuthenticationError:
+                # A sender with a wrong key, keep accepting the rest
+                continue
+            except Exception:
+                # The listener has been closed
+                break
+            with self._lock:
+                self._connections.append(connection)
+            self._connected.set()
+
+    def _drop(self, connection):
+        with self._lock:
+            self._connections.remove(connection)
+        connection.close()
+
+    def __getstate__(self):
+        # Only the address travels, the listener is opened by the process that receives
+        return {'address': self.address, 'authkey': self.authkey}
+
+    def __setstate__(self, state):
+        self.__init__(state['address'], state['authkey'])
+
+
+class SocketSender(object):
+    """Sender end of a socket channel. It behaves as the writing end of a multiprocessing.Pipe.
+
+    Each process using this end opens its own connection, so it can be safely inherited by forked processes.
+    """
+
+    def __init__(self, address, authkey=None):
+        self.address = address
+        self.authkey = authkey
+        self._connection = None
+        self._pid = None
+
+    def send(self, obj):
+        self._connect().send(obj)
+
+    def send_bytes(self, data):
+        self._connect().send_bytes(data)
+
+    def close(self):
+        if self._connection is not None and self._pid == os.getpid():
+            self._connection.close()
+        self._connection = None
+
+    def _connect(self):
+        if self._connection is None or self._pid != os.getpid():
+            # Client retries while the receiver is not listening yet
+            self._connection = Client(self.address, authkey=self.authkey)
+            self._pid = os.getpid()
+        return self._connection
+
+    def __getstate__(self):
+        return {'address': self.address, 'authkey': self.authkey}
+
+    def __setstate__(self, state):
+        self.__init__(state['address'], state['authkey'])
@@ -23,5 +23,8 @@ setuptools.setup(
         'h5py>=2.6.0',
         'six>=1.10.0'
     ],
+    extras_require={
+        'sparse': ['scipy>=0.17.0']
+    },
     zip_safe=False
 )
@@ -0,0 +1,159 @@
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+from dframe.dataset.async_saving import AsyncSaver, SaveFuture
+from dframe.dataset.dataset import Dataset
+from dframe.dataset.persistence import H5pyPersistenceManager, PicklePersistenceManager
+from dframe.dataset.sample import Sample
+
+
+class AsyncSaverTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'dataset.h5')
+        self.dataset = Dataset([Sample([idx, idx], [idx]) for idx in range(10)])
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    # ----------------------- Save ---------------------------
+
+    def test_save_should_persist_dataset_in_background(self):
+        sut = AsyncSaver(H5pyPersistenceManager())
+        future = sut.save(self.dataset, self.path)
+        self.assertIsInstance(future, SaveFuture)
+        self.assertEqual(self.path, future.result(10))
+        self.assertTrue(future.done())
+        loaded = H5pyPersistenceManager().load(self.path)
+        self.assertEqual(10, loaded.len())
+        self.assertEqual([9, 9], list(loaded.get_input()[9]))
+        sut.close()
+
+    def test_save_should_persist_dataset_as_it_was_when_called(self):
+        manager = BlockingPersistenceManager()
+        sut = AsyncSaver(manager)
+        future = sut.save(self.dataset, self.path)
+        self.dataset.add([Sample([10, 10], [10])])
+        self.dataset.remove(self.dataset.get_samples()[0])
+        manager.release.set()
+        future.result(10)
+        self.assertEqual([idx for idx in range(10)],
+                         [sample.get_output()[0] for sample in PicklePersistenceManager().load(self.path)])
+        sut.close()
+
+    def test_save_given_non_dataset_should_raise_exception(self):
+        self.assertRaises(TypeError, AsyncSaver(PicklePersistenceManager()).save, 'non dataset', self.path)
+
+    def test_save_should_only_leave_complete_file(self):
+        manager = BlockingPersistenceManager()
+        sut = AsyncSaver(manager)
+        future = sut.save(self.dataset, self.path)
+        manager.started.wait(10)
+        self.assertFalse(os.path.exists(self.path))
+        manager.release.set()
+        future.result(10)
+        self.assertEqual([os.path.basename(self.path)], os.listdir(self.directory))
+        sut.close()
+
+    def test_save_given_failing_save_should_set_exception_and_remove_temporary_file(self):
+        sut = AsyncSaver(PicklePersistenceManager())
+        future = sut.save(Dataset([Sample([lambda: None])]), self.path)
+        self.assertIsNotNone(future.exception(10))
+        self.assertRaises(Exception, future.result)
+        self.assertEqual([], os.listdir(self.directory))
+        sut.close()
+
+    def test_save_while_writing_should_coalesce_pending_saves_into_same_path(self):
+        manager = BlockingPersistenceManager()
+        sut = AsyncSaver(manager)
+        first = sut.save(self.dataset, self.path)
+        manager.started.wait(10)
+        second = sut.save(self.dataset.view(slice(0, 2)), self.path)
+        third = sut.save(self.dataset.view(slice(0, 3)), self.path)
+        self.assertIs(second, third)
+        self.assertIsNot(first, second)
+        self.assertEqual(1, sut.num_pending())
+
+        manager.release.set()
+        self.assertTrue(sut.wait(10))
+        self.assertEqual(2, manager.num_saves)
+        self.assertEqual(3, PicklePersistenceManager().load(self.path).len())
+        sut.close()
+
+    def test_add_done_callback_should_be_called_when_done(self):
+        sut = AsyncSaver(PicklePersistenceManager())
+        future = sut.save(self.dataset, self.path)
+        done = []
+        future.add_done_callback(done.append)
+        future.result(10)
+        sut.wait(10)
+        self.assertEqual([future], done)
+        future.add_done_callback(done.append)
+        self.assertEqual([future, future], done)
+        sut.close()
+
+    def test_add_done_callback_given_failing_callback_should_call_the_rest_and_keep_saving(self):
+        sut = AsyncSaver(BlockingPersistenceManager())
+        future = sut.save(self.dataset, self.path)
+        done = []
+        future.add_done_callback(lambda _: 1 / 0)
+        future.add_done_callback(done.append)
+        sut.persistence_manager.release.set()
+        self.assertTrue(sut.wait(10))
+        self.assertEqual([future], done)
+        self.assertEqual(self.path, sut.save(self.dataset, self.path).result(10))
+        sut.close()
+
+    def test_save_should_keep_class_and_index_of_dataset(self):
+        dataset = DatasetSubclass(self.dataset.get_samples())
+        dataset.build_index()
+        sut = AsyncSaver(PicklePersistenceManager())
+        sut.save(dataset, self.path).result(10)
+        loaded = PicklePersistenceManager().load(self.path)
+        self.assertIsInstance(loaded, DatasetSubclass)
+        self.assertTrue(loaded.has_index())
+        self.assertEqual(10, loaded.len())
+        sut.close()
+
+    def test_wait_given_timeout_should_return_false_if_saves_are_not_done(self):
+        manager = BlockingPersistenceManager()
+        sut = AsyncSaver(manager)
+        future = sut.save(self.dataset, self.path)
+        self.assertFalse(sut.wait(0.05))
+        self.assertRaises(RuntimeError, future.result, 0.01)
+        manager.release.set()
+        self.assertTrue(sut.wait(10))
+        sut.close()
+
+    def test_close_should_wait_for_saves_and_reject_new_ones(self):
+        sut = AsyncSaver(PicklePersistenceManager())
+        future = sut.save(self.dataset, self.path)
+        sut.close()
+        self.assertTrue(future.done())
+        self.assertRaises(ValueError, sut.save, self.dataset, self.path)
+
+
+class DatasetSubclass(Dataset):
+    pass
+
+
+class BlockingPersistenceManager(PicklePersistenceManager):
+    """Pickle persistence manager whose saves wait until they are released"""
+
+    def __init__(self):
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.num_saves = 0
+
+    def save(self, dataset, path):
+        self.num_saves += 1
+        self.started.set()
+        self.release.wait(10)
+        super(BlockingPersistenceManager, self).save(dataset, path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import time
+import unittest
+from multiprocessing import Pool, Value
+
+import numpy as np
+
+from dframe.dataset.batching import bucket_ids, bounded_imap, PaddingBuffers
+from dframe.dataset.dataset import Dataset
+from dframe.dataset.sample import Sample
+
+
+# Number of tasks run by the workers of the pool in the bounded_imap tests (they inherit it when forked)
+_num_tasks = Value('i', 0)
+
+
+def _count_task(task):
+    with _num_tasks.get_lock():
+        _num_tasks.value += 1
+    return task * 2
+
+
+class BatchingTest(unittest.TestCase):
+    def setUp(self):
+        lengths = [1, 9, 2, 8, 1, 9, 2, 8]
+        self.dataset = Dataset([Sample([range(length)], [length]) for length in lengths])
+
+    # ----------------------- Bucket ids ---------------------------
+    def test_bucket_ids_given_boundaries_should_group_sizes(self):
+        self.assertListEqual([0, 1, 1, 2], list(bucket_ids(np.array([1, 5, 6, 10]), boundaries=[5, 10])))
+
+    def test_bucket_ids_given_num_buckets_should_split_by_quantiles(self):
+        ids = bucket_ids(np.arange(100), num_buckets=4)
+        self.assertListEqual([25, 25, 25, 25], list(np.bincount(ids)))
+
+    # ----------------------- Bounded imap ---------------------------
+    def test_bounded_imap_should_return_results_in_order(self):
+        pool = Pool(2)
+        try:
+            self.assertListEqual([task * 2 for task in range(20)], list(bounded_imap(pool, _count_task, range(20), 3)))
+        finally:
+            pool.terminate()
+            pool.join()
+
+    def test_bounded_imap_should_only_send_max_pending_tasks_ahead(self):
+        _num_tasks.value = 0
+        pool = Pool(2)
+        try:
+            results = bounded_imap(pool, _count_task, range(100), 3)
+            self.assertEqual(0, next(results))
+            time.sleep(0.5)
+            self.assertEqual(4, _num_tasks.value)
+        finally:
+            pool.terminate()
+            pool.join()
+
+    # ----------------------- Bucketed batch generator ---------------------------
+    def test_bucketed_batch_generator_should_batch_similar_sizes(self):
+        generator = self.dataset.bucketed_batch_generator(2, boundaries=[5])
+        for _ in range(4):
+            _, outputs = next(generator)
+            lengths = outputs[0]
+            self.assertEqual(lengths[0] < 5, lengths[1] < 5)
+
+    def test_bucketed_batch_generator_should_go_through_all_samples_each_epoch(self):
+        generator = self.dataset.bucketed_batch_generator(3, boundaries=[5])
+        outputs = sum((next(generator)[1][0] for _ in range(4)), [])
+        self.assertListEqual([1, 1, 2, 2, 8, 8, 9, 9], sorted(outputs))
+
+    def test_bucketed_batch_generator_given_pad_should_pad_to_batch_maximum(self):
+        generator = self.dataset.bucketed_batch_generator(2, boundaries=[5], shuffle=False, pad=True, pad_value=-1)
+        inputs, outputs, sizes = next(generator)
+        self.assertListEqual([[0, -1], [0, 1]], inputs[0].tolist())
+        self.assertListEqual([1, 2], list(sizes))
+        self.assertListEqual([1, 2], outputs[0].tolist())
+
+    # ----------------------- Padding buffers ---------------------------
+    def test_pad_should_reuse_buffer_when_batch_fits(self):
+        sut = PaddingBuffers()
+        first = sut.pad('input0', [[1, 2, 3], [4]])
+        second = sut.pad('input0', [[5], [6, 7]])
+        self.assertTrue(np.may_share_memory(first, second))
+        self.assertListEqual([[5, 0], [6, 7]], second.tolist())
+
+    def test_pad_given_bigger_batch_should_grow_buffer(self):
+        sut = PaddingBuffers()
+        sut.pad('input0', [[1, 2], [3]])
+        padded = sut.pad('input0', [[1], [2], [3, 4, 5]])
+        self.assertEqual((3, 3), padded.shape)
+
+
+if __name__ == '__main__':
+    unittest.main()
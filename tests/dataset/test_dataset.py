@@ -1,3 +1,4 @@
+import copy
 import unittest
 
 from dframe.dataset.dataset import Dataset
@@ -72,6 +73,78 @@ class DatasetTest(unittest.TestCase):
         samples.remove(2)
         self.assertListEqual(samples, sut.get_samples())
 
+    # ------------------------- Index ---------------------------
+    def test_contains_without_index_should_check_samples(self):
+        sut = Dataset([1, 2, 3])
+        self.assertIn(2, sut)
+        self.assertNotIn(4, sut)
+
+    def test_contains_with_index_should_check_samples(self):
+        samples = [Sample(1), Sample(2)]
+        sut = Dataset(list(samples))
+        sut.build_index()
+        self.assertIn(samples[0], sut)
+        self.assertNotIn(Sample(1), sut)
+
+    def test_find_without_index_should_raise_exception(self):
+        self.assertRaises(EnvironmentError, Dataset([Sample(1)]).find, 1)
+
+    def test_find_with_key_index_should_return_sample(self):
+        samples = [Sample(1, 'a'), Sample(2, 'b')]
+        sut = Dataset(list(samples))
+        sut.build_index(key=lambda sample: sample.get_exact_outputs())
+        self.assertIs(samples[1], sut.find('b'))
+        self.assertRaises(KeyError, sut.find, 'c')
+
+    def test_add_with_index_should_index_new_samples(self):
+        sut = Dataset()
+        sut.build_index()
+        sample = Sample(1)
+        sut.add(sample)
+        self.assertIn(sample, sut)
+
+    def test_remove_with_index_should_remove_samples_keeping_order(self):
+        samples = [Sample(idx) for idx in range(5)]
+        sut = Dataset(list(samples))
+        sut.build_index()
+        sut.remove([samples[3], samples[0]])
+        self.assertListEqual([samples[1], samples[2], samples[4]], sut.get_samples())
+        self.assertNotIn(samples[0], sut)
+        self.assertIn(samples[1], sut)
+
+    def test_remove_with_index_given_unexistent_sample_should_not_remove_any(self):
+        samples = [Sample(1), Sample(2)]
+        sut = Dataset(list(samples))
+        sut.build_index()
+        self.assertRaises(ValueError, sut.remove, [samples[0], Sample(3)])
+        self.assertListEqual(samples, sut.get_samples())
+
+    def test_remove_with_index_given_duplicated_sample_should_remove_one_occurrence(self):
+        sample = Sample(1)
+        sut = Dataset([sample, sample])
+        sut.build_index()
+        sut.remove(sample)
+        self.assertListEqual([sample], sut.get_samples())
+        self.assertIn(sample, sut)
+        self.assertRaises(ValueError, sut.remove, [sample, sample])
+
+    # ------------------------------ Copy -------------------------------
+
+    def test_copy_should_have_own_samples_and_index(self):
+        samples = [Sample(1), Sample(2)]
+        sut = Dataset(list(samples))
+        sut.build_index()
+        copied = copy.copy(sut)
+        sut.add(Sample(3))
+        sut.remove(samples[0])
+        self.assertListEqual(samples, copied.get_samples())
+        self.assertIn(samples[0], copied)
+        self.assertIs(samples[1], copied.get_samples()[1])
+
+    def test_copy_given_view_should_have_its_samples(self):
+        sut = Dataset([Sample(1), Sample(2), Sample(3)]).view(slice(1, None))
+        self.assertListEqual(sut.get_samples(), copy.copy(sut).get_samples())
+
     # ----------------------- Get input ---------------------------
     def test_get_input_given_invalid_samples_should_raise_exception(self):
         sut = Dataset([1, 2, 3])
@@ -0,0 +1,80 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from dframe.dataset.dataset import Dataset
+from dframe.dataset.dedup import sample_digests, find_duplicates
+from dframe.dataset.sample import Sample
+from dframe.dataset.sharding import ShardedPersistenceManager
+
+
+class DedupTest(unittest.TestCase):
+    def setUp(self):
+        self.dataset = Dataset([Sample([1, 2], [0]), Sample([3, 4], [1]), Sample([1, 2], [0]),
+                                Sample([1, 2], [1]), Sample([3, 4], [1])])
+
+    # ----------------------- Digests ---------------------------
+    def test_sample_digests_given_equal_data_should_be_equal(self):
+        digests = sample_digests(self.dataset)
+        self.assertEqual(digests[0], digests[2])
+        self.assertNotEqual(digests[0], digests[3])
+
+    def test_sample_digests_should_not_depend_on_batches(self):
+        dataset = Dataset([Sample([[1, 2]], [0]), Sample([[1, 2, 3]], [0]), Sample([[1, 2]], [0])])
+        np.testing.assert_array_equal(sample_digests(dataset, batch_size=1), sample_digests(dataset, batch_size=3))
+
+    def test_sample_digests_given_different_dtype_should_differ(self):
+        digests = sample_digests(Dataset([Sample([1], [0]), Sample([1.0], [0])]), batch_size=1)
+        self.assertNotEqual(digests[0], digests[1])
+
+    def test_sample_digests_given_mixed_dtypes_in_batch_should_not_depend_on_batches(self):
+        dataset = Dataset([Sample([1], [0]), Sample([1.5], [0]), Sample([1], [0]), Sample([[1, 2]], [np.int8(0)]),
+                           Sample([[1.5, 2]], [np.int8(0)]), Sample([np.array([1, 2])], [0])])
+        expected = sample_digests(dataset, batch_size=1)
+        for batch_size in (2, 3, 6):
+            np.testing.assert_array_equal(expected, sample_digests(dataset, batch_size=batch_size))
+
+    def test_find_duplicates_given_mixed_dtypes_in_batch_should_find_them(self):
+        dataset = Dataset([Sample([1], [0]), Sample([1.5], [0]), Sample([1], [0])])
+        duplicates, originals = dataset.find_duplicates(batch_size=2)
+        self.assertListEqual([2], list(duplicates))
+        self.assertListEqual([0], list(originals))
+
+    # ----------------------- Find duplicates ---------------------------
+    def test_find_duplicates_should_return_repeated_and_original_positions(self):
+        duplicates, originals = find_duplicates(np.array(['b', 'a', 'b', 'a', 'b'], 'S16'))
+        self.assertListEqual([2, 3, 4], list(duplicates))
+        self.assertListEqual([0, 1, 0], list(originals))
+
+    def test_find_duplicates_given_no_digests_should_return_nothing(self):
+        self.assertEqual(0, len(find_duplicates(np.empty(0, 'S16'))[0]))
+
+    def test_dataset_find_duplicates_should_compare_inputs_and_outputs(self):
+        duplicates, originals = self.dataset.find_duplicates()
+        self.assertListEqual([2, 4], list(duplicates))
+        self.assertListEqual([0, 1], list(originals))
+
+    def test_drop_duplicates_should_return_view_of_first_occurrences(self):
+        view = self.dataset.drop_duplicates(batch_size=2)
+        self.assertTrue(view.is_view())
+        self.assertListEqual([[1, 2], [3, 4], [1, 2]], view.get_input())
+        self.assertListEqual([[0], [1], [1]], view.get_output())
+
+    # ----------------------- Sharded ---------------------------
+    def test_sharded_find_duplicates_should_find_them_across_shards(self):
+        directory = tempfile.mkdtemp()
+        try:
+            sut = ShardedPersistenceManager(shard_size=2, processes=2)
+            sut.save(self.dataset, os.path.join(directory, 'sharded'))
+            duplicates, originals = sut.find_duplicates(os.path.join(directory, 'sharded'))
+            self.assertListEqual([2, 4], list(duplicates))
+            self.assertListEqual([0, 1], list(originals))
+        finally:
+            shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,6 +2,7 @@ import os
 import unittest
 
 import h5py
+import numpy as np
 
 from dframe.dataset.dataset import Dataset
 from dframe.dataset.persistence import H5pyPersistenceManager
@@ -60,6 +61,73 @@ class H5pyPersistenceManagerTest(unittest.TestCase):
         self.assertIsInstance(dataset, Dataset)
         self.assertTrue(dataset.len() == 2)
 
+    # ----------------------- Append ---------------------------
+    def test_append_given_unexisting_path_should_save_dataset(self):
+        self.sut.append(Dataset([Sample([1, 2], 1)]), self.file_path)
+        self.assertEqual(1, self.sut.load(self.file_path).len())
+
+    def test_append_should_add_samples_after_saved_ones(self):
+        self.sut.save(Dataset([Sample([1, 2], 1), Sample([3, 4], 3)]), self.file_path)
+        self.sut.append(Dataset([Sample([5, 6], 5)]), self.file_path)
+        dataset = self.sut.load(self.file_path)
+        self.assertListEqual([[1, 2], [3, 4], [5, 6]], [list(data) for data in dataset.get_input()])
+        self.assertListEqual([1, 3, 5], [data[0] for data in dataset.get_output()])
+
+    def test_append_given_different_shape_should_raise_exception(self):
+        self.sut.save(Dataset([Sample([1, 2], 1)]), self.file_path)
+        self.assertRaises(ValueError, self.sut.append, Dataset([Sample([1, 2, 3], 1)]), self.file_path)
+
+    def test_append_given_invalid_outputs_should_not_write_inputs(self):
+        self.sut.save(Dataset([Sample([1, 2], 1)]), self.file_path)
+        self.assertRaises(ValueError, self.sut.append, Dataset([Sample([3, 4], [1, 2])]), self.file_path)
+        with h5py.File(self.file_path, 'r') as f:
+            self.assertEqual((1, 2), f[H5pyPersistenceManager.INPUT_DATASET_NAME].shape)
+            self.assertEqual((1, 1), f[H5pyPersistenceManager.OUTPUT_DATASET_NAME].shape)
+
+    def test_append_given_data_that_would_be_truncated_should_raise_exception(self):
+        self.sut.save(Dataset([Sample([1, 2], 1)]), self.file_path)
+        self.assertRaises(ValueError, self.sut.append, Dataset([Sample([1.7, 2.9], 0.5)]), self.file_path)
+        self.assertListEqual([[1, 2]], [list(data) for data in self.sut.load(self.file_path).get_input()])
+
+    def test_append_given_integers_that_would_overflow_should_raise_exception(self):
+        self.sut.save(Dataset([Sample([np.array([1, 2], dtype=np.int8)], 1)]), self.file_path)
+        self.assertRaises(ValueError, self.sut.append, Dataset([Sample([np.array([1000, 2])], 1)]), self.file_path)
+        self.assertEqual(1, self.sut.load(self.file_path).len())
+
+    def test_append_given_floats_that_would_overflow_should_raise_exception(self):
+        self.sut.save(Dataset([Sample([np.array([1, 2], dtype=np.float32)], 1)]), self.file_path)
+        self.assertRaises(ValueError, self.sut.append, Dataset([Sample([np.array([1e300, 2])], 1)]), self.file_path)
+        self.assertEqual(1, self.sut.load(self.file_path).len())
+
+    def test_append_given_values_that_fit_in_saved_dtype_should_store_them(self):
+        self.sut.save(Dataset([Sample([np.array([1, 2], dtype=np.float32)], 1)]), self.file_path)
+        self.sut.append(Dataset([Sample([np.array([0.1, 2])], 1), Sample([np.array([3, 4])], 1)]), self.file_path)
+        inputs = self.sut.load(self.file_path).get_input(axis_samples=False)[0]
+        np.testing.assert_allclose([[1, 2], [0.1, 2], [3, 4]], inputs, rtol=1e-6)
+
+    def test_append_given_samples_without_output_should_raise_exception(self):
+        self.sut.save(Dataset([Sample([1, 2], 1)]), self.file_path)
+        self.assertRaises(ValueError, self.sut.append, Dataset([Sample([1, 2])]), self.file_path)
+
+    def test_append_given_non_resizable_file_should_raise_exception(self):
+        with h5py.File(self.file_path, 'w') as f:
+            f.create_dataset(H5pyPersistenceManager.INPUT_DATASET_NAME, data=[[1, 2]])
+        self.assertRaises(ValueError, self.sut.append, Dataset([Sample([3, 4])]), self.file_path)
+
+    # ----------------------- Update ---------------------------
+    def test_update_should_overwrite_rows_from_offset(self):
+        self.sut.save(Dataset([Sample([idx, idx], idx) for idx in range(4)]), self.file_path)
+        self.sut.update(Dataset([Sample([9, 9], 9), Sample([8, 8], 8)]), self.file_path, 1)
+        dataset = self.sut.load(self.file_path)
+        self.assertListEqual([0, 9, 8, 3], [data[0] for data in dataset.get_output()])
+
+    def test_update_given_rows_out_of_saved_ones_should_raise_exception(self):
+        self.sut.save(Dataset([Sample([1, 2], 1)]), self.file_path)
+        self.assertRaises(ValueError, self.sut.update, Dataset([Sample([1, 2], 1)] * 2), self.file_path, 0)
+
+    def test_update_given_unexisting_path_should_raise_exception(self):
+        self.assertRaises(ValueError, self.sut.update, Dataset([Sample([1, 2], 1)]), self.file_path, 0)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,173 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from dframe.dataset.dataset import Dataset
+from dframe.dataset.instrumentation import IOStatistics, add_listener, remove_listener, record_operation
+from dframe.dataset.persistence import H5pyPersistenceManager, PicklePersistenceManager
+from dframe.dataset.quantization import QuantizationPolicy, Float16Quantizer
+from dframe.dataset.sample import Sample
+
+
+class MemoryReportTest(unittest.TestCase):
+    def setUp(self):
+        self.sut = Dataset([Sample([np.zeros(100, np.float32), 's{:03d}'.format(idx)], [idx]) for idx in range(10)])
+
+    def test_memory_report_should_give_payload_of_each_slot(self):
+        report = self.sut.memory_report()
+        self.assertEqual(10, report['num_samples'])
+        self.assertEqual(10, report['measured_samples'])
+        self.assertEqual(2, len(report['inputs']))
+        self.assertEqual(10 * 400, report['inputs'][0]['payload_bytes'])
+        self.assertEqual(10 * 4, report['inputs'][1]['payload_bytes'])
+        self.assertEqual(10 * 8, report['outputs'][0]['payload_bytes'])
+
+    def test_memory_report_should_give_overhead_of_objects(self):
+        report = self.sut.memory_report()
+        self.assertGreater(report['inputs'][0]['overhead_bytes'], 0)
+        self.assertGreater(report['sample_overhead_bytes'], 0)
+        self.assertGreater(report['container_bytes'], 0)
+        self.assertEqual(0, report['cache_bytes'])
+        slots = report['inputs'] + report['outputs']
+        self.assertEqual(sum(slot['payload_bytes'] + slot['overhead_bytes'] for slot in slots) +
+                         report['sample_overhead_bytes'] + report['container_bytes'], report['total_bytes'])
+
+    def test_memory_report_given_samples_without_outputs_should_have_no_outputs(self):
+        self.assertIsNone(Dataset([Sample([1, 2])]).memory_report()['outputs'])
+
+    def test_memory_report_should_count_shared_objects_once(self):
+        data = np.zeros(1000)
+        report = Dataset([Sample([data]) for _ in range(5)]).memory_report()
+        self.assertEqual(data.nbytes, report['inputs'][0]['payload_bytes'])
+
+    def test_memory_report_given_cached_samples_should_count_cache(self):
+        for sample in self.sut:
+            sample.set_cache(True)
+            sample.get_input()
+        self.assertGreater(self.sut.memory_report()['cache_bytes'], 0)
+
+    def test_memory_report_given_max_samples_should_extrapolate(self):
+        report = self.sut.memory_report(max_samples=5, seed=0)
+        self.assertEqual(5, report['measured_samples'])
+        self.assertEqual(10 * 400, report['inputs'][0]['payload_bytes'])
+
+    def test_memory_report_given_quantized_dataset_should_give_encoded_payload(self):
+        quantized = self.sut.quantize(QuantizationPolicy(inputs={0: Float16Quantizer()}))
+        # The encoded data and the position of each sample in it
+        self.assertEqual(10 * 200 + 10 * 8, quantized.memory_report()['inputs'][0]['payload_bytes'])
+
+    def test_memory_report_given_max_samples_of_quantized_dataset_should_extrapolate_encoded_rows(self):
+        dataset = Dataset([Sample([np.zeros(64, np.float32)], [idx]) for idx in range(1000)])
+        quantized = dataset.quantize(QuantizationPolicy(inputs={0: Float16Quantizer()}))
+        report = quantized.memory_report(max_samples=100, seed=0)
+        self.assertEqual(100, report['measured_samples'])
+        self.assertEqual(1000 * 128 + 1000 * 8, report['inputs'][0]['payload_bytes'])
+
+    def test_memory_report_given_view_should_only_count_its_indices_as_container(self):
+        view = self.sut.view(slice(0, 5))
+        report = view.memory_report()
+        self.assertEqual(5, report['num_samples'])
+        self.assertLess(report['container_bytes'], self.sut.memory_report()['container_bytes'])
+
+
+class PersistenceInstrumentationTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'dataset')
+        self.dataset = Dataset([Sample([np.ones(4, np.float32)], [idx]) for idx in range(10)])
+        self.reports = []
+        add_listener(self.reports.append)
+
+    def tearDown(self):
+        remove_listener(self.reports.append)
+        shutil.rmtree(self.directory)
+
+    # ----------------------- Reports ---------------------------
+
+    def test_h5py_save_should_report_format_and_write_phases(self):
+        H5pyPersistenceManager().save(self.dataset, self.path)
+        report = self.reports[-1]
+        self.assertEqual(('H5pyPersistenceManager', 'save', self.path, 10),
+                         (report['manager'], report['operation'], report['path'], report['num_samples']))
+        self.assertEqual(os.path.getsize(self.path), report['bytes'])
+        self.assertIsNone(report['error'])
+        self.assertItemsEqual(['format', 'write'], report['phases'])
+        self.assertEqual(10 * 16 + 10 * 8, report['phases']['write']['bytes'])
+
+    def test_h5py_load_should_report_read_and_build_phases(self):
+        H5pyPersistenceManager().save(self.dataset, self.path)
+        loaded = H5pyPersistenceManager().load(self.path)
+        report = self.reports[-1]
+        self.assertEqual(('load', 10), (report['operation'], report['num_samples']))
+        self.assertItemsEqual(['read', 'build'], report['phases'])
+        self.assertEqual(10 * 16 + 10 * 8, report['phases']['read']['bytes'])
+        self.assertEqual([1, 1, 1, 1], list(loaded.get_input()[9][0]))
+        self.assertEqual(9, loaded.get_output()[9][0])
+
+    def test_h5py_append_and_update_should_report_operations(self):
+        manager = H5pyPersistenceManager(policy=QuantizationPolicy(inputs={0: Float16Quantizer()}))
+        manager.save(self.dataset, self.path)
+        manager.append(self.dataset, self.path)
+        manager.update(self.dataset.view(slice(0, 2)), self.path, 0)
+        self.assertEqual(['save', 'append', 'update'], [report['operation'] for report in self.reports])
+        self.assertEqual(10 * 8 + 10 * 8, self.reports[1]['phases']['write']['bytes'])
+        self.assertEqual(2, self.reports[2]['num_samples'])
+
+    def test_pickle_save_and_load_should_report_file_bytes(self):
+        PicklePersistenceManager().save(self.dataset, self.path)
+        PicklePersistenceManager().load(self.path)
+        size = os.path.getsize(self.path)
+        self.assertEqual([size, size], [report['phases'].values()[0]['bytes'] for report in self.reports])
+        self.assertEqual(['write', 'read'], [report['phases'].keys()[0] for report in self.reports])
+
+    def test_record_operation_given_error_should_report_it_and_raise_it(self):
+        with self.assertRaises(ValueError):
+            with record_operation(PicklePersistenceManager(), 'save', self.path):
+                raise ValueError('error')
+        self.assertIsInstance(self.reports[-1]['error'], ValueError)
+
+    def test_record_operation_given_failing_listener_should_report_to_the_rest(self):
+        # Called before the listener that keeps the reports
+        remove_listener(self.reports.append)
+        add_listener(_fail)
+        add_listener(self.reports.append)
+        try:
+            PicklePersistenceManager().save(self.dataset, self.path)
+            with self.assertRaises(KeyError):
+                with record_operation(PicklePersistenceManager(), 'load', self.path):
+                    raise KeyError('error')
+        finally:
+            remove_listener(_fail)
+        self.assertEqual(['save', 'load'], [report['operation'] for report in self.reports])
+
+    # ----------------------- IOStatistics ---------------------------
+
+    def test_io_statistics_should_accumulate_operations_and_phases(self):
+        sut = IOStatistics()
+        add_listener(sut)
+        try:
+            manager = H5pyPersistenceManager()
+            manager.save(self.dataset, self.path)
+            manager.save(self.dataset, self.path)
+            manager.load(self.path)
+        finally:
+            remove_listener(sut)
+
+        totals = sut.to_dict()
+        self.assertEqual(2, totals['H5pyPersistenceManager.save']['count'])
+        self.assertEqual(20, totals['H5pyPersistenceManager.save']['num_samples'])
+        self.assertEqual(2 * (10 * 16 + 10 * 8), totals['H5pyPersistenceManager.save']['phases']['write']['bytes'])
+        self.assertEqual(1, totals['H5pyPersistenceManager.load']['count'])
+        sut.reset()
+        self.assertEqual({}, sut.to_dict())
+
+
+def _fail(report):
+    raise ValueError('Failing listener')
+
+
+if __name__ == '__main__':
+    unittest.main()
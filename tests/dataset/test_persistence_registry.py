@@ -0,0 +1,88 @@
+import os
+import subprocess
+import sys
+import time
+import unittest
+
+from dframe.dataset.persistence import PERSISTENCE_MANAGERS, H5pyPersistenceManager, PicklePersistenceManager, \
+    get_persistence_manager, get_persistence_manager_class, register_persistence_manager
+from dframe.dataset.sharding import ShardedPersistenceManager
+
+ROOT_PATH = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Maximum time to import the package modules in a new interpreter, relative to the time a bare interpreter takes to
+# start and exit. The imports take about 10 times that (mostly numpy), so the budget does not depend on the machine and
+# only fails if some heavy library is imported again at module load
+IMPORT_TIME_FACTOR = 30
+
+IMPORT_SCRIPT = """
+import sys
+import dframe
+import dframe.dataset.dataset
+import dframe.dataset.persistence
+import dframe.dataset.sharding
+import dframe.pipeline.pipeline
+print(' '.join(name for name in ('h5py', 'scipy') if name in sys.modules))
+"""
+
+
+class PersistenceRegistryTest(unittest.TestCase):
+    def setUp(self):
+        self.registered = dict(PERSISTENCE_MANAGERS)
+
+    def tearDown(self):
+        PERSISTENCE_MANAGERS.clear()
+        PERSISTENCE_MANAGERS.update(self.registered)
+
+    # ----------------------- Registry ---------------------------
+
+    def test_get_persistence_manager_given_builtin_names_should_return_their_managers(self):
+        self.assertIsInstance(get_persistence_manager('h5py'), H5pyPersistenceManager)
+        self.assertIsInstance(get_persistence_manager('pickle'), PicklePersistenceManager)
+        self.assertIsInstance(get_persistence_manager('sharded'), ShardedPersistenceManager)
+
+    def test_get_persistence_manager_given_arguments_should_create_manager_with_them(self):
+        manager = get_persistence_manager('sharded', shard_format='pickle', shard_size=3)
+        self.assertEqual('pickle', manager.shard_format)
+        self.assertEqual(3, manager.shard_size)
+
+    def test_get_persistence_manager_class_given_unknown_name_should_raise_exception(self):
+        self.assertRaises(ValueError, get_persistence_manager_class, 'csv')
+
+    def test_register_persistence_manager_given_path_should_import_it_on_first_use(self):
+        register_persistence_manager('custom', 'dframe.dataset.persistence:PicklePersistenceManager')
+        self.assertEqual('dframe.dataset.persistence:PicklePersistenceManager', PERSISTENCE_MANAGERS['custom'])
+        self.assertIs(PicklePersistenceManager, get_persistence_manager_class('custom'))
+        self.assertIs(PicklePersistenceManager, PERSISTENCE_MANAGERS['custom'])
+
+    def test_register_persistence_manager_given_class_should_register_it(self):
+        register_persistence_manager('custom', H5pyPersistenceManager)
+        self.assertIs(H5pyPersistenceManager, get_persistence_manager_class('custom'))
+
+    def test_register_persistence_manager_given_non_manager_should_raise_exception(self):
+        self.assertRaises(TypeError, register_persistence_manager, 'custom', object)
+        self.assertRaises(ValueError, register_persistence_manager, 'custom', 'dframe.dataset.persistence')
+
+    # ----------------------- Import ---------------------------
+
+    def test_import_package_should_not_import_optional_backends(self):
+        output = subprocess.check_output([sys.executable, '-c', IMPORT_SCRIPT], cwd=ROOT_PATH)
+        self.assertEqual('', output.strip())
+
+    def test_import_package_should_be_within_budget_relative_to_bare_interpreter(self):
+        startup_time = run_time('pass')
+        self.assertLess(run_time(IMPORT_SCRIPT), IMPORT_TIME_FACTOR * startup_time)
+
+
+def run_time(script, repetitions=3):
+    """Returns the best wall time, in seconds, of running the script in a new interpreter"""
+    times = []
+    for _ in range(repetitions):
+        start = time.time()
+        subprocess.check_output([sys.executable, '-c', script], cwd=ROOT_PATH)
+        times.append(time.time() - start)
+    return min(times)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,159 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import h5py
+import numpy as np
+
+from dframe.dataset.dataset import Dataset
+from dframe.dataset.persistence import H5pyPersistenceManager
+from dframe.dataset.quantization import Float16Quantizer, Int8Quantizer, BitPackQuantizer, QuantizationPolicy, \
+    QuantizedValue
+from dframe.dataset.sample import Sample
+from dframe.dataset.sparse import SparseVector
+from dframe.dataset.statistics import RunningStats
+
+
+class QuantizerTest(unittest.TestCase):
+    def test_float16_should_halve_precision(self):
+        sut = Float16Quantizer()
+        encoded = sut.encode([0.1, 2.5])
+        self.assertEqual(np.float16, encoded.dtype)
+        np.testing.assert_allclose([0.1, 2.5], sut.decode(encoded), rtol=1e-3)
+
+    def test_int8_fit_should_cover_range_of_values(self):
+        values = np.random.RandomState(0).uniform(-5, 20, (50, 3))
+        sut = Int8Quantizer.fit(values)
+        encoded = sut.encode(values)
+        self.assertEqual(np.int8, encoded.dtype)
+        np.testing.assert_allclose(values, sut.decode(encoded), atol=25 / 254.0)
+
+    def test_int8_from_statistics_should_use_min_and_max(self):
+        stats = RunningStats()
+        stats.update(np.array([[0.0], [10.0]]))
+        sut = Int8Quantizer.from_statistics(stats)
+        np.testing.assert_allclose([[0.0], [10.0]], sut.decode(sut.encode([[0.0], [10.0]])), atol=1e-5)
+
+    def test_int8_given_constant_values_should_decode_them_exactly(self):
+        sut = Int8Quantizer.fit([[3.0], [3.0]])
+        self.assertEqual(3.0, sut.decode(sut.encode([3.0]))[0])
+
+    def test_int8_represents_given_values_out_of_range_should_be_false(self):
+        sut = Int8Quantizer.fit([[0.0], [1.0]])
+        self.assertTrue(sut.represents([[0.5], [1.0]], sut.encode([[0.5], [1.0]])))
+        self.assertFalse(sut.represents([[0.5], [10.0]], sut.encode([[0.5], [10.0]])))
+
+    def test_float16_represents_given_values_out_of_range_should_be_false(self):
+        sut = Float16Quantizer()
+        self.assertTrue(sut.represents([1.0, 1e4], sut.encode([1.0, 1e4])))
+        self.assertFalse(sut.represents([1.0, 1e6], sut.encode([1.0, 1e6])))
+
+    def test_bitpack_should_pack_eight_booleans_per_byte(self):
+        values = np.random.RandomState(0).rand(4, 20) > 0.5
+        sut = BitPackQuantizer()
+        encoded = sut.encode(values)
+        self.assertEqual((4, 3), encoded.shape)
+        np.testing.assert_array_equal(values, sut.decode(encoded))
+        np.testing.assert_array_equal(values[1], sut.decode(encoded[1]))
+
+
+class QuantizedDatasetTest(unittest.TestCase):
+    def setUp(self):
+        random_state = np.random.RandomState(0)
+        self.features = random_state.uniform(0, 1, (10, 8))
+        self.flags = random_state.rand(10, 16) > 0.5
+        self.dataset = Dataset([Sample([self.features[idx], self.flags[idx], idx], [float(idx)])
+                                for idx in range(10)])
+        self.policy = QuantizationPolicy({0: Int8Quantizer.fit(self.features), 1: BitPackQuantizer()},
+                                         {0: Float16Quantizer()})
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'dataset.h5')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def assert_dataset_data(self, dataset):
+        inputs = dataset.get_input(axis_samples=False)
+        np.testing.assert_allclose(self.features, inputs[0], atol=1 / 254.0)
+        np.testing.assert_array_equal(self.flags, inputs[1])
+        self.assertListEqual(range(10), list(inputs[2]))
+        np.testing.assert_allclose(range(10), [output[0] for output in dataset.get_output()])
+
+    # ----------------------- In memory ---------------------------
+    def test_quantize_should_keep_encoded_data_in_samples(self):
+        quantized = self.dataset.quantize(self.policy, batch_size=3)
+        sample_inputs = quantized.get_samples()[0].get_exact_inputs()
+        self.assertIsInstance(sample_inputs[0], QuantizedValue)
+        self.assertEqual(np.int8, sample_inputs[0].data.dtype)
+        self.assertEqual(2, sample_inputs[1].data.nbytes)
+        self.assert_dataset_data(quantized)
+
+    def test_quantize_should_share_encoded_column_between_samples(self):
+        quantized = self.dataset.quantize(self.policy)
+        first, second = [sample.get_exact_inputs()[0] for sample in quantized.get_samples()[:2]]
+        self.assertIs(first.column, second.column)
+        self.assertEqual((10, 8), first.column.shape)
+
+    def test_quantize_given_scalar_slot_should_keep_it_as_it_is(self):
+        quantized = self.dataset.quantize(self.policy)
+        self.assertEqual(3.0, quantized.get_samples()[3].get_exact_outputs()[0])
+        self.assertNotIsInstance(quantized.get_samples()[3].get_exact_outputs()[0], QuantizedValue)
+
+    def test_quantize_given_small_slots_should_not_take_more_memory(self):
+        dataset = Dataset([Sample([np.ones(4)], [float(idx)]) for idx in range(100)])
+        quantized = dataset.quantize(QuantizationPolicy({0: Float16Quantizer()}, {0: Float16Quantizer()}))
+        self.assertLess(quantized.memory_report()['total_bytes'], dataset.memory_report()['total_bytes'])
+
+    # ----------------------- On disk ---------------------------
+    def test_save_given_policy_should_store_encoded_slots(self):
+        H5pyPersistenceManager(self.policy).save(self.dataset, self.path)
+        with h5py.File(self.path, 'r') as f:
+            self.assertEqual(np.int8, f['inputs/0'].dtype)
+            self.assertEqual((10, 2), f['inputs/1'].shape)
+            self.assertEqual(np.float16, f['outputs/0'].dtype)
+
+    def test_load_given_quantized_file_should_decode_data(self):
+        H5pyPersistenceManager(self.policy).save(self.dataset, self.path)
+        dataset = H5pyPersistenceManager().load(self.path)
+        self.assertIsInstance(dataset.get_samples()[0].get_exact_inputs()[0], QuantizedValue)
+        self.assert_dataset_data(dataset)
+
+    def test_load_given_quantized_scalar_slot_should_decode_it(self):
+        H5pyPersistenceManager(self.policy).save(self.dataset, self.path)
+        dataset = H5pyPersistenceManager().load(self.path)
+        self.assertNotIsInstance(dataset.get_samples()[0].get_exact_outputs()[0], QuantizedValue)
+
+    def test_append_given_quantized_file_should_encode_new_samples(self):
+        H5pyPersistenceManager(self.policy).save(self.dataset.view(slice(0, 4)), self.path)
+        H5pyPersistenceManager().append(self.dataset.view(slice(4, None)), self.path)
+        self.assert_dataset_data(H5pyPersistenceManager().load(self.path))
+
+    def test_append_given_values_out_of_quantizer_range_should_raise_exception(self):
+        H5pyPersistenceManager(self.policy).save(self.dataset, self.path)
+        samples = [Sample([features * 10, flags, idx], [float(idx)])
+                   for idx, (features, flags) in enumerate(zip(self.features, self.flags))]
+        self.assertRaises(ValueError, H5pyPersistenceManager().append, Dataset(samples), self.path)
+        self.assert_dataset_data(H5pyPersistenceManager().load(self.path))
+
+    def test_append_given_invalid_output_should_not_write_inputs(self):
+        sut = H5pyPersistenceManager(QuantizationPolicy({0: Float16Quantizer()}))
+        sut.save(Dataset([Sample([np.ones(3)], [1.0])]), self.path)
+        self.assertRaises(ValueError, sut.append, Dataset([Sample([np.ones(3)], [[1.0, 2.0]])] * 2), self.path)
+        with h5py.File(self.path, 'r') as f:
+            self.assertEqual((1, 3), f['inputs/0'].shape)
+            self.assertEqual((1,), f['outputs/0'].shape)
+
+    def test_append_given_invalid_sparse_slot_should_not_write_other_slots(self):
+        sut = H5pyPersistenceManager()
+        sut.save(Dataset([Sample([np.ones(3), SparseVector([1], [1.0], 10)], [1.0])]), self.path)
+        self.assertRaises(ValueError, sut.append, Dataset([Sample([np.ones(3), SparseVector([1], [1.0], 20)], [1.0])]),
+                          self.path)
+        with h5py.File(self.path, 'r') as f:
+            self.assertEqual((1, 3), f['inputs/0'].shape)
+            self.assertEqual((1,), f['inputs/1/data'].shape)
+            self.assertEqual((1,), f['outputs/0'].shape)
+
+
+if __name__ == '__main__':
+    unittest.main()
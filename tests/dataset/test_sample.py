@@ -1,3 +1,4 @@
+import cPickle
 import unittest
 
 from dframe.dataset.sample import Sample, Value
@@ -8,11 +9,55 @@ class SampleTest(unittest.TestCase):
     def test_construct_sample_with_none_inputs_should_raise_exception(self):
         self.assertRaises(ValueError, Sample, None)
 
+    def test_construct_sample_should_not_have_dict(self):
+        self.assertFalse(hasattr(Sample(1), '__dict__'))
+
     # ----------------------- Get output ---------------------------
     def test_get_output_without_output_should_raise_exception(self):
         sample = Sample(1)
         self.assertRaises(AttributeError, sample.get_output)
 
+    def test_get_output_with_zero_output_should_return_it(self):
+        self.assertListEqual([0], Sample(1, 0).get_output())
+
+    # ----------------------- Cache ---------------------------
+    def test_get_input_without_cache_should_compute_data_every_call(self):
+        value = CountingValue(1)
+        sample = Sample([value])
+        sample.get_input()
+        sample.get_input()
+        self.assertEqual(2, value.calls)
+
+    def test_get_input_with_cache_should_compute_data_once(self):
+        value = CountingValue(1)
+        sample = Sample([value], [value], cache=True)
+        self.assertListEqual([1], sample.get_input())
+        self.assertListEqual([1], sample.get_input())
+        self.assertListEqual([1], sample.get_output())
+        self.assertEqual(2, value.calls)
+
+    def test_set_cache_false_should_drop_cached_data(self):
+        value = CountingValue(1)
+        sample = Sample([value], cache=True)
+        sample.get_input()
+        sample.set_cache(False)
+        sample.get_input()
+        self.assertEqual(2, value.calls)
+
+    # ----------------------- Pickle ---------------------------
+    def test_pickle_should_recover_sample_without_cached_data(self):
+        sample = Sample([1, 2], 3, cache=True)
+        sample.get_input()
+        recovered = cPickle.loads(cPickle.dumps(sample))
+        self.assertListEqual([1, 2], recovered.get_input())
+        self.assertListEqual([3], recovered.get_output())
+        self.assertEqual(2, recovered.num_inputs)
+
+    def test_pickle_subclass_should_recover_its_attributes(self):
+        sample = cPickle.loads(cPickle.dumps(NamedSample('name', [1])))
+        self.assertEqual('name', sample.name)
+        self.assertListEqual([1], sample.get_input())
+
     # ----------------------- Get data ---------------------------
     def test_get_data_with_none_should_return_none(self):
         self.assertIsNone(Sample._get_data(None))
@@ -49,5 +94,21 @@ class DummyValue(Value):
         return self.data
 
 
+class CountingValue(Value):
+    def __init__(self, data):
+        self.data = data
+        self.calls = 0
+
+    def get_data(self):
+        self.calls += 1
+        return self.data
+
+
+class NamedSample(Sample):
+    def __init__(self, name, inputs, outputs=None):
+        super(NamedSample, self).__init__(inputs, outputs)
+        self.name = name
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,82 @@
+import unittest
+from collections import Counter
+
+import numpy as np
+
+from dframe.dataset.dataset import Dataset
+from dframe.dataset.sample import Sample
+from dframe.dataset.sampling import AliasSampler, CumulativeSampler, StratifiedSampler
+
+
+class AliasSamplerTest(unittest.TestCase):
+    def test_sample_should_draw_proportionally_to_weights(self):
+        sut = AliasSampler([1, 0, 3])
+        counts = np.bincount(sut.sample(40000, np.random.RandomState(0)), minlength=3)
+        self.assertEqual(0, counts[1])
+        self.assertAlmostEqual(0.75, counts[2] / 40000.0, places=2)
+
+    def test_update_should_change_probabilities(self):
+        sut = AliasSampler([1, 1])
+        sut.update(0, 0)
+        self.assertTrue((sut.sample(100) == 1).all())
+
+    def test_init_given_negative_weight_should_raise_exception(self):
+        self.assertRaises(ValueError, AliasSampler, [1, -1])
+
+
+class CumulativeSamplerTest(unittest.TestCase):
+    def test_sample_should_draw_proportionally_to_weights(self):
+        sut = CumulativeSampler([2, 0, 1, 1, 0])
+        counts = np.bincount(sut.sample(20000, np.random.RandomState(0)), minlength=5)
+        self.assertEqual(0, counts[1] + counts[4])
+        self.assertAlmostEqual(0.5, counts[0] / 20000.0, places=1)
+
+    def test_update_should_keep_total_of_weights(self):
+        sut = CumulativeSampler([1, 2, 3, 4, 5, 6, 7])
+        sut.update(3, 10)
+        self.assertEqual(34, sut.total())
+
+    def test_update_should_change_draws(self):
+        sut = CumulativeSampler([1, 1, 1])
+        sut.update(0, 0)
+        sut.update(1, 0)
+        self.assertTrue((sut.sample(100) == 2).all())
+
+    def test_update_given_negative_weight_should_raise_exception(self):
+        self.assertRaises(ValueError, CumulativeSampler([1]).update, 0, -1)
+
+
+class StratifiedSamplerTest(unittest.TestCase):
+    def test_sample_should_balance_classes(self):
+        labels = ['a'] * 90 + ['b'] * 10
+        sut = StratifiedSampler(labels)
+        counts = Counter(labels[position] for position in sut.sample(10000, np.random.RandomState(0)))
+        self.assertAlmostEqual(0.5, counts['b'] / 10000.0, places=1)
+
+    def test_sample_given_class_weights_should_follow_them(self):
+        sut = StratifiedSampler(['a', 'b', 'b'], class_weights={'a': 1.0})
+        self.assertTrue((sut.sample(50) == 0).all())
+
+
+class SampledBatchGeneratorTest(unittest.TestCase):
+    def setUp(self):
+        self.dataset = Dataset([Sample([idx], [int(idx < 2)]) for idx in range(10)])
+
+    def test_sampled_batch_generator_should_draw_batches_with_sampler(self):
+        sampler = StratifiedSampler(self.dataset.get_labels())
+        _, outputs = next(self.dataset.sampled_batch_generator(1000, sampler, seed=0))
+        self.assertAlmostEqual(0.5, np.mean(outputs[0]), places=1)
+
+    def test_sampled_batch_generator_given_same_seed_should_repeat_batches(self):
+        sampler = AliasSampler(range(1, 11))
+        first = next(self.dataset.sampled_batch_generator(5, sampler, seed=3))
+        second = next(self.dataset.sampled_batch_generator(5, sampler, seed=3))
+        self.assertListEqual(first[0], second[0])
+
+    def test_sampled_batch_generator_given_sampler_of_other_size_should_raise_exception(self):
+        generator = self.dataset.sampled_batch_generator(5, AliasSampler([1, 1]))
+        self.assertRaises(ValueError, next, generator)
+
+
+if __name__ == '__main__':
+    unittest.main()
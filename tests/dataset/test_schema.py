@@ -0,0 +1,141 @@
+import unittest
+
+import numpy as np
+
+from dframe.dataset.dataset import Dataset
+from dframe.dataset.sample import Sample, Value
+from dframe.dataset.schema import Schema, SlotSchema
+
+
+class SchemaTest(unittest.TestCase):
+    # ----------------------- Infer ---------------------------
+    def test_infer_given_non_sample_should_raise_exception(self):
+        self.assertRaises(TypeError, Schema.infer, 1)
+
+    def test_infer_given_sample_with_collections_should_describe_each_slot(self):
+        sut = Schema.infer(Sample([1, DummyValue([1.0, 2.0])], [0]))
+        self.assertEqual(2, sut.num_inputs)
+        self.assertEqual(1, sut.num_outputs)
+        self.assertTrue(sut.inputs_collection)
+        self.assertFalse(sut.input_slots[0].is_value)
+        self.assertTrue(sut.input_slots[1].is_value)
+        self.assertEqual((2,), sut.input_slots[1].shape)
+        self.assertEqual(np.dtype(float), sut.input_slots[1].dtype)
+
+    def test_infer_given_single_items_should_not_be_collections(self):
+        sut = Schema.infer(Sample(DummyValue([1, 2]), 1))
+        self.assertFalse(sut.inputs_collection)
+        self.assertFalse(sut.outputs_collection)
+        self.assertTrue(sut.input_slots[0].is_value)
+
+    def test_infer_given_sample_without_outputs_should_not_have_output_slots(self):
+        sut = Schema.infer(Sample([1, 2]))
+        self.assertIsNone(sut.output_slots)
+        self.assertEqual(0, sut.num_outputs)
+
+    # ----------------------- Validate ---------------------------
+    def test_validate_given_different_num_inputs_should_raise_exception(self):
+        sut = Schema.infer(Sample([1, 2], 1))
+        self.assertRaises(ValueError, sut.validate, Sample([1, 2, 3], 1))
+
+    def test_validate_given_value_instead_of_raw_should_raise_exception(self):
+        sut = Schema.infer(Sample([1, 2], 1))
+        self.assertRaises(ValueError, sut.validate, Sample([1, DummyValue(2)], 1))
+
+    def test_validate_given_missing_outputs_should_raise_exception(self):
+        sut = Schema.infer(Sample([1, 2], 1))
+        self.assertRaises(ValueError, sut.validate, Sample([1, 2]))
+
+    def test_validate_given_incompatible_dtype_should_raise_exception(self):
+        sut = Schema.infer(Sample([1, 2], 1))
+        self.assertRaises(ValueError, sut.validate, Sample([1, 'a'], 1))
+
+    def test_validate_given_numeric_dtypes_should_accept_them(self):
+        sut = Schema.infer(Sample([1, 2], 1))
+        sut.validate(Sample([1.5, 2], 0.5))
+
+    def test_validate_given_different_length_should_mark_dimension_as_variable(self):
+        sut = Schema.infer(Sample([DummyValue([1, 2])], 1))
+        sut.validate(Sample([DummyValue([1, 2, 3])], 1))
+        self.assertEqual((None,), sut.input_slots[0].shape)
+
+    def test_validate_given_invalid_sample_should_not_change_shapes(self):
+        sut = Schema.infer(Sample([DummyValue([1, 2])], 1))
+        self.assertRaises(ValueError, sut.validate, Sample([DummyValue([1, 2, 3])], 'a'))
+        self.assertEqual((2,), sut.input_slots[0].shape)
+
+    def test_validate_all_given_invalid_sample_should_not_change_shapes(self):
+        sut = Schema.infer(Sample([DummyValue([1, 2])], 1))
+        self.assertRaises(ValueError, sut.validate_all, [Sample([DummyValue([1, 2, 3])], 1),
+                                                         Sample([DummyValue([1])], 'a')])
+        self.assertEqual((2,), sut.input_slots[0].shape)
+
+    def test_validate_all_given_different_lengths_should_mark_dimension_as_variable(self):
+        sut = Schema.infer(Sample([DummyValue([1, 2])], 1))
+        sut.validate_all([Sample([DummyValue([1, 2])], 1), Sample([DummyValue([1, 2, 3])], 1)])
+        self.assertEqual((None,), sut.input_slots[0].shape)
+        self.assertEqual((), sut.output_slots[0].shape)
+
+    # ----------------------- Format ---------------------------
+    def test_format_input_should_get_data_of_values_only(self):
+        sut = Schema([SlotSchema(False, int, ()), SlotSchema(True, int, (3,))])
+        self.assertListEqual([1, [1, 2, 3]], sut.format_input([1, DummyValue([1, 2, 3])]))
+
+    def test_format_input_given_single_item_should_wrap_it(self):
+        sut = Schema([SlotSchema(False, int, ())], inputs_collection=False)
+        self.assertListEqual([1], sut.format_input(1))
+
+    # ----------------------- Dataset ---------------------------
+    def test_dataset_infer_schema_given_inconsistent_samples_should_raise_exception(self):
+        sut = Dataset([Sample([1, 2], 1), Sample([1], 1)])
+        self.assertRaises(ValueError, sut.infer_schema)
+        self.assertIsNone(sut.get_schema())
+
+    def test_dataset_add_with_schema_should_validate_samples(self):
+        sut = Dataset([Sample([1, 2], 1)])
+        sut.infer_schema()
+        self.assertRaises(ValueError, sut.add, [Sample([3, 4], 1), Sample([1], 1)])
+        self.assertEqual(1, sut.len())
+        sut.add(Sample([3, 4], 0))
+        self.assertEqual(2, sut.len())
+
+    def test_dataset_add_given_rejected_samples_should_not_change_schema(self):
+        sut = Dataset([Sample([DummyValue([1, 2])], 1)])
+        sut.infer_schema()
+        self.assertRaises(ValueError, sut.add, [Sample([DummyValue([1, 2, 3])], 1), Sample([DummyValue([1])], 'a')])
+        self.assertEqual((2,), sut.get_schema().input_slots[0].shape)
+
+    def test_dataset_get_input_with_schema_given_sample_without_schema_argument_should_return_its_data(self):
+        sut = Dataset([PlainSample([1, 2], 1), PlainSample([3, 4], 0)])
+        sut.infer_schema()
+        self.assertEqual([[2, 3], [4, 5]], sut.get_input())
+        self.assertEqual([[1], [0]], sut.get_output())
+
+    def test_dataset_get_input_with_schema_should_return_same_data(self):
+        samples = [Sample([1, DummyValue([1, 2])], 1), Sample([3, DummyValue([3, 4])], 0)]
+        sut = Dataset(list(samples))
+        expected = sut.get_input(axis_samples=False), sut.get_output()
+        sut.infer_schema()
+        self.assertEqual(expected, (sut.get_input(axis_samples=False), sut.get_output()))
+
+
+class PlainSample(Sample):
+    """Sample overriding get_input/get_output without the schema argument"""
+
+    def get_input(self):
+        return [data + 1 for data in self.get_exact_inputs()]
+
+    def get_output(self):
+        return [self.get_exact_outputs()]
+
+
+class DummyValue(Value):
+    def __init__(self, data):
+        self.data = data
+
+    def get_data(self):
+        return self.data
+
+
+if __name__ == '__main__':
+    unittest.main()
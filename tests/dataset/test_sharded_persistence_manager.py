@@ -0,0 +1,126 @@
+import json
+import os
+import shutil
+import gc
+import tempfile
+import unittest
+import weakref
+
+from dframe.dataset.dataset import Dataset
+from dframe.dataset.sample import Sample
+from dframe.dataset.sharding import ShardedPersistenceManager
+
+
+class ShardedPersistenceManagerTest(unittest.TestCase):
+    def setUp(self):
+        self.sut = ShardedPersistenceManager(shard_size=4, processes=2)
+        self.path = os.path.join(tempfile.mkdtemp(), 'sharded')
+        self.dataset = Dataset([Sample([idx, idx], [idx]) for idx in range(10)])
+
+    def tearDown(self):
+        shutil.rmtree(os.path.dirname(self.path))
+
+    def manifest(self):
+        with open(os.path.join(self.path, ShardedPersistenceManager.MANIFEST_NAME)) as f:
+            return json.load(f)
+
+    # ----------------------- Init ---------------------------
+    def test_init_given_unknown_format_should_raise_exception(self):
+        self.assertRaises(ValueError, ShardedPersistenceManager, 'csv')
+
+    # ----------------------- Save ---------------------------
+    def test_save_given_non_dataset_should_raise_exception(self):
+        self.assertRaises(TypeError, self.sut.save, 'non dataset', self.path)
+
+    def test_save_should_write_shards_and_manifest(self):
+        self.sut.save(self.dataset, self.path)
+        manifest = self.manifest()
+        self.assertListEqual([4, 4, 2], [shard['num_samples'] for shard in manifest['shards']])
+        self.assertEqual(10, manifest['num_samples'])
+        for shard in manifest['shards']:
+            self.assertTrue(os.path.isfile(os.path.join(self.path, shard['file'])))
+
+    def test_save_given_existing_dataset_should_remove_old_shards(self):
+        self.sut.save(self.dataset, self.path)
+        self.sut.save(self.dataset.view(slice(0, 3)), self.path)
+        self.assertEqual(2, len(os.listdir(self.path)))
+
+    def test_save_given_existing_dataset_should_not_overwrite_its_shards(self):
+        self.sut.save(self.dataset, self.path)
+        old_files = set(shard['file'] for shard in self.manifest()['shards'])
+        self.sut.save(self.dataset, self.path)
+        self.assertFalse(old_files & set(shard['file'] for shard in self.manifest()['shards']))
+
+    def test_save_given_failing_shard_should_keep_existing_dataset(self):
+        sut = ShardedPersistenceManager('pickle', shard_size=4, processes=1)
+        sut.save(self.dataset, self.path)
+        files = sorted(os.listdir(self.path))
+        failing = Dataset(self.dataset.get_samples()[:5] + [Sample([lambda: None])])
+        self.assertRaises(Exception, sut.save, failing, self.path)
+        self.assertListEqual(files, sorted(os.listdir(self.path)))
+        self.assertListEqual(self.dataset.get_input(), sut.load(self.path).get_input())
+
+    # ----------------------- Append ---------------------------
+    def test_append_should_add_shards_without_rewriting_existing_ones(self):
+        self.sut.save(self.dataset, self.path)
+        first_shard = os.path.join(self.path, self.manifest()['shards'][0]['file'])
+        modified = os.path.getmtime(first_shard)
+        self.sut.append(Dataset([Sample([10, 10], [10])]), self.path)
+        self.assertEqual(4, len(self.manifest()['shards']))
+        self.assertEqual(modified, os.path.getmtime(first_shard))
+        self.assertListEqual(range(11), [output[0] for output in self.sut.load(self.path).get_output()])
+
+    def test_append_given_other_format_should_raise_exception(self):
+        self.sut.save(self.dataset, self.path)
+        self.assertRaises(ValueError, ShardedPersistenceManager('pickle').append, self.dataset, self.path)
+
+    # ----------------------- Load ---------------------------
+    def test_load_given_unexisting_path_should_raise_exception(self):
+        self.assertRaises(TypeError, self.sut.load, self.path)
+
+    def test_load_should_return_samples_in_order(self):
+        self.sut.save(self.dataset, self.path)
+        dataset = self.sut.load(self.path)
+        self.assertListEqual([[idx, idx] for idx in range(10)], [list(data) for data in dataset.get_input()])
+        self.assertIsNotNone(dataset.get_schema())
+
+    def test_load_given_pickle_format_should_recover_samples(self):
+        sut = ShardedPersistenceManager('pickle', shard_size=3, processes=1)
+        sut.save(self.dataset, self.path)
+        self.assertListEqual(self.dataset.get_input(), sut.load(self.path).get_input())
+
+    # ----------------------- Batch generator ---------------------------
+    def test_batch_generator_should_stream_batches_across_shards(self):
+        self.sut.save(self.dataset, self.path)
+        generator = self.sut.batch_generator(self.path, 3, shuffle=False)
+        outputs = [next(generator)[1][0] for _ in range(4)]
+        self.assertListEqual([[0, 1, 2], [3, 4, 5], [6, 7, 8], [9]], [list(output) for output in outputs])
+
+    def test_batch_generator_should_not_keep_previous_shards_in_memory(self):
+        self.sut.save(self.dataset, self.path)
+        shard_samples = []
+        iter_shards = self.sut.iter_shards
+
+        def tracked_shards(path, shuffle=False):
+            for shard in iter_shards(path, shuffle):
+                shard._samples = TrackedList(shard._samples)
+                shard_samples.append(weakref.ref(shard._samples))
+                yield shard
+
+        self.sut.iter_shards = tracked_shards
+        generator = self.sut.batch_generator(self.path, 3, shuffle=False)
+        for _ in range(3):
+            next(generator)
+        gc.collect()
+        # The third batch is taken from the third shard, with samples left from the second one
+        self.assertEqual(3, len(shard_samples))
+        self.assertIsNone(shard_samples[0]())
+
+
+class TrackedList(list):
+    """List that can be referenced weakly"""
+    pass
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import h5py
+import numpy as np
+
+from dframe.dataset.batching import sample_size
+from dframe.dataset.dataset import Dataset
+from dframe.dataset.persistence import H5pyPersistenceManager
+from dframe.dataset.sample import Sample
+from dframe.dataset.sampling import AliasSampler
+from dframe.dataset.sharding import ShardedPersistenceManager
+from dframe.dataset.sparse import SparseVector, CSRBatch
+
+
+class SparseVectorTest(unittest.TestCase):
+    def test_from_dense_should_keep_non_zero_elements(self):
+        sut = SparseVector.from_dense([0, 3, 0, 0, 5])
+        self.assertListEqual([1, 4], sut.indices.tolist())
+        self.assertListEqual([0, 3, 0, 0, 5], sut.to_dense().tolist())
+
+    def test_init_given_index_out_of_size_should_raise_exception(self):
+        self.assertRaises(ValueError, SparseVector, [5], [1.0], 5)
+
+    def test_sample_given_sparse_input_should_count_it_as_one_input(self):
+        sample = Sample([SparseVector([1], [1.0], 1000), 3])
+        self.assertEqual(2, sample.num_inputs)
+        self.assertIsInstance(sample.get_input()[0], SparseVector)
+
+
+class CSRBatchTest(unittest.TestCase):
+    def setUp(self):
+        self.vectors = [SparseVector([0, 2], [1, 2], 4), SparseVector([], [], 4), SparseVector([3], [7], 4)]
+
+    def test_from_vectors_should_build_csr_arrays(self):
+        sut = CSRBatch.from_vectors(self.vectors)
+        self.assertEqual((3, 4), sut.shape)
+        self.assertListEqual([0, 2, 2, 3], sut.indptr.tolist())
+        self.assertListEqual([0, 2, 3], sut.indices.tolist())
+        self.assertListEqual([[1, 0, 2, 0], [0, 0, 0, 0], [0, 0, 0, 7]], sut.to_dense().tolist())
+
+    def test_row_should_return_sparse_vector(self):
+        self.assertEqual(self.vectors[2], CSRBatch.from_vectors(self.vectors).row(2))
+
+    def test_from_vectors_given_different_sizes_should_raise_exception(self):
+        self.assertRaises(ValueError, CSRBatch.from_vectors, [SparseVector([], [], 2), SparseVector([], [], 3)])
+
+
+class SparseDatasetTest(unittest.TestCase):
+    def setUp(self):
+        self.dataset = Dataset([Sample([SparseVector([idx], [float(idx)], 10), idx], [idx]) for idx in range(6)])
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'dataset.h5')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_batch_generator_should_assemble_sparse_inputs(self):
+        inputs, _ = next(self.dataset.batch_generator(4, shuffle=False))
+        self.assertIsInstance(inputs[0], CSRBatch)
+        self.assertEqual((4, 10), inputs[0].shape)
+        self.assertListEqual([0, 1, 2, 3], inputs[1])
+
+    def test_bucketed_batch_generator_should_assemble_sparse_inputs(self):
+        inputs, _, sizes = next(self.dataset.bucketed_batch_generator(3, num_buckets=1, shuffle=False, pad=True))
+        self.assertIsInstance(inputs[0], CSRBatch)
+        self.assertEqual((3, 10), inputs[0].shape)
+        self.assertListEqual([1, 1, 1], sizes.tolist())
+
+    def test_sampled_batch_generator_should_assemble_sparse_inputs(self):
+        inputs, _ = next(self.dataset.sampled_batch_generator(4, AliasSampler([1] * 6), seed=0))
+        self.assertIsInstance(inputs[0], CSRBatch)
+        self.assertEqual((4, 10), inputs[0].shape)
+
+    def test_sharded_batch_generator_should_assemble_sparse_inputs(self):
+        sut = ShardedPersistenceManager(shard_size=4, processes=1)
+        sut.save(self.dataset, self.path)
+        inputs, _ = next(sut.batch_generator(self.path, 5, shuffle=False))
+        self.assertIsInstance(inputs[0], CSRBatch)
+        self.assertEqual((5, 10), inputs[0].shape)
+
+    def test_transformed_batch_generator_should_assemble_sparse_inputs(self):
+        inputs, _ = next(self.dataset.map(lambda sample: sample).batch_generator(4, shuffle=False))
+        self.assertIsInstance(inputs[0], CSRBatch)
+
+    def test_sample_size_given_sparse_input_should_be_its_number_of_non_zero_elements(self):
+        self.assertEqual(2, sample_size(Sample([SparseVector([1, 5], [1.0, 1.0], 10)])))
+
+    def test_add_given_sparse_vector_of_other_size_should_raise_exception(self):
+        self.dataset.infer_schema()
+        self.assertRaises(ValueError, self.dataset.add, Sample([SparseVector([1], [1.0], 20), 6], [6]))
+        self.dataset.add(Sample([SparseVector([1], [1.0], 10), 6], [6]))
+        self.assertEqual(7, self.dataset.len())
+
+    def test_save_should_store_sparse_slots_in_csr_format(self):
+        H5pyPersistenceManager().save(self.dataset, self.path)
+        with h5py.File(self.path, 'r') as f:
+            self.assertListEqual([0, 1, 2, 3, 4, 5], f['inputs/0/indices'][()].tolist())
+            self.assertEqual(7, len(f['inputs/0/indptr']))
+
+    def test_load_should_recover_sparse_vectors(self):
+        H5pyPersistenceManager().save(self.dataset, self.path)
+        dataset = H5pyPersistenceManager().load(self.path)
+        self.assertEqual(SparseVector([4], [4.0], 10), dataset.get_input()[4][0])
+        self.assertListEqual(range(6), [data[1] for data in dataset.get_input()])
+
+    def test_append_should_extend_sparse_slots(self):
+        sut = H5pyPersistenceManager()
+        sut.save(self.dataset.view(slice(0, 4)), self.path)
+        sut.append(self.dataset.view(slice(4, None)), self.path)
+        sut.update(Dataset([Sample([SparseVector([1, 2], [1.0, 1.0], 10), 9], [9])]), self.path, 5)
+        inputs = sut.load(self.path).get_input()
+        self.assertEqual(SparseVector([4], [4.0], 10), inputs[4][0])
+        self.assertEqual(SparseVector([1, 2], [1.0, 1.0], 10), inputs[5][0])
+
+    def test_update_given_sparse_rows_in_the_middle_should_raise_exception(self):
+        H5pyPersistenceManager().save(self.dataset, self.path)
+        self.assertRaises(ValueError, H5pyPersistenceManager().update, self.dataset.view(slice(0, 1)), self.path, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
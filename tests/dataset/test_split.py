@@ -0,0 +1,89 @@
+import unittest
+from collections import Counter
+
+import numpy as np
+
+from dframe.dataset.dataset import Dataset
+from dframe.dataset.sample import Sample
+from dframe.dataset.split import split_indices, stratified_split_indices, k_fold_indices
+
+
+class SplitIndicesTest(unittest.TestCase):
+    def test_split_indices_should_cover_all_positions_once(self):
+        parts = split_indices(10, [0.6, 0.2, 0.2], seed=1)
+        self.assertListEqual([6, 2, 2], [len(part) for part in parts])
+        self.assertListEqual(range(10), sorted(sum((list(part) for part in parts), [])))
+
+    def test_split_indices_given_same_seed_should_return_same_parts(self):
+        first = split_indices(20, [0.5, 0.5], seed=3)
+        second = split_indices(20, [0.5, 0.5], seed=3)
+        self.assertListEqual(list(first[0]), list(second[0]))
+
+    def test_split_indices_given_no_shuffle_should_keep_order(self):
+        parts = split_indices(4, [0.5, 0.5], shuffle=False)
+        self.assertListEqual([[0, 1], [2, 3]], [list(part) for part in parts])
+
+    def test_split_indices_given_fractions_under_one_should_leave_samples_out(self):
+        parts = split_indices(10, [0.5], shuffle=False)
+        self.assertListEqual(range(5), list(parts[0]))
+
+    def test_split_indices_given_fractions_over_one_should_raise_exception(self):
+        self.assertRaises(ValueError, split_indices, 10, [0.7, 0.7])
+
+    def test_stratified_split_indices_should_keep_label_proportions(self):
+        labels = ['a'] * 80 + ['b'] * 20
+        parts = stratified_split_indices(labels, [0.5, 0.5], seed=0)
+        for part in parts:
+            self.assertEqual({'a': 40, 'b': 10}, Counter(labels[idx] for idx in part))
+
+    def test_k_fold_indices_should_validate_each_position_once(self):
+        folds = list(k_fold_indices(10, 3, seed=0))
+        self.assertEqual(3, len(folds))
+        validated = sorted(sum((list(validation) for _, validation in folds), []))
+        self.assertListEqual(range(10), validated)
+        for train, validation in folds:
+            self.assertFalse(set(train) & set(validation))
+            self.assertEqual(10, len(train) + len(validation))
+
+    def test_k_fold_indices_given_labels_should_stratify_folds(self):
+        labels = ['a'] * 8 + ['b'] * 4
+        for _, validation in k_fold_indices(12, 4, seed=0, labels=labels):
+            self.assertEqual({'a': 2, 'b': 1}, Counter(labels[idx] for idx in validation))
+
+    def test_k_fold_indices_given_invalid_k_should_raise_exception(self):
+        self.assertRaises(ValueError, list, k_fold_indices(3, 4))
+
+
+class DatasetSplitTest(unittest.TestCase):
+    def setUp(self):
+        self.samples = [Sample([idx], [idx % 2]) for idx in range(10)]
+        self.dataset = Dataset(self.samples)
+
+    def test_split_should_return_views_sharing_samples(self):
+        train, test = self.dataset.split([0.8, 0.2], seed=0)
+        self.assertTrue(train.is_view() and test.is_view())
+        self.assertEqual(8, train.len())
+        self.assertEqual(2, test.len())
+        for sample in test:
+            self.assertTrue(any(sample is original for original in self.samples))
+
+    def test_stratified_split_should_split_by_output_by_default(self):
+        first, second = self.dataset.stratified_split([0.6, 0.4], seed=0)
+        self.assertEqual({(0,): 3, (1,): 3}, Counter(tuple(output) for output in first.get_output()))
+
+    def test_stratified_split_given_one_hot_outputs_should_split_by_them(self):
+        dataset = Dataset([Sample([idx], [np.eye(2)[idx % 2]]) for idx in range(10)])
+        self.assertEqual([(1.0, 0.0), (0.0, 1.0)], dataset.get_labels()[:2])
+        first, second = dataset.stratified_split([0.6, 0.4], seed=0)
+        self.assertEqual({0: 3, 1: 3}, Counter(int(np.argmax(output[0])) for output in first.get_output()))
+
+    def test_k_fold_should_yield_train_and_validation_views(self):
+        folds = list(self.dataset.k_fold(5, seed=0, key=lambda sample: sample.get_output()[0]))
+        self.assertEqual(5, len(folds))
+        for train, validation in folds:
+            self.assertEqual(8, train.len())
+            self.assertListEqual([[0], [1]], sorted(validation.get_output()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,130 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from dframe.dataset.dataset import Dataset
+from dframe.dataset.persistence import H5pyPersistenceManager
+from dframe.dataset.sample import Sample
+from dframe.dataset.sampling import AliasSampler
+from dframe.dataset.sharding import ShardedPersistenceManager
+from dframe.dataset.statistics import RunningStats, FeatureStatistics, Normalizer
+
+
+class RunningStatsTest(unittest.TestCase):
+    def setUp(self):
+        self.values = np.random.RandomState(0).normal(3, 2, (100, 4))
+
+    def test_update_in_batches_should_match_single_pass(self):
+        sut = RunningStats()
+        for start in range(0, 100, 7):
+            sut.update(self.values[start:start + 7])
+        np.testing.assert_allclose(self.values.mean(axis=0), sut.mean)
+        np.testing.assert_allclose(self.values.var(axis=0), sut.variance)
+        np.testing.assert_array_equal(self.values.min(axis=0), sut.min)
+        np.testing.assert_array_equal(self.values.max(axis=0), sut.max)
+
+    def test_merge_should_match_stats_of_all_values(self):
+        first, second = RunningStats(), RunningStats()
+        first.update(self.values[:30])
+        second.update(self.values[30:])
+        first.merge(second)
+        self.assertEqual(100, first.count)
+        np.testing.assert_allclose(self.values.std(axis=0), first.std)
+
+    def test_from_dict_should_recover_stats(self):
+        sut = RunningStats()
+        sut.update(self.values)
+        recovered = RunningStats.from_dict(sut.to_dict())
+        np.testing.assert_allclose(sut.variance, recovered.variance)
+
+
+class FeatureStatisticsTest(unittest.TestCase):
+    def setUp(self):
+        self.dataset = Dataset([Sample([[idx, 2 * idx], idx % 2], [0]) for idx in range(10)])
+
+    def test_compute_should_return_stats_of_each_input(self):
+        sut = FeatureStatistics.compute(self.dataset, batch_size=3)
+        self.assertEqual(10, sut.count)
+        np.testing.assert_allclose([4.5, 9.0], sut.inputs[0].mean)
+        self.assertEqual(0.5, sut.inputs[1].mean)
+
+    def test_update_given_other_number_of_inputs_should_raise_exception(self):
+        sut = FeatureStatistics.compute(self.dataset)
+        self.assertRaises(ValueError, sut.update, [[1]])
+
+    def test_normalizer_should_standardize_batches(self):
+        normalizer = Normalizer(FeatureStatistics.compute(self.dataset))
+        inputs, _ = next(self.dataset.batch_generator(10, normalizer=normalizer))
+        np.testing.assert_allclose([0, 0], inputs[0].mean(axis=0), atol=1e-7)
+        np.testing.assert_allclose([1, 1], inputs[0].std(axis=0), atol=1e-6)
+
+    def test_normalizer_in_bucketed_batch_generator_should_standardize_batches(self):
+        normalizer = Normalizer(FeatureStatistics.compute(self.dataset))
+        inputs, _ = next(self.dataset.bucketed_batch_generator(10, size=lambda sample: 1, normalizer=normalizer))
+        np.testing.assert_allclose([0, 0], inputs[0].mean(axis=0), atol=1e-7)
+
+    def test_normalizer_in_sampled_batch_generator_should_normalize_batches(self):
+        statistics = FeatureStatistics.compute(self.dataset)
+        sampler = AliasSampler([1] + [0] * 9)
+        inputs, _ = next(self.dataset.sampled_batch_generator(2, sampler, normalizer=Normalizer(statistics)))
+        np.testing.assert_allclose(-statistics.inputs[1].mean / statistics.inputs[1].std, inputs[1], rtol=1e-6)
+
+    def test_normalizer_given_empty_statistics_should_raise_exception(self):
+        self.assertRaises(ValueError, Normalizer, FeatureStatistics())
+
+
+class StatisticsPersistenceTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.dataset = Dataset([Sample([float(idx)], [0]) for idx in range(12)])
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_h5py_statistics_should_be_updated_on_append(self):
+        sut = H5pyPersistenceManager()
+        path = os.path.join(self.directory, 'dataset.h5')
+        sut.save(self.dataset.view(slice(0, 6)), path)
+        sut.save_statistics(FeatureStatistics.compute(self.dataset.view(slice(0, 6))), path)
+        sut.append(self.dataset.view(slice(6, None)), path)
+        statistics = sut.load_statistics(path)
+        self.assertEqual(12, statistics.count)
+        self.assertAlmostEqual(5.5, float(statistics.inputs[0].mean))
+
+    def test_h5py_save_given_store_statistics_should_store_them(self):
+        sut = H5pyPersistenceManager(store_statistics=True)
+        path = os.path.join(self.directory, 'dataset.h5')
+        sut.save(self.dataset, path)
+        statistics = sut.load_statistics(path)
+        self.assertEqual(12, statistics.count)
+        self.assertAlmostEqual(5.5, float(statistics.inputs[0].mean))
+
+    def test_h5py_statistics_should_be_dropped_on_update(self):
+        sut = H5pyPersistenceManager()
+        path = os.path.join(self.directory, 'dataset.h5')
+        sut.save(self.dataset, path)
+        sut.save_statistics(FeatureStatistics.compute(self.dataset), path)
+        sut.update(self.dataset.view(slice(0, 1)), path, 3)
+        self.assertIsNone(sut.load_statistics(path))
+
+    def test_sharded_compute_statistics_should_merge_shards(self):
+        sut = ShardedPersistenceManager(shard_size=5, processes=2)
+        path = os.path.join(self.directory, 'sharded')
+        sut.save(self.dataset, path)
+        statistics = sut.compute_statistics(path)
+        self.assertEqual(12, statistics.count)
+        sut.append(Dataset([Sample([12.0], [0])]), path)
+        self.assertAlmostEqual(6.0, float(sut.load_statistics(path).inputs[0].mean))
+
+    def test_sharded_save_given_store_statistics_should_store_them(self):
+        sut = ShardedPersistenceManager(shard_size=5, processes=1, store_statistics=True)
+        path = os.path.join(self.directory, 'sharded')
+        sut.save(self.dataset, path)
+        self.assertEqual(12, sut.load_statistics(path).count)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from dframe.dataset.dataset import Dataset
+from dframe.dataset.sample import Sample
+from dframe.dataset.transform import TransformedDataset
+
+
+def double(sample):
+    return Sample([sample.get_input()[0] * 2], sample.get_output())
+
+
+def is_even(sample):
+    return sample.get_input()[0] % 2 == 0
+
+
+_factor = 2
+
+
+def multiply(sample):
+    return Sample([sample.get_input()[0] * _factor], sample.get_output())
+
+
+class TransformedDatasetTest(unittest.TestCase):
+    def setUp(self):
+        self.calls = []
+        self.dataset = Dataset([Sample([idx], [idx % 3]) for idx in range(10)])
+        self.cache_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
+    def track(self, sample):
+        self.calls.append(sample)
+        return sample
+
+    # ---------------------------- Map / Filter --------------------------------
+    def test_map_should_not_transform_until_iterated(self):
+        transformed = self.dataset.map(self.track)
+        self.assertListEqual([], self.calls)
+        list(transformed)
+        self.assertEqual(10, len(self.calls))
+
+    def test_map_and_filter_should_chain_transforms(self):
+        transformed = self.dataset.filter(is_even).map(double)
+        self.assertListEqual([[0], [4], [8], [12], [16]], [sample.get_input() for sample in transformed])
+
+    def test_construct_given_not_dataset_should_raise_exception(self):
+        self.assertRaises(TypeError, TransformedDataset, [Sample([1])])
+
+    # ---------------------------- Batch generator --------------------------------
+    def test_batch_generator_should_fill_batches_after_filtering(self):
+        generator = self.dataset.filter(is_even).batch_generator(2, shuffle=False)
+        self.assertListEqual([[0, 2]], next(generator)[0])
+        self.assertListEqual([[4, 6]], next(generator)[0])
+        self.assertListEqual([[8]], next(generator)[0])
+        self.assertListEqual([[0, 2]], next(generator)[0])
+
+    def test_batch_generator_given_processes_should_transform_in_workers(self):
+        generator = self.dataset.map(lambda sample: Sample([os.getpid()], [0])).batch_generator(5, processes=2)
+        inputs, _ = next(generator)
+        generator.close()
+        self.assertNotIn(os.getpid(), inputs[0])
+
+    def test_batch_generator_given_filter_dropping_all_samples_should_raise_exception(self):
+        generator = self.dataset.filter(lambda sample: False).batch_generator(2)
+        self.assertRaises(ValueError, next, generator)
+
+    def test_batch_generator_given_empty_source_should_raise_exception(self):
+        generator = Dataset().map(lambda sample: sample).batch_generator(2)
+        self.assertRaises(ValueError, next, generator)
+
+    # ---------------------------- Materialize --------------------------------
+    def test_materialize_given_processes_should_return_transformed_dataset(self):
+        dataset = self.dataset.map(double).materialize(processes=2)
+        self.assertListEqual([[idx * 2] for idx in range(10)], dataset.get_input())
+
+    def test_materialize_given_cache_should_skip_transforms_on_next_run(self):
+        self.dataset.map(self.track).materialize(cache_dir=self.cache_dir, cache_key='test')
+        dataset = self.dataset.map(self.track).materialize(cache_dir=self.cache_dir, cache_key='test')
+        self.assertEqual(10, len(self.calls))
+        self.assertEqual(10, dataset.len())
+
+    def test_cache_name_given_different_transform_should_differ(self):
+        self.assertNotEqual(self.dataset.map(double).cache_name(), self.dataset.map(is_even).cache_name())
+        self.assertEqual(self.dataset.map(double).cache_name(), self.dataset.map(double).cache_name())
+
+    def test_cache_name_given_different_closure_values_should_differ(self):
+        def scale(factor):
+            return lambda sample: Sample([sample.get_input()[0] * factor], sample.get_output())
+        self.assertNotEqual(self.dataset.map(scale(2)).cache_name('key'), self.dataset.map(scale(3)).cache_name('key'))
+        self.assertEqual(self.dataset.map(scale(2)).cache_name('key'), self.dataset.map(scale(2)).cache_name('key'))
+
+    def test_cache_name_given_different_defaults_should_differ(self):
+        def offset(sample, value=1):
+            return Sample([sample.get_input()[0] + value], sample.get_output())
+        first = self.dataset.map(offset).cache_name('key')
+        offset.__defaults__ = (2,)
+        self.assertNotEqual(first, self.dataset.map(offset).cache_name('key'))
+
+    def test_cache_name_given_different_globals_should_differ(self):
+        global _factor
+        _factor = 2
+        first = self.dataset.map(multiply).cache_name('key')
+        _factor = 3
+        self.assertNotEqual(first, self.dataset.map(multiply).cache_name('key'))
+
+    def test_materialize_given_cache_without_key_should_raise_exception(self):
+        self.assertRaises(ValueError, self.dataset.map(double).materialize, cache_dir=self.cache_dir)
+
+
+if __name__ == '__main__':
+    unittest.main()
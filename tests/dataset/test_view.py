@@ -0,0 +1,143 @@
+import cPickle
+import random
+import unittest
+
+import numpy as np
+
+from dframe.dataset.dataset import Dataset
+from dframe.dataset.sample import Sample
+from dframe.dataset.view import IndexRange, ConcatenatedSamples, IndexedSamples, SampleSequence
+
+
+class IndexRangeTest(unittest.TestCase):
+    def test_from_slice_should_have_slice_indices(self):
+        self.assertListEqual(range(10)[2:9:3], list(IndexRange.from_slice(slice(2, 9, 3), 10)))
+
+    def test_getitem_given_slice_should_return_range(self):
+        sut = IndexRange(10, 2, 5)
+        self.assertListEqual([12, 16], list(sut[1:4:2]))
+
+    def test_getitem_given_out_of_range_index_should_raise_exception(self):
+        self.assertRaises(IndexError, IndexRange(0, 1, 3).__getitem__, 3)
+
+
+class SampleSequenceTest(unittest.TestCase):
+    def test_sample_sequence_should_be_abstract(self):
+        self.assertRaises(TypeError, SampleSequence)
+
+
+class ConcatenatedSamplesTest(unittest.TestCase):
+    def setUp(self):
+        self.sut = ConcatenatedSamples([[0, 1, 2], [], ConcatenatedSamples([[3], [4, 5]])])
+
+    def test_construct_should_flatten_nested_concatenations(self):
+        self.assertEqual(3, len(self.sut.sequences))
+
+    def test_slice_should_return_samples_across_sequences(self):
+        self.assertListEqual([2, 3, 4], self.sut[2:5])
+
+    def test_take_should_return_samples_in_given_order(self):
+        self.assertListEqual([5, 0, 3], self.sut.take([5, 0, 3]))
+
+    def test_iter_should_return_all_samples(self):
+        self.assertListEqual(range(6), list(self.sut))
+
+
+class IndexedSamplesTest(unittest.TestCase):
+    def test_construct_given_indexed_samples_should_compose_indices(self):
+        sut = IndexedSamples(IndexedSamples(range(10), IndexRange(2, 2, 4)), np.array([3, 0]))
+        self.assertIsInstance(sut.sequence, list)
+        self.assertListEqual([8, 2], list(sut))
+
+    def test_shuffled_should_keep_same_samples(self):
+        sut = IndexedSamples(range(10), IndexRange(0, 1, 10)).shuffled()
+        self.assertItemsEqual(range(10), list(sut))
+
+    def test_pickle_should_return_list_with_view_samples(self):
+        sut = IndexedSamples(range(10), IndexRange(0, 3, 3))
+        self.assertListEqual([0, 3, 6], cPickle.loads(cPickle.dumps(sut)))
+
+
+class DatasetViewTest(unittest.TestCase):
+    def setUp(self):
+        self.samples = [Sample([idx, idx], idx) for idx in range(10)]
+        self.dataset = Dataset(list(self.samples))
+
+    # ----------------------- View ---------------------------
+    def test_view_given_slice_should_return_dataset_with_those_samples(self):
+        sut = self.dataset.view(slice(2, 5))
+        self.assertTrue(sut.is_view())
+        self.assertListEqual(self.samples[2:5], sut.get_samples())
+
+    def test_view_given_indices_should_return_samples_in_that_order(self):
+        sut = self.dataset.view([4, 1, 1])
+        self.assertListEqual([[4, 4], [1, 1], [1, 1]], sut.get_input())
+
+    def test_view_given_out_of_range_indices_should_raise_exception(self):
+        self.assertRaises(IndexError, self.dataset.view, [10])
+
+    def test_view_of_view_should_select_from_the_view(self):
+        sut = self.dataset.view(slice(2, 8)).view([0, -1])
+        self.assertListEqual([self.samples[2], self.samples[7]], sut.get_samples())
+
+    def test_view_should_keep_samples_after_original_is_modified(self):
+        sut = self.dataset.view(slice(0, 3))
+        self.dataset.remove(self.samples[0])
+        self.dataset.shuffle()
+        self.assertListEqual(self.samples[:3], sut.get_samples())
+        self.assertEqual(9, self.dataset.len())
+
+    def test_view_add_should_not_modify_original(self):
+        sut = self.dataset.view(slice(0, 3))
+        sut.add(Sample([1, 1], 1))
+        self.assertFalse(sut.is_view())
+        self.assertEqual(4, sut.len())
+        self.assertEqual(10, self.dataset.len())
+
+    def test_view_shuffle_should_not_copy_samples(self):
+        sut = self.dataset.view(slice(0, 5))
+        sut.shuffle()
+        self.assertTrue(sut.is_view())
+        self.assertItemsEqual(self.samples[:5], sut.get_samples())
+        self.assertListEqual(self.samples, self.dataset.get_samples())
+
+    def test_view_shuffle_should_follow_random_seed_like_lists(self):
+        random.seed(7)
+        self.dataset.shuffle()
+        sut = Dataset.concat([Dataset(list(self.samples))])
+        random.seed(7)
+        sut.shuffle()
+        self.assertListEqual(self.dataset.get_samples(), sut.get_samples())
+
+    def test_view_batch_generator_should_yield_view_batches(self):
+        sut = self.dataset.view(slice(0, 4))
+        inputs, outputs = next(sut.batch_generator(batch_size=3, shuffle=False))
+        self.assertListEqual([[0, 1, 2], [0, 1, 2]], inputs)
+        self.assertListEqual([[0, 1, 2]], outputs)
+
+    # ----------------------- Concat ---------------------------
+    def test_concat_given_non_datasets_should_raise_exception(self):
+        self.assertRaises(TypeError, Dataset.concat, [self.dataset, 1])
+
+    def test_concat_should_return_view_with_all_samples(self):
+        other = Dataset([Sample([10, 10], 10)])
+        sut = Dataset.concat([self.dataset, other, self.dataset.view(slice(0, 1))])
+        self.assertTrue(sut.is_view())
+        self.assertEqual(12, sut.len())
+        self.assertListEqual([[9], [10], [0]], sut.get_output(offset=9))
+
+    def test_sum_should_return_dataset_with_all_samples(self):
+        datasets = [self.dataset.view(slice(idx, idx + 1)) for idx in range(10)]
+        self.assertListEqual(self.samples, sum(datasets).get_samples())
+
+    def test_add_given_views_should_return_dataset_with_own_list(self):
+        other = Dataset([Sample([10, 10], 10)])
+        sut = self.dataset.view(slice(0, 5)) + other
+        self.assertFalse(sut.is_view())
+        sut.get_samples().append(Sample([11, 11], 11))
+        self.assertEqual(7, sut.len())
+        self.assertEqual((10, 1), (self.dataset.len(), other.len()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import os
+import unittest
+
+import numpy as np
+
+from dframe.dataset.dataset import Dataset
+from dframe.dataset.sample import Sample
+from dframe.model.evaluation import cross_validate, aggregate
+from dframe.model.model import Model
+
+
+class MeanModel(Model):
+    """Predicts the mean output of the train samples. Validation returns the mean absolute error"""
+
+    def __init__(self, offset=0):
+        self.offset = offset
+        self.mean = None
+
+    def train(self, dataset):
+        outputs = [output[0] for output in dataset.get_output()]
+        self.mean = float(sum(outputs)) / len(outputs) + self.offset
+
+    def validate(self, dataset):
+        errors = [abs(output[0] - self.mean) for output in dataset.get_output()]
+        return {'mae': sum(errors) / len(errors), 'pid': os.getpid()}
+
+    def test(self, dataset):
+        return self.validate(dataset)
+
+    def predict(self, sample):
+        return self.mean
+
+
+class EvaluationTest(unittest.TestCase):
+    def setUp(self):
+        self.dataset = Dataset([Sample([idx], [1]) for idx in range(12)])
+
+    # ---------------------------- Cross validate --------------------------------
+    def test_cross_validate_should_return_metrics_of_each_fold(self):
+        result = cross_validate(MeanModel, self.dataset, k=3, model_kwargs={'offset': 2}, processes=1)
+        self.assertEqual(3, len(result['folds']))
+        self.assertEqual(2.0, result['mean']['mae'])
+        self.assertEqual(0.0, result['std']['mae'])
+
+    def test_cross_validate_given_processes_should_run_folds_in_workers(self):
+        result = cross_validate(MeanModel, self.dataset, k=4, processes=2, seed=0)
+        self.assertEqual(4, len(result['folds']))
+        self.assertEqual(0.0, result['mean']['mae'])
+        self.assertNotIn(os.getpid(), [fold['pid'] for fold in result['folds']])
+
+    def test_cross_validate_given_same_seed_should_be_reproducible(self):
+        first = cross_validate(MeanModel, self.dataset, k=3, processes=1, seed=5)
+        second = cross_validate(MeanModel, self.dataset, k=3, processes=1, seed=5)
+        self.assertEqual(first['mean']['mae'], second['mean']['mae'])
+
+    # ---------------------------- Aggregate --------------------------------
+    def test_aggregate_given_numbers_should_return_mean_and_std(self):
+        result = aggregate([1, 3])
+        self.assertEqual(2.0, result['mean'])
+        self.assertEqual(1.0, result['std'])
+
+    def test_aggregate_given_none_metrics_should_not_aggregate(self):
+        self.assertIsNone(aggregate([None, None])['mean'])
+
+    def test_aggregate_given_non_numeric_metrics_should_only_aggregate_numbers(self):
+        folds = [{'mae': 1, 'label': 'a', 'confusion': [[1, 0], [0, 1]]},
+                 {'mae': np.float32(3), 'label': 'b', 'confusion': [[0, 1], [1, 0]]}]
+        result = aggregate(folds)
+        self.assertEqual({'mae': 2.0}, result['mean'])
+        self.assertEqual({'mae': 1.0}, result['std'])
+        self.assertEqual(folds, result['folds'])
+
+
+if __name__ == '__main__':
+    unittest.main()
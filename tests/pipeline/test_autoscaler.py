@@ -0,0 +1,111 @@
+import time
+import unittest
+
+from dframe.pipeline.autoscaler import Autoscaler
+from dframe.pipeline.core import Core
+from dframe.pipeline.package import Package
+from dframe.pipeline.pipeline import Pipeline
+
+
+class AutoscalerTest(unittest.TestCase):
+    # ----------------------- Init ---------------------------
+    def test_construct_given_invalid_bounds_should_raise_exception(self):
+        self.assertRaises(ValueError, Autoscaler, 0, 2)
+        self.assertRaises(ValueError, Autoscaler, 3, 2)
+
+    # ----------------------- Scale ---------------------------
+    def test_scale_given_deep_queue_should_add_replica(self):
+        core = FakeCore(depth=10, processing_time=1.0)
+        sut = Autoscaler(max_replicas=2, max_wait=1.0)
+        self.assertEqual(1, sut.scale(0, core))
+        self.assertEqual(2, core.num_replicas())
+
+    def test_scale_given_max_replicas_should_not_add_replica(self):
+        core = FakeCore(depth=10, processing_time=1.0, replicas=2)
+        sut = Autoscaler(max_replicas=2, max_wait=1.0)
+        self.assertEqual(0, sut.scale(0, core))
+
+    def test_scale_given_bounds_for_core_should_use_them(self):
+        core = FakeCore(depth=10, processing_time=1.0, replicas=2)
+        sut = Autoscaler(max_replicas=2, max_wait=1.0, bounds={0: (1, 3)})
+        self.assertEqual(1, sut.scale(0, core))
+
+    def test_scale_given_empty_queue_should_retire_replica_after_checks(self):
+        core = FakeCore(depth=0, processing_time=1.0, replicas=2)
+        sut = Autoscaler(scale_down_checks=2)
+        self.assertEqual(0, sut.scale(0, core))
+        self.assertEqual(-1, sut.scale(0, core))
+        self.assertEqual(1, core.num_replicas())
+
+    def test_scale_given_min_replicas_should_not_retire_replica(self):
+        core = FakeCore(depth=0, processing_time=1.0)
+        sut = Autoscaler(scale_down_checks=1)
+        self.assertEqual(0, sut.scale(0, core))
+
+    def test_start_given_stages_should_use_bounds_of_their_index_in_the_pipeline(self):
+        core = FakeCore(depth=0, processing_time=1.0)
+        sut = Autoscaler(interval=0.01, bounds={1: (2, 2)})
+        sut.start([core], stages=[1])
+        time.sleep(0.1)
+        sut.stop()
+        self.assertEqual(2, core.num_replicas())
+
+    # ----------------------- Pipeline ---------------------------
+    def test_pipeline_given_remote_cores_should_index_local_cores_by_stage(self):
+        sut = Pipeline([{Pipeline.KEY_CLASS: SleepCore, Pipeline.KEY_REMOTE: True}, {Pipeline.KEY_CLASS: SleepCore}])
+        self.assertEqual([1], sut.stages)
+        self.assertTrue(sut.cores[0].name.startswith('stage1-'))
+        sut.results_manager.shutdown()
+    def test_pipeline_with_autoscaler_should_scale_core_and_process_all_packages(self):
+        sut = Pipeline([{Pipeline.KEY_CLASS: SleepCore}],
+                       autoscaler=Autoscaler(max_replicas=3, max_wait=0.1, interval=0.1, scale_down_checks=1))
+        sut.start()
+        num_packages = 20
+        for package_id in range(num_packages):
+            sut.process_package(Package(package_id=package_id))
+
+        scaled = False
+        for _ in range(20):
+            scaled = scaled or sut.cores[0].num_replicas() > 1
+            time.sleep(0.1)
+        sut.stop()
+        self.assertTrue(scaled)
+        self.assertEqual(num_packages, len(sut.results))
+
+
+class FakeCore(object):
+    def __init__(self, depth, processing_time, replicas=1):
+        self.depth = depth
+        self.time = processing_time
+        self.replicas = replicas
+
+    def reap_replicas(self):
+        pass
+
+    def is_alive(self):
+        return True
+
+    def num_replicas(self):
+        return self.replicas
+
+    def queue_depth(self):
+        return self.depth
+
+    def processing_time(self):
+        return self.time
+
+    def add_replica(self):
+        self.replicas += 1
+
+    def remove_replica(self):
+        self.replicas -= 1
+        return True
+
+
+class SleepCore(Core):
+    def process_package(self, package):
+        time.sleep(0.1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import time
+import unittest
+from multiprocessing import Pipe, Queue
+
+from dframe.pipeline.core import Core
+from dframe.pipeline.package import Package
+
+
+class CoreTest(unittest.TestCase):
+    def setUp(self):
+        self.receiver, self.sender = Pipe(duplex=False)
+
+    # ----------------------- Run ---------------------------
+    def test_run_given_package_should_process_and_send_it(self):
+        sut = self._run_core([Package(package_id=1)])
+        result = self.receiver.recv()
+        self.assertEqual(['processed'], [result.get_layer(i) for i in range(result.num_layers())])
+        self.assertFalse(result.expired)
+        self.assertIsNone(self.receiver.recv())
+        self.assertEqual(1, sut.processed)
+
+    def test_run_given_expired_package_should_send_it_unprocessed(self):
+        sut = self._run_core([Package(package_id=1, deadline=time.time() - 1)])
+        result = self.receiver.recv()
+        self.assertTrue(result.expired)
+        self.assertEqual(0, result.num_layers())
+        self.assertEqual(0, sut.processed)
+
+    def test_run_given_expired_package_and_drop_expired_should_send_its_tombstone(self):
+        expired = Package(package_id=1, deadline=time.time() - 1)
+        expired.add_layer('input')
+        self._run_core([expired, Package(package_id=2)], drop_expired=True)
+        tombstone = self.receiver.recv()
+        self.assertEqual((1, True, 0), (tombstone.package_id, tombstone.expired, tombstone.num_layers()))
+        self.assertEqual(2, self.receiver.recv().package_id)
+
+    # ----------------------- Replicas ---------------------------
+    def test_replicas_should_process_packages_and_propagate_poison_pill_once(self):
+        pipe_in, input_sender = Pipe(duplex=False)
+        sut = CountingCore(pipe_in, self.sender)
+        sut.start()
+        sut.add_replica()
+        sut.add_replica()
+        self.assertEqual(3, sut.num_replicas())
+        self.assertTrue(sut.remove_replica())
+        self.assertEqual(2, sut.num_replicas())
+
+        for package_id in range(10):
+            input_sender.send(Package(package_id=package_id))
+        input_sender.send(None)
+        received = [self.receiver.recv() for _ in range(11)]
+        self.assertItemsEqual(range(10), [package.package_id for package in received[:-1]])
+        self.assertIsNone(received[-1])
+        self.assertFalse(self.receiver.poll(0.5))
+
+        sut.join()
+        sut.producer.join()
+        for replica in sut.replicas:
+            replica.join()
+        sut.reap_replicas()
+        self.assertListEqual([], sut.replicas)
+
+    def test_remove_replica_given_single_worker_should_not_retire_it(self):
+        sut = CountingCore(None, self.sender)
+        self.assertFalse(sut.remove_replica())
+
+    def _run_core(self, packages, **kwargs):
+        sut = CountingCore(None, self.sender, **kwargs)
+        # Unbounded queue so that the run loop can be executed in this very process
+        sut.queue = Queue()
+        for package in packages + [None]:
+            sut.queue.put(package)
+        sut.run()
+        return sut
+
+
+class CountingCore(Core):
+    processed = 0
+
+    def process_package(self, package):
+        self.processed += 1
+        package.add_layer('processed')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -5,6 +5,7 @@ from multiprocessing import Queue, Pipe
 import time
 
 from dframe.pipeline.core import PipeConsumer
+from dframe.pipeline.package import Package
 
 
 class PipeConsumerTest(unittest.TestCase):
@@ -24,6 +25,47 @@ class PipeConsumerTest(unittest.TestCase):
         pipe_out.send(None)
         self.sut.join()
 
+    def test_run_given_full_queue_should_feed_it_by_priority(self):
+        queue = Queue(1)
+        pipe_in, pipe_out = Pipe(duplex=False)
+        self.sut = PipeConsumer(pipe_in, queue)
+        self.sut.start()
+        # Fill the queue so that the packages wait for it to have room
+        queue.put(Package(package_id=0))
+        pipe_out.send(Package(package_id=1))
+        pipe_out.send(Package(package_id=2, priority=0))
+        pipe_out.send(Package(package_id=3, priority=5))
+        pipe_out.send(Package(package_id=4, priority=5))
+        time.sleep(1)
+        self.assertEqual([0, 3, 4, 1, 2], [self._take(queue).package_id for _ in range(5)])
+        pipe_out.send(None)
+        self.assertIsNone(queue.get())
+        self.sut.join()
+
+    def test_run_given_full_queue_should_feed_it_once_room_is_signaled(self):
+        queue = Queue(1)
+        pipe_in, pipe_out = Pipe(duplex=False)
+        self.sut = PipeConsumer(pipe_in, queue)
+        self.sut.start()
+        queue.put('first')
+        pipe_out.send('second')
+        # Let the producer find the queue full and wait for room
+        time.sleep(0.1)
+        start = time.time()
+        queue.get()
+        self.sut.room.set()
+        self.assertEqual('second', queue.get(timeout=10))
+        self.assertLess(time.time() - start, PipeConsumer.WAIT_INTERVAL / 2)
+        pipe_out.send(None)
+        self.assertIsNone(queue.get())
+        self.sut.join()
+
+    def _take(self, queue):
+        """Takes a package from the queue as the workers of a core do"""
+        package = queue.get()
+        self.sut.room.set()
+        return package
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -1,3 +1,4 @@
+import time
 import unittest
 
 from dframe.pipeline.package import Package
@@ -55,6 +56,23 @@ class PackageTest(unittest.TestCase):
         self.sut.add_layer(layer_two)
         self.assertEqual(layer_two, self.sut.get_output())
 
+    def test_is_expired_without_deadline_should_return_false(self):
+        self.assertFalse(self.sut.is_expired())
+
+    def test_is_expired_with_future_deadline_should_return_false(self):
+        self.assertFalse(Package(package_id=1, deadline=time.time() + 60).is_expired())
+
+    def test_is_expired_with_past_deadline_should_return_true(self):
+        self.assertTrue(Package(package_id=1, deadline=time.time() - 1).is_expired())
+
+    def test_tombstone_should_return_expired_copy_without_layers(self):
+        package = Package(package_id=1, priority=2, deadline=10)
+        package.add_layer('input')
+        tombstone = package.tombstone()
+        self.assertEqual((1, 2, 10, True, 0), (tombstone.package_id, tombstone.priority, tombstone.deadline,
+                                               tombstone.expired, tombstone.num_layers()))
+        self.assertEqual(1, package.num_layers())
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,76 @@
+import shutil
+import tempfile
+import time
+import unittest
+
+from dframe.pipeline.core import Core
+from dframe.pipeline.package import Package
+from dframe.pipeline.pipeline import Pipeline
+from dframe.pipeline.profiling import WorkerProfiler, collect_profiles
+
+
+class ProfilingTest(unittest.TestCase):
+    def setUp(self):
+        self.profile_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.profile_dir)
+
+    # ----------------------- Worker profiler ---------------------------
+    def test_run_should_return_function_result(self):
+        sut = WorkerProfiler(self.profile_dir, 'core')
+        self.assertEqual(3, sut.run(sum, [1, 2]))
+
+    def test_dump_without_profiled_calls_should_not_write_anything(self):
+        WorkerProfiler(self.profile_dir, 'core').dump()
+        self.assertDictEqual({}, collect_profiles(self.profile_dir))
+
+    def test_dump_should_write_stats_collected_by_name(self):
+        sut = WorkerProfiler(self.profile_dir, 'core')
+        sut.run(sum, [1, 2])
+        sut.dump()
+        profiles = collect_profiles(self.profile_dir)
+        self.assertListEqual(['core'], profiles.keys())
+        self.assertGreater(profiles['core'].total_calls, 0)
+
+    # ----------------------- Pipeline ---------------------------
+    def test_pipeline_with_profile_should_collect_stats_of_each_core(self):
+        sut = Pipeline([{Pipeline.KEY_CLASS: ProfiledCore}, {Pipeline.KEY_CLASS: ProfiledCore}],
+                       profile_dir=self.profile_dir, profile=True)
+        sut.start()
+        sut.process_package(Package(package_id=1))
+        sut.stop()
+        profiles = sut.collect_profiles()
+        self.assertItemsEqual(['stage0-ProfiledCore', 'stage1-ProfiledCore'], profiles.keys())
+        functions = [function for _, _, function in profiles['stage0-ProfiledCore'].stats]
+        self.assertIn('process_package', functions)
+
+    def test_pipeline_without_profile_should_not_write_stats(self):
+        sut = Pipeline([{Pipeline.KEY_CLASS: ProfiledCore}], profile_dir=self.profile_dir)
+        sut.start()
+        sut.process_package(Package(package_id=1))
+        sut.stop()
+        self.assertDictEqual({}, sut.collect_profiles())
+
+    def test_pipeline_without_profile_dir_should_not_collect_profiles_of_earlier_runs(self):
+        first = Pipeline([{Pipeline.KEY_CLASS: ProfiledCore}], profile=True)
+        first.start()
+        first.process_package(Package(package_id=1))
+        first.stop()
+        try:
+            self.assertEqual(1, len(first.collect_profiles()))
+            second = Pipeline([{Pipeline.KEY_CLASS: ProfiledCore}], profile=True)
+            second.results_manager.shutdown()
+            self.assertNotEqual(first.profile_dir, second.profile_dir)
+            self.assertDictEqual({}, second.collect_profiles())
+        finally:
+            shutil.rmtree(first.profile_dir)
+
+
+class ProfiledCore(Core):
+    def process_package(self, package):
+        time.sleep(0.01)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,141 @@
+import pickle
+import unittest
+from multiprocessing import Process, Queue
+
+import numpy as np
+
+from dframe.pipeline.package import Package
+from dframe.pipeline.serialization import BinaryCodec, PickleCodec, CodecConnection, wrap_channel
+from dframe.pipeline.transport import PipeTransport, SocketTransport
+
+
+class BinaryCodecTest(unittest.TestCase):
+    def setUp(self):
+        self.sut = BinaryCodec()
+
+    # ----------------------- Encode/decode ---------------------------
+
+    def test_decode_given_encoded_builtin_values_should_return_equal_values(self):
+        values = [None, True, False, 0, -7, 2 ** 62, 2 ** 70, 1.5, 'bytes', u'unicod\xe9', [1, 'a'], (1, (2,)),
+                  {'key': [1.0, None], 3: u'value'}, []]
+        for value in values:
+            decoded = self.sut.decode(self.sut.encode(value))
+            self.assertEqual(value, decoded)
+            self.assertIs(type(value), type(decoded))
+
+    def test_decode_given_encoded_arrays_should_return_equal_writable_arrays(self):
+        arrays = [np.arange(12, dtype=np.float32).reshape(3, 4), np.array([[1, 2]], np.int64).T, np.zeros((0, 5)),
+                  np.array('text'), np.array([True, False])]
+        for array in arrays:
+            decoded = self.sut.decode(self.sut.encode(array))
+            self.assertEqual(array.dtype, decoded.dtype)
+            np.testing.assert_array_equal(array, decoded)
+            decoded[...] = array        # Not read only
+
+    def test_decode_given_encoded_numpy_scalar_should_return_scalar(self):
+        decoded = self.sut.decode(self.sut.encode(np.float32(2.5)))
+        self.assertIsInstance(decoded, np.float32)
+        self.assertEqual(2.5, decoded)
+
+    def test_decode_given_encoded_package_should_return_package_with_same_state(self):
+        package = Package(package_id=3, priority=2, deadline=10.5)
+        package.expired = True
+        package.add_layer({'image': np.ones((2, 2), np.uint8)})
+        package.add_layer('processed')
+
+        decoded = self.sut.decode(self.sut.encode(package))
+        self.assertIsInstance(decoded, Package)
+        self.assertEqual((3, 2, 10.5, True), (decoded.package_id, decoded.priority, decoded.deadline, decoded.expired))
+        np.testing.assert_array_equal(package.get_input()['image'], decoded.get_input()['image'])
+        self.assertEqual('processed', decoded.get_output())
+
+    def test_decode_given_encoded_structured_and_object_arrays_should_return_equal_arrays(self):
+        arrays = [np.array([1, 'a'], object), np.ones(2, [('x', np.int32), ('y', np.float64)])]
+        for array in arrays:
+            decoded = self.sut.decode(self.sut.encode([array]))[0]
+            self.assertEqual(array.dtype, decoded.dtype)
+            np.testing.assert_array_equal(array, decoded)
+
+    def test_decode_given_encoded_array_subclasses_should_return_same_class_and_state(self):
+        masked = self.sut.decode(self.sut.encode(np.ma.masked_array([1, 2, 3], mask=[0, 1, 0])))
+        self.assertIsInstance(masked, np.ma.MaskedArray)
+        self.assertListEqual([1, None, 3], masked.tolist())
+        matrix = self.sut.decode(self.sut.encode([np.matrix([[1, 2], [3, 4]])]))[0]
+        self.assertIsInstance(matrix, np.matrix)
+        np.testing.assert_array_equal([[1, 2], [3, 4]], matrix)
+
+    def test_decode_given_encoded_package_subclass_should_return_same_class(self):
+        decoded = self.sut.decode(self.sut.encode(PackageSubclass(1)))
+        self.assertIsInstance(decoded, PackageSubclass)
+
+    def test_encode_should_be_smaller_than_pickle_for_packages(self):
+        package = Package(package_id=1)
+        package.add_layer({'id': 1, 'score': 0.5})
+        package.add_layer(np.arange(4, dtype=np.float32))
+        self.assertLess(len(self.sut.encode(package)), len(PickleCodec().encode(package)))
+
+    def test_encode_given_compress_threshold_should_compress_large_payloads_only(self):
+        sut = BinaryCodec(compress_threshold=100)
+        small, large = 'a' * 10, np.zeros(10000)
+        self.assertEqual(BinaryCodec.RAW, sut.encode(small)[0])
+        self.assertEqual(BinaryCodec.COMPRESSED, sut.encode(large)[0])
+        self.assertLess(len(sut.encode(large)), large.nbytes)
+        np.testing.assert_array_equal(large, sut.decode(sut.encode(large)))
+
+    def test_decode_given_data_of_other_codec_should_raise_exception(self):
+        self.assertRaises(ValueError, self.sut.decode, PickleCodec().encode([1, 2]))
+
+    def test_decode_given_truncated_data_should_raise_exception(self):
+        self.assertRaises(ValueError, self.sut.decode, self.sut.encode(np.arange(10))[:-1])
+
+    def test_codec_should_be_picklable(self):
+        sut = pickle.loads(pickle.dumps(BinaryCodec(compress_threshold=10)))
+        self.assertEqual(10, sut.compress_threshold)
+        self.assertEqual([1, 'a'], sut.decode(sut.encode([1, 'a'])))
+
+
+class CodecConnectionTest(unittest.TestCase):
+    def test_wrap_channel_without_codec_should_return_channel_as_it_is(self):
+        channel = ('receiver', 'sender')
+        self.assertIs(channel, wrap_channel(channel, None))
+
+    def test_pipe_transport_with_codec_should_send_packages_between_processes(self):
+        self._assert_sends_package(PipeTransport(codec=BinaryCodec()))
+
+    def test_socket_transport_with_codec_should_send_packages_between_processes(self):
+        self._assert_sends_package(SocketTransport(codec=BinaryCodec(compress_threshold=0)))
+
+    def test_socket_transport_with_codec_should_keep_addresses_in_core_endpoints(self):
+        addresses = [('localhost', 6000), ('localhost', 6001)]
+        endpoints = SocketTransport(addresses, codec=BinaryCodec()).core_endpoints(0)
+        self.assertIsInstance(endpoints['pipe_in'], CodecConnection)
+        self.assertEqual(addresses[0], endpoints['pipe_in'].address)
+        self.assertEqual(addresses[1], pickle.loads(pickle.dumps(endpoints['pipe_out'])).address)
+
+    def _assert_sends_package(self, transport):
+        receiver, sender = transport.channel(0)
+        queue = Queue()
+        consumer = Process(target=_receive, args=(receiver, queue))
+        consumer.start()
+        package = Package(package_id=1)
+        package.add_layer(np.arange(6).reshape(2, 3))
+        sender.send(package)
+        sender.send(None)
+        package_id, layer, stop = queue.get(timeout=10)
+        consumer.join()
+        self.assertEqual(1, package_id)
+        np.testing.assert_array_equal(np.arange(6).reshape(2, 3), layer)
+        self.assertIsNone(stop)
+
+
+class PackageSubclass(Package):
+    pass
+
+
+def _receive(receiver, queue):
+    package = receiver.recv()
+    queue.put((package.package_id, package.get_input(), receiver.recv()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+import pickle
+import socket
+import time
+import unittest
+from multiprocessing import AuthenticationError, Process, Queue, Event
+
+from dframe.pipeline.core import Core
+from dframe.pipeline.package import Package
+from dframe.pipeline.pipeline import Pipeline
+from dframe.pipeline.transport import PipeTransport, SocketTransport, SocketReceiver, SocketSender
+
+
+class SocketTransportTest(unittest.TestCase):
+    # ----------------------- Channel ---------------------------
+    def test_channel_without_addresses_should_return_socket_ends_with_same_address(self):
+        receiver, sender = SocketTransport().channel(0)
+        self.assertIsInstance(receiver, SocketReceiver)
+        self.assertIsInstance(sender, SocketSender)
+        self.assertEqual(receiver.address, sender.address)
+
+    def test_channel_without_addresses_should_hold_its_port(self):
+        receiver, _ = SocketTransport().channel(0)
+        other = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        try:
+            self.assertRaises(socket.error, other.bind, receiver.address)
+        finally:
+            other.close()
+            receiver.close()
+
+    def test_channel_given_sender_with_wrong_key_should_keep_accepting_senders(self):
+        receiver, sender = SocketTransport(authkey='key').channel(0)
+        queue = Queue()
+        consumer = Process(target=_receive, args=(receiver, queue, 1))
+        consumer.start()
+        self.assertRaises(AuthenticationError, SocketSender(receiver.address, 'wrong').send, 'package 0')
+        sender.send('package 1')
+        self.assertEqual(['package 1'], queue.get(timeout=10))
+        consumer.join()
+
+    def test_channel_given_missing_address_should_raise_exception(self):
+        sut = SocketTransport(addresses=[('localhost', 6000)])
+        self.assertRaises(ValueError, sut.channel, 1)
+
+    def test_channel_should_send_packages_between_processes(self):
+        receiver, sender = SocketTransport().channel(0)
+        queue = Queue()
+        consumer = Process(target=_receive, args=(receiver, queue, 2))
+        consumer.start()
+        sender.send('package 1')
+        sender.send('package 2')
+        self.assertEqual(['package 1', 'package 2'], queue.get(timeout=10))
+        consumer.join()
+
+    def test_channel_should_receive_from_several_senders(self):
+        receiver, sender = SocketTransport().channel(0)
+        queue = Queue()
+        consumer = Process(target=_receive, args=(receiver, queue, 2))
+        consumer.start()
+        # Senders stay connected until the consumer has received all the packages (closing all of them means EOF)
+        received = Event()
+        producers = [Process(target=_send, args=(sender, i, received)) for i in range(2)]
+        for producer in producers:
+            producer.start()
+        self.assertItemsEqual([0, 1], queue.get(timeout=10))
+        received.set()
+        consumer.join()
+        for producer in producers:
+            producer.join()
+
+    def test_channel_ends_should_be_picklable(self):
+        receiver, sender = SocketTransport(authkey='key').channel(0)
+        self.assertEqual(receiver.address, pickle.loads(pickle.dumps(receiver)).address)
+        self.assertEqual(sender.authkey, pickle.loads(pickle.dumps(sender)).authkey)
+
+    # ----------------------- Core endpoints ---------------------------
+    def test_core_endpoints_without_addresses_should_raise_exception(self):
+        self.assertRaises(ValueError, SocketTransport().core_endpoints, 0)
+
+    def test_core_endpoints_should_return_input_and_output_channels_of_the_core(self):
+        addresses = [('localhost', 6000), ('localhost', 6001), ('localhost', 6002)]
+        endpoints = SocketTransport(addresses).core_endpoints(1)
+        self.assertEqual(addresses[1], endpoints['pipe_in'].address)
+        self.assertEqual(addresses[2], endpoints['pipe_out'].address)
+
+
+class PipelineTransportTest(unittest.TestCase):
+    def test_pipeline_with_pipe_transport_should_process_package(self):
+        self._assert_processes_package(PipeTransport())
+
+    def test_pipeline_with_socket_transport_should_process_package(self):
+        self._assert_processes_package(SocketTransport())
+
+    def _assert_processes_package(self, transport):
+        sut = Pipeline([{Pipeline.KEY_CLASS: LayerCore}, {Pipeline.KEY_CLASS: LayerCore}], transport=transport)
+        sut.start()
+        package = Package(package_id=1)
+        package.add_layer('input')
+        sut.process_package(package)
+
+        result = None
+        for _ in range(100):
+            result = sut.get_result(1)
+            if result is not None:
+                break
+            time.sleep(0.1)
+        sut.stop()
+        self.assertIsNotNone(result)
+        self.assertEqual(3, result.num_layers())
+
+
+class LayerCore(Core):
+    def process_package(self, package):
+        package.add_layer('processed')
+
+
+def _send(sender, package, received):
+    sender.send(package)
+    received.wait(10)
+
+
+def _receive(receiver, queue, num_packages):
+    queue.put([receiver.recv() for _ in range(num_packages)])
+
+
+if __name__ == '__main__':
+    unittest.main()